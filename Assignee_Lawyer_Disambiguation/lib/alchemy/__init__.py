@@ -45,35 +45,11 @@ from sqlalchemy import exc
 from sqlalchemy import event
 from sqlalchemy.pool import Pool
 
-from HTMLParser import HTMLParser
-h = HTMLParser()
-def unescape_html(x):
-    return h.unescape(x)
-
-import htmlentitydefs
-
-_char = re.compile(r'&(\w+?);')
-    
-# Generate some extra HTML entities
-defs=htmlentitydefs.entitydefs
-defs['apos'] = "'"
-#need to fix this to pull the database location from the config file
-entities = open('D:/DataBaseUpdate/Code/PatentsView-DB/Scripts/Raw_Data_Parsers/uspto_parsers/htmlentities').read().split('\n')
-for e in entities:
-    try:
-        first = re.sub('\s+|\"|;|&','',e[3:15])
-        second = re.sub('\s+|\"|;|&','',e[15:24])
-        define = re.search("(?<=\s\s\').*?$",e).group()
-        defs[first] = define[:-1].encode('utf-8')
-        defs[second] = define[:-1].encode('utf-8')
-    except:
-        pass
-
-def _char_unescape(m, defs=defs):
-    try:
-        return defs[m.group(1)].encode('utf-8','ignore')
-    except:
-        return m.group()
+# the entity table is shared with the parsers in Scripts/Raw_Data_Parsers
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..',
+                             'Scripts', 'Raw_Data_Parsers', 'uspto_parsers'))
+from html_entities import unescape as unescape_html, unescape_entities
 
 def fixid(x):
     if 'id' in x:
@@ -375,8 +351,7 @@ def add_claims(obj, pat):
     claims = obj.claims
     for claim in claims:
         claim = fixid(claim)
-        claim['text'] = unescape_html(claim['text'])
-        claim['text'] = _char.sub(_char_unescape,claim['text'])
+        claim['text'] = unescape_entities(unescape_html(claim['text']))
         clm = schema.Claim(**claim)
         pat.claims.append(clm)
 
@@ -492,8 +467,7 @@ def add_app_claims(obj, app):
     claims = obj.claims
     for claim in claims:
         claim = fixid(claim)
-        claim['text'] = unescape_html(claim['text'])
-        claim['text'] = _char.sub(_char_unescape,claim['text'])
+        claim['text'] = unescape_entities(unescape_html(claim['text']))
         clm = schema.App_Claim(**claim)
         app.claims.append(clm)
 
@@ -1,11 +1,17 @@
 from __future__ import unicode_literals
 import argparse
-from uspto_parsers import generic_parser_1976_2001,generic_parser_2002_2004,generic_parser_2005, csv_to_mysql,uspc_table,merge_db_script,cpc_table,cpc_class_tables
+from uspto_parsers import generic_parser_1976_2001,generic_parser_2002_2004,generic_parser_2005,parse_engine, csv_to_mysql,uspc_table,merge_db_script,cpc_table,cpc_class_tables
+from uspto_parsers.output_sinks import FLUSH_ROWS, mysql_connector
 
 parser = argparse.ArgumentParser(description='This program is used to parse USPTO full-text patent grant data for 1976-2004 and also uploading parsed data to MySQL.',epilog='(Example syntax for parsing raw data: python parser_wrapper.py --input-dir "uspto_raw/1976-2001/" --output-dir "uspto_parsed/1976-2001/" --period 1)\n (Example syntax for uploading to MySQL: python parser_wrapper.py --mysql 1 --mysql-input-dir "c:/uspto_parsed/1976-2001/" --mysql-host "localhost" --mysql-username "root" --mysql-passwd "password" --mysql-dbname "uspto")\n (Example syntax to create USPC tables: python parser_wrapper.py --uspc-create 1 --uspc-input-dir "c:/master_classfiles/")\n (Example syntax for USPC upload to MySQL: python parser_wrapper.py --uspc-upload 1 --uspc-upload-dir "c:/master_classfiles" --mysql-host .. --mysql-username .. --mysql-passwd .. --uspc-appdb app_smalltest --uspc-patdb grant_smalltest)' )
 parser.add_argument('--input-dir',help='Full path to directory where all patent raw files are located (TXT or XML format; as downloaded from Google Patents or ReedTech).')
 parser.add_argument('--output-dir',help='Full path to directory where to write all output csv files.')
-parser.add_argument('--period',default="5",choices=['1','2', '3'],help='Enter 1 for 1976-2001 or 2 for 2002-2004 or 3 for 2005.')
+parser.add_argument('--period',default="5",choices=['1','2', '3', '4'],help='Enter 1 for 1976-2001 or 2 for 2002-2004 or 3 for 2005, or 4 to detect the format of every input file and parse a directory that mixes them. With 4 each format is written to a subdirectory of --output-dir named after it (1976-2001, 2002-2004, 2005).')
+parser.add_argument('--processes',default="1",help='Number of worker processes for parsing the weekly files (2005+) or the archives (1976-2001, and every format with --period 4) in parallel. Each worker writes its own csv shards which are merged at the end.')
+parser.add_argument('--flush-rows',default=str(FLUSH_ROWS),help='Number of rows each output table buffers before writing them out (2005+ only).')
+parser.add_argument('--gzip',default="0",choices=['1','0'],help='Enter 1 to write gzipped csv files (table.csv.gz) instead of plain ones (2005+ only).')
+parser.add_argument('--parquet',default="0",choices=['1','0'],help='Enter 1 to write Parquet files (table.parquet) with typed columns instead of csv files (2005+ only, needs pyarrow). csv_to_mysql reads them as well.')
+parser.add_argument('--load-data',default="0",choices=['1','0'],help='Enter 1 to stream the parsed rows straight into MySQL with LOAD DATA LOCAL INFILE instead of writing csv files (2005+ only). Needs the MySQL connection data; the tables must already exist in --mysql-dbname. The rows get the cleanup of --mysql (entities, quotes, ids already in rawlocation, mainclass and subclass), but duplicate patents cannot be merged in a stream: the load stops at a patent number seen before, use --mysql for such input.')
 parser.add_argument('--mysql',default="0",choices=['1','0'],required=False,help='If you want to upload resultant files into MySQL - please specify "1" here and MySQL output-dir and connection data.')
 parser.add_argument('--mysql-input-dir',help="Full path to directory with all output csv files to process for further upload to MySQL.")
 parser.add_argument('--mysql-output-dir',help="Full path to directory with all output csv files to upload to MySQL. SHOULD BE DIFFERENT THAN MYSQL_INPUT_DIR!!")
@@ -13,6 +19,7 @@ parser.add_argument('--mysql-host',help="Specify MySQL host.")
 parser.add_argument('--mysql-username',help="Specify MySQL username.")
 parser.add_argument('--mysql-passwd',help="Specify MySQL password.")
 parser.add_argument('--mysql-dbname',help="Specify MySQL database name.")
+parser.add_argument('--upload-threads',default=str(csv_to_mysql.UPLOAD_THREADS),help="Number of tables uploaded to MySQL, and of their indexes rebuilt, at the same time.")
 parser.add_argument('--uspc-create',default='0',choices=['1','0'],help='You have to enter 1 if you want to create USPC tables to upload: uspc, mainclass, subclass')
 parser.add_argument('--uspc-input-dir',help="Full path to directory where classification master files sit - these should be ctaf....txt and mcfpat....txt. Output directory will be the same as this input one.")
 parser.add_argument('--uspc-upload',default='0',choices=['1','0'],help="Please enter 1 if you want to upload classification tables to MySQL DB after processing them")
@@ -24,6 +31,7 @@ parser.add_argument('--cpc-input-dir',help="Full path to directory where classif
 parser.add_argument('--cpc-classdata-dir',help="Full path to directory where CPC classification master files sit - these should be downloaded and unzipped from http://www.cooperativepatentclassification.org/cpcSchemeAndDefinitions/Bulk.html. Output directory will be the same as cpc-input-dir.")
 parser.add_argument('--cpc-upload',default='0',choices=['1','0'],help="Please enter 1 if you want to upload CPC classification tables to MySQL DB after processing them")
 parser.add_argument('--cpc-upload-dir',help="Full path to directory where processed CPC classification files would be downloaded and used")
+parser.add_argument('--cpc-incremental',default='0',choices=['1','0'],help="Enter 1 to only replace the cpc_current rows of the patents whose CPC classifications changed since the last CPC upload, instead of reloading the whole table")
 parser.add_argument('--merge-db',default='0',choices=['1','0'],help="Please enter 1 if you want to merge DBs to speed up the PatentsProcessor")
 parser.add_argument('--sourcedb',help="Please provide what DBs you want to merge, comma-separate list, e.g. app_smalltest_1,app_smalltest2,app_smalltest3,etc.")
 parser.add_argument('--targetdb',help="Please provide name of target DB")
@@ -33,17 +41,26 @@ parser.add_argument('--nber-upload-dir',help="Full path to directory where proce
 params = parser.parse_args()
 
 if int(params.period) == 1:
-    generic_parser_1976_2001.parse_patents(params.input_dir,params.output_dir)
+    generic_parser_1976_2001.parse_patents(params.input_dir,params.output_dir,int(params.processes))
 
 elif int(params.period) == 2:
     generic_parser_2002_2004.parse_patents(params.input_dir,params.output_dir)
 
 elif int(params.period) ==3:
-    generic_parser_2005.parse_patents(params.input_dir,params.output_dir)
+    connect = None
+    if int(params.load_data) == 1:
+        connect = mysql_connector(params.mysql_host,params.mysql_username,params.mysql_passwd,params.mysql_dbname)
+    generic_parser_2005.parse_patents(params.input_dir,params.output_dir,int(params.processes),int(params.flush_rows),int(params.gzip) == 1,connect,int(params.parquet) == 1)
 
-elif int(params.mysql) == 1 and int(params.period) not in range(1,4):
+elif int(params.period) == 4:
+    connect = None
+    if int(params.load_data) == 1:
+        connect = mysql_connector(params.mysql_host,params.mysql_username,params.mysql_passwd,params.mysql_dbname)
+    parse_engine.parse_patents(params.input_dir,params.output_dir,int(params.processes),int(params.flush_rows),int(params.gzip) == 1,connect,int(params.parquet) == 1)
+
+elif int(params.mysql) == 1 and int(params.period) not in range(1,5):
     csv_to_mysql.mysql_upload(params.mysql_host,params.mysql_username,params.mysql_passwd,params.mysql_dbname,params.mysql_input_dir,params.mysql_output_dir)
-    csv_to_mysql.upload_csv(params.mysql_host,params.mysql_username,params.mysql_passwd,params.mysql_dbname,params.mysql_output_dir)
+    csv_to_mysql.upload_csv(params.mysql_host,params.mysql_username,params.mysql_passwd,params.mysql_dbname,params.mysql_output_dir,threads=int(params.upload_threads))
 
 elif int(params.uspc_create) == 1 and int(params.period) not in range(1,3):
     uspc_table.uspc_table(params.uspc_input_dir)
@@ -56,7 +73,7 @@ elif int(params.uspc_upload) == 1 and int(params.period) not in range(1,3):
     csv_to_mysql.upload_uspc(params.mysql_host,params.mysql_username,params.mysql_passwd,params.appdb,params.patdb,params.uspc_upload_dir)
 
 elif int(params.cpc_upload) == 1 and int(params.period) not in range(1,3):
-    csv_to_mysql.upload_cpc(params.mysql_host,params.mysql_username,params.mysql_passwd,params.appdb,params.patdb,params.cpc_upload_dir)
+    csv_to_mysql.upload_cpc(params.mysql_host,params.mysql_username,params.mysql_passwd,params.appdb,params.patdb,params.cpc_upload_dir,int(params.cpc_incremental) == 1)
 
 elif int(params.merge_db) == 1 and int(params.period) not in range(1,3):
     merge_db_script.merge_db_pats(params.mysql_host,params.mysql_username,params.mysql_passwd,params.sourcedb,params.targetdb)
@@ -0,0 +1,69 @@
+import os
+import re
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SOURCE = os.path.join(HERE, 'htmlentities')
+TARGET = os.path.join(HERE, 'entity_table.py')
+
+HEADER = '''# Generated by build_entity_table.py from the htmlentities file. Do not edit by hand;
+# change htmlentities and run "python build_entity_table.py" instead.
+
+# entity name -> replacement text for the named entities used in USPTO full text
+ENTITIES = {
+'''
+
+
+def read_entities(path=SOURCE):
+    """
+    Read the htmlentities file into a dict of entity name -> unicode text.
+
+    Each line holds the entity name, its numeric reference and two quoted
+    renderings, e.g.
+      "&AElig;"    "&#x00C6;" -- 'X'  'X'
+    The last rendering is the replacement text. Lines that cannot be read are
+    skipped, and so are numeric references, which unescaping handles on its own.
+    """
+    entities = {'apos': u"'"}
+    with open(path, 'rb') as infile:
+        lines = infile.read().decode('utf-8').split('\n')
+    for e in lines:
+        define = re.search(u"(?<=\\s\\s').*?$", e)
+        if define is None:
+            continue
+        for name in (e[3:15], e[15:24]):
+            name = re.sub(u'\\s+|"|;|&', u'', name)
+            if name and not name.startswith(u'#'):
+                entities[str(name)] = define.group()[:-1]
+    return entities
+
+
+def quote(text):
+    """
+    Python source for a unicode literal that reads the same in Python 2 and 3.
+    """
+    out = []
+    for ch in text:
+        if ch in u"\\'" or not u' ' <= ch <= u'~':
+            out.append('\\u%04x' % ord(ch) if ord(ch) < 0x10000 else '\\U%08x' % ord(ch))
+        else:
+            out.append(str(ch))
+    return "u'" + ''.join(out) + "'"
+
+
+def write_table(entities, path=TARGET):
+    with open(path, 'w') as outfile:
+        outfile.write(HEADER)
+        for name in sorted(entities):
+            outfile.write("    '%s': %s,\n" % (name, quote(entities[name])))
+        outfile.write('}\n')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2:
+        print("Usage: python {} {}".format(sys.argv[0], "[HTMLENTITIES FILE]"))
+        sys.exit(1)
+    source = sys.argv[1] if len(sys.argv) == 2 else SOURCE
+    entities = read_entities(source)
+    write_table(entities)
+    print("Wrote {} entities to {}".format(len(entities), TARGET))
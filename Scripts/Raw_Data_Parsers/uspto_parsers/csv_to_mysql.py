@@ -1,40 +1,212 @@
 import csv
 import MySQLdb
-import re,os,random,string,codecs
+import MySQLdb.cursors
+import numpy as np
+import re,os,random,string,codecs,itertools,threading,time,hashlib
+from multiprocessing.pool import ThreadPool
+from external_sort import external_sort
+from html_entities import unescape
+from output_sinks import mysql_connector
 from warnings import filterwarnings
 filterwarnings('ignore', category = MySQLdb.Warning) #comment this out for verbose warnings
 
-def mysql_upload(host,username,password,dbname,folder,output_folder):
-    inp = open(os.path.join(folder,'patent.csv'),'rb').read().decode('utf-8','ignore').split("\r\n")
-    del inp[0]
-    del inp[-1]
-    duplicates = {}
-    allpatents = {}
-    mergersid = {}
-    seconddupl = {}
-    secondmerg = {}
-    for n in range(len(inp)-1):
-        try:
-            gg = allpatents[inp[n].split("\t")[2]]
-            try:
-                duplicates[gg].append(inp[n].split("\t")[0])
-                seconddupl[inp[n].split("\t")[0]] = gg
-            except:
-                duplicates[gg] = [inp[n].split("\t")[0]]
-                seconddupl[inp[n].split("\t")[0]] = gg
-        except:
-            allpatents[inp[n].split("\t")[2]] = inp[n].split("\t")[0]
-        
-        if inp[n+1].split('\t')[2] == "NULL":
-            try:
-                mergersid[runnums].append(inp[n+1].split("\t")[0])
-                secondmerg[inp[n+1].split("\t")[0]] = runnums
-            except:
-                mergersid[runnums] = [inp[n+1].split("\t")[0]]
-                secondmerg[inp[n+1].split("\t")[0]] = runnums
+# bytes read from a parser csv file at once
+CHUNK_SIZE = 1 << 20
+# rows PatentMerges.resolve looks up at once
+BATCH_SIZE = 100000
+# tables upload_csv loads, and indexes it rebuilds, at the same time
+UPLOAD_THREADS = 4
+# statements that rebuild the indexes upload_csv drops, in the folder it loads, until they are rebuilt
+INDEX_FILE = 'upload_indexes.sql'
+
+def iter_records(filename,errors='strict'):
+    """
+    The records of a parser csv file, one at a time, as unicode. The file is
+    read in chunks and split on the \\r\\n the parsers end rows with (fields
+    may hold a bare \\n). As when the whole file was split, text after the
+    last \\r\\n is not a record.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors)
+    rest = u''
+    with open(filename,'rb') as infile:
+        while True:
+            chunk = infile.read(CHUNK_SIZE)
+            records = (rest + decoder.decode(chunk,not chunk)).split(u'\r\n')
+            rest = records.pop()
+            for record in records:
+                yield record
+            if not chunk:
+                break
+
+def read_csv(filename,unescape_entities=True):
+    """
+    Header and rows of a parser csv file. The rows are a generator of lists
+    of utf-8 strings, with the entities unescaped record by record. Without
+    unescaping, bytes that are not utf-8 are dropped instead of failing.
+    """
+    records = iter_records(filename,'strict' if unescape_entities else 'ignore')
+    head = next(records,u'')
+    if unescape_entities:
+        head = unescape(head)
+        records = (unescape(r) for r in records)
+    return head.split('\t'), (r.encode('utf-8','ignore').split('\t') for r in records)
+
+def read_parquet(filename):
+    """
+    Read a table the parser wrote with --parquet. Returns the header and the
+    rows as lists of utf-8 strings, the way mysql_upload reads the csv files:
+    entities are unescaped and nulls come back as "NULL". The rows are a
+    generator that reads one row group at a time.
+    """
+    import pyarrow.parquet
+    import pyarrow.types
+    parquet_file = pyarrow.parquet.ParquetFile(filename)
+    schema = parquet_file.schema.to_arrow_schema()
+    strings = [pyarrow.types.is_string(field.type) for field in schema]
+
+    def rows():
+        for g in range(parquet_file.num_row_groups):
+            table = parquet_file.read_row_group(g)
+            columns = []
+            for n in range(table.num_columns):
+                values = table.column(n).to_pylist()
+                if strings[n]:
+                    values = ['NULL' if v is None else unescape(v).encode('utf-8','ignore') for v in values]
+                else:
+                    values = ['NULL' if v is None else str(v) for v in values]
+                columns.append(values)
+            for row in zip(*columns):
+                yield list(row)
+    return schema.names, rows()
+
+def read_table(folder,d,unescape_entities=True):
+    """
+    Header and rows of the parsed table file d in folder, a csv file or a Parquet one.
+    """
+    if d.endswith('.parquet'):
+        return read_parquet(os.path.join(folder,d))
+    return read_csv(os.path.join(folder,d),unescape_entities)
+
+def batches(rows,size=BATCH_SIZE):
+    """
+    The rows in lists of up to size rows
+    """
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows,size))
+        if not batch:
+            break
+        yield batch
+
+def fill_nulls(target,row):
+    """
+    Set the NULL values of target to the values of row
+    """
+    for nu in range(min(len(target),len(row))):
+        if target[nu] == "NULL":
+            target[nu] = row[nu]
+
+class PatentMerges(object):
+    """
+    Duplicate and merged patents, from one pass over the patent rows.
+    A patent whose number (column 2) was seen before is a duplicate of the
+    first patent with that number; a patent without a number (NULL) is merged
+    into the last patent before it that has one. The rows of the other tables
+    are folded into the rows of those first patents by resolve().
+    """
+
+    def __init__(self,rows):
+        self.duplicates = {}
+        self.seconddupl = {}
+        self.mergersid = {}
+        self.secondmerg = {}
+        allpatents = {}
+        runnums = None
+        prev = None
+        # as before, the last row is not checked for duplicates and the first not for mergers
+        for row in rows:
+            if prev is not None:
+                if prev[2] in allpatents:
+                    gg = allpatents[prev[2]]
+                    self.duplicates.setdefault(gg,[]).append(prev[0])
+                    self.seconddupl[prev[0]] = gg
+                else:
+                    allpatents[prev[2]] = prev[0]
+                if row[2] == "NULL":
+                    self.mergersid.setdefault(runnums,[]).append(row[0])
+                    self.secondmerg[row[0]] = runnums
+                else:
+                    runnums = row[0]
+            prev = row
+        # every patent id with rows to fold, sorted for np.in1d
+        ids = set(self.duplicates)|set(self.seconddupl)|set(self.mergersid)|set(self.secondmerg)
+        ids.discard(None)
+        self.ids = np.array(sorted(ids),dtype=str)
+
+    def fold(self,row,pid,duplicdata,mergersdata):
+        """
+        Fold row, of patent pid, into the rows kept for duplicate and merged
+        patents, in the order resolve() always tried them. Returns False if
+        the row is not folded and is written as it is.
+        """
+        if pid in self.duplicates:
+            duplicdata[pid] = row
+        elif self.seconddupl.get(pid) in duplicdata:
+            fill_nulls(duplicdata[self.seconddupl[pid]],row)
+        elif pid in self.mergersid:
+            mergersdata[pid] = row
+        elif self.secondmerg.get(pid) in mergersdata:
+            fill_nulls(mergersdata[self.secondmerg[pid]],row)
         else:
-            runnums = inp[n+1].split("\t")[0]
-    
+            return False
+        return True
+
+    def resolve(self,rows,idelem,existing=None):
+        """
+        The rows of a table to write: rows of duplicate and merged patents fill
+        the NULL values of the row of the patent they belong to, which comes
+        out after all others. Rows whose id (column 0) is in existing, the
+        sorted lower case ids already in the database, are left out.
+        The rows are looked up in batches: one np.in1d over the patent ids of
+        a batch finds the few rows to fold, another the rows in existing.
+        """
+        duplicdata = {}
+        mergersdata = {}
+        for batch in batches(rows):
+            batch = [[item.replace('"',"'") for item in i] for i in batch]
+            keep = np.ones(len(batch),dtype=bool)
+            if idelem is not None and len(self.ids):
+                pids = np.array([i[idelem] if len(i) > idelem else '' for i in batch],dtype=str)
+                for n in np.flatnonzero(np.in1d(pids,self.ids)):
+                    keep[n] = not self.fold(batch[n],pids[n],duplicdata,mergersdata)
+            if existing is not None and len(existing):
+                ids = np.char.lower(np.array([i[0] for i in batch],dtype=str))
+                keep &= ~np.in1d(ids,existing)
+            for n in np.flatnonzero(keep):
+                yield batch[n]
+        for v in mergersdata.values():
+            yield v
+        for v in duplicdata.values():
+            yield v
+
+def existing_ids(cursor,tablename):
+    """
+    The ids in a table of the database, in lower case, as a sorted array of utf-8 strings
+    """
+    cursor.execute('select id from '+tablename)
+    return np.unique(np.array([f[0].lower().encode('utf-8') for f in cursor.fetchall()],dtype=str))
+
+def mysql_upload(host,username,password,dbname,folder,output_folder):
+    """
+    Prepare the parsed tables in folder for upload_csv: every table is streamed
+    from its file through the unescaping and the merging of duplicate and
+    merged patents into a csv file in output_folder, so memory holds only the
+    rows of those patents and the ids of the lookup tables, not whole tables.
+    """
+    # the parser writes either csv or, with --parquet, Parquet files
+    ext = '.parquet' if os.path.isfile(os.path.join(folder,'patent.parquet')) else '.csv'
+    merges = PatentMerges(read_table(folder,'patent'+ext,unescape_entities=False)[1])
+
     mydb = MySQLdb.connect(host=host,
         user=username,
         passwd=password,
@@ -42,136 +214,30 @@ def mysql_upload(host,username,password,dbname,folder,output_folder):
         charset='utf8',
         use_unicode=True)
     cursor = mydb.cursor()
-    
-    #Empty the allpatents container to free up memory - not needed any more
-    allpatents = {}
-    
-    
-    duplicdata = {}
-    mergersdata = {}
-    diri = [f for f in os.listdir(folder) if os.path.isfile(os.path.join(folder,f))] # gets only files, not folders
-    del diri[diri.index('patent.csv')]
-    diri.insert(0,'patent.csv')
-    del diri[diri.index('rawlocation.csv')]
-    diri.insert(2,'rawlocation.csv')
-    
-    rawlocchek = {}
-    cursor.execute('select id from rawlocation')
-    locids = [f[0] for f in cursor.fetchall()]
-    for l in locids:
-        rawlocchek[l.lower()] = 1
-    
-    mainclasschek = {}
-    cursor.execute('select id from mainclass')
-    locids = [f[0] for f in cursor.fetchall()]
-    for l in locids:
-        mainclasschek[l.lower()] = 1
-    
-    subclasschek = {}
-    cursor.execute('select id from subclass')
-    locids = [f[0] for f in cursor.fetchall()]
-    for l in locids:
-        subclasschek[l.lower()] = 1
-    
-    #Initiate HTML Parser for unescape characters
-    import HTMLParser
-    h = HTMLParser.HTMLParser()
-    
+
+    diri = [f for f in os.listdir(folder) if os.path.isfile(os.path.join(folder,f)) and f.endswith(ext)] # gets only files, not folders
+    del diri[diri.index('patent'+ext)]
+    diri.insert(0,'patent'+ext)
+    del diri[diri.index('rawlocation'+ext)]
+    diri.insert(2,'rawlocation'+ext)
+
+    # rows already in these tables of the database are not written again
+    existing = {}
+    for tablename in ['rawlocation','mainclass','subclass']:
+        existing[tablename] = existing_ids(cursor,tablename)
+
     for d in diri:
-        infile = h.unescape(codecs.open(os.path.join(folder,d),'rb',encoding='utf-8').read()).split('\r\n')
-        outp = csv.writer(open(os.path.join(output_folder,d),'wb'),delimiter='\t')
-        #head = infile.next()
-        head = infile[0].split('\t')
-        del infile[0]
-        del infile[-1]
-        nullid = None
-        duplicdata = {}
-        mergersdata = {}
-        if d == "patent.csv":
+        head, infile = read_table(folder,d)
+        tablename = d[0:d.index('.')]
+        if tablename == "patent":
             idelem = 0
         else:
             try:
                 idelem = head.index('patent_id')
             except:
                 idelem = None
-        # if d == 'rawassignee.csv' or d == 'rawinventor.csv':
-        #     nullid = 2
-        # if d == 'rawlawyer.csv' or d == 'rawlocation.csv':
-        #     nullid = 1
-        checkifexists = None
-        if d == 'rawlocation.csv':
-            checkifexists = 1
-        if d == 'mainclass.csv':
-            checkifexists = 2
-        if d == "subclass.csv":
-            checkifexists = 3
-        tablename = d[0:d.index('.')]
-        numRows = 0
-        for i in infile:
-            i = i.encode('utf-8','ignore')
-            i = i.split('\t')
-            towrite = [item.replace('"',"'") for item in i]
-            if nullid:
-                towrite[nullid] = 'NULL'
-            try:
-                gg = duplicates[i[idelem]]
-                duplicdata[i[idelem]] = towrite  
-            except:
-                try:
-                    gg = seconddupl[i[idelem]]
-                    for nu in range(len(duplicdata[gg])):
-                        if duplicdata[gg][nu] == "NULL":
-                            duplicdata[gg][nu] = towrite[nu]
-                except:
-                    try:
-                        gg = mergersid[i[idelem]]
-                        mergersdata[i[idelem]] = towrite  
-                    except:
-                        try:
-                            gg = secondmerg[i[idelem]]
-                            for nu in range(len(mergersdata[gg])):
-                                if mergersdata[gg][nu] == "NULL":
-                                    mergersdata[gg][nu] = towrite[nu]
-                        except:
-                            if checkifexists:
-                                try:
-                                    if checkifexists == 1:
-                                        gg = rawlocchek[towrite[0].lower()]
-                                    if checkifexists == 2:
-                                        gg = mainclasschek[towrite[0].lower()]
-                                    if checkifexists == 3:
-                                        gg = subclasschek[towrite[0].lower()]
-                                except:
-                                    outp.writerow(towrite)
-                                    #query = """insert into """+tablename+""" values ("""+'"'+'","'.join(towrite)+'")'
-                                    #query = query.replace(',"NULL"',",NULL")
-                                    #cursor.execute(query)
-                            else:
-                                outp.writerow(towrite)
-                                #query = """insert into """+tablename+""" values ("""+'"'+'","'.join(towrite)+'")'
-                                #query = query.replace(',"NULL"',",NULL")
-                                #query = query.replace(',""',',NULL')
-                                #query = query.replace('\\','\\\\')
-                                #cursor.execute(query)
-            numRows += 1
-            #if numRows % 10000 == 0:
-            #    print d, numRows
-            #    mydb.commit()
-
-        for v in mergersdata.values():
-            outp.writerow(v)
-            #query = """insert into """+tablename+""" values ("""+'"'+'","'.join(v)+'")'
-            #query = query.replace(',"NULL"',",NULL")
-            #cursor.execute(query)
-        
-        for v in duplicdata.values():
-            outp.writerow(v)
-            #query = """insert into """+tablename+""" values ("""+'"'+'","'.join(v)+'")'
-            #query = query.replace(',"NULL"',",NULL")
-            #cursor.execute(query)
-
-        #print d, numRows
-        #mydb.commit()
+        with open(os.path.join(output_folder,tablename+'.csv'),'wb') as outfile:
+            csv.writer(outfile,delimiter='\t').writerows(merges.resolve(infile,idelem,existing.get(tablename)))
 
 def is_after_2015(patent_id):
     '''determine if a patent is from after 2015 based on sequential numbering, cutoffs determined empirically '''
@@ -192,56 +258,243 @@ def is_after_2015(patent_id):
             print patent_id
             return False
 
-def upload_csv(host,username,password,dbname,folder, file = None, tablename = None):
-    mydb = MySQLdb.connect(host=host,
-        user=username,
-        passwd=password,
-        db=dbname,
-        charset='utf8',
-        use_unicode=True)
-    cursor = mydb.cursor()
+report_lock = threading.Lock()
+
+def report(message):
+    """
+    Print a progress line, from any of the loader threads
+    """
+    with report_lock:
+        print message
+
+def secondary_indexes(cursor,tablename):
+    """
+    The non-unique secondary indexes of a table, as a list of (name, kind,
+    columns) with the columns ready for ALTER TABLE ... ADD INDEX. The
+    primary key and the unique indexes are left out: LOAD DATA LOCAL skips
+    rows with duplicate keys, which only works while they are in place.
+    """
+    cursor.execute('show index from '+tablename)
+    indexes = {}
+    for f in cursor.fetchall():
+        non_unique,key_name,seq,column,sub_part,index_type = f[1],f[2],f[3],f[4],f[7],f[10]
+        if key_name == 'PRIMARY' or int(non_unique) == 0:
+            continue
+        kind = index_type if index_type in ('FULLTEXT','SPATIAL') else ''
+        part = None if column is None else '`'+column+'`'+('('+str(sub_part)+')' if sub_part else '')
+        indexes.setdefault(key_name,[kind,{}])[1][int(seq)] = part
+    result = []
+    for key_name in sorted(indexes):
+        kind,parts = indexes[key_name]
+        # indexes on expressions have no column name and cannot be rebuilt from show index, they stay
+        if None not in parts.values():
+            result.append((key_name,kind,', '.join(parts[seq] for seq in sorted(parts))))
+    return result
+
+def index_statements(tablename,indexes):
+    """
+    The ALTER TABLE statements that add indexes, (name, kind, columns) as
+    secondary_indexes gives them, to a table. The ordinary indexes are added
+    in one statement, so the table is read once; InnoDB adds a FULLTEXT index
+    only on its own.
+    """
+    clauses = ['add '+(kind+' ' if kind else '')+'index `'+name+'` ('+columns+')' for name,kind,columns in indexes if kind != 'FULLTEXT']
+    statements = ['alter table '+tablename+' '+', '.join(clauses)] if clauses else []
+    statements += ['alter table '+tablename+' add FULLTEXT index `'+name+'` ('+columns+')' for name,kind,columns in indexes if kind == 'FULLTEXT']
+    return statements
+
+def write_index_file(path,tables):
+    """
+    Write the statements that rebuild the indexes of tables, (tablename,
+    indexes) pairs, to path before any of them is dropped, so that they can
+    be run by hand should the upload die before it rebuilds them. There is
+    one statement per index, as not every index may have been dropped.
+    """
+    with open(path,'w') as outfile:
+        outfile.write('-- indexes upload_csv drops for loading, rebuild them with these statements if it did not finish;\n')
+        outfile.write('-- those of indexes that are still there fail with a duplicate key name\n')
+        for tablename,indexes in tables:
+            for index in indexes:
+                outfile.write(index_statements(tablename,[index])[0]+';\n')
+    report('Wrote the statements that rebuild the dropped indexes to '+path)
+
+def drop_indexes(cursor,tablename,indexes):
+    """
+    Drop indexes, secondary_indexes of a table, for loading it, and return
+    those that were dropped. An index a foreign key needs stays.
+    """
+    dropped = []
+    for index in indexes:
+        try:
+            cursor.execute('alter table '+tablename+' drop index `'+index[0]+'`')
+            dropped.append(index)
+        except MySQLdb.OperationalError as e:
+            report('Keeping index '+index[0]+' of '+tablename+': '+str(e))
+    return dropped
+
+def add_indexes(connect,tablename,indexes):
+    """
+    Build those of indexes, secondary_indexes of a table before the load,
+    that the table does not have, over a connection of its own: the ones
+    drop_indexes dropped, also when it stopped halfway.
+    """
+    start = time.time()
+    mydb = connect()
+    try:
+        cursor = mydb.cursor()
+        present = set(index[0] for index in secondary_indexes(cursor,tablename))
+        missing = [index for index in indexes if index[0] not in present]
+        for statement in index_statements(tablename,missing):
+            cursor.execute(statement)
+    finally:
+        mydb.close()
+    report('Indexed '+tablename+': '+str(len(missing))+' indexes in %.1f s' % (time.time()-start))
+
+def load_table(connect,tablename,path):
+    """
+    LOAD DATA a csv file into a table over a connection of its own, with
+    foreign key checks off so tables can be loaded in any order.
+    """
+    start = time.time()
+    mydb = connect()
+    try:
+        cursor = mydb.cursor()
+        cursor.execute('set foreign_key_checks = 0')
+        cursor.execute("load data local infile '"+path+"' into table "+tablename+" fields terminated by '\t' optionally enclosed by '\"' lines terminated by '\r\n' ignore 1 lines")
+        mydb.commit()
+        rows = cursor.rowcount
+    finally:
+        mydb.close()
+    report('Loaded '+tablename+': '+str(rows)+' rows in %.1f s' % (time.time()-start))
+
+def run_parallel(func,jobs,threads):
+    """
+    Call func(connect, tablename, ...) for every job, in threads threads,
+    wait for all of them, and raise the first error afterwards.
+    """
+    def call(job):
+        try:
+            func(*job)
+        except Exception as e:
+            report(func.__name__+' '+job[1]+' failed: '+str(e))
+            return e
+    pool = ThreadPool(max(1,min(threads,len(jobs))))
+    try:
+        errors = [e for e in pool.map(call,jobs,chunksize=1) if e is not None]
+    finally:
+        pool.close()
+        pool.join()
+    if errors:
+        raise errors[0]
+
+def upload_csv(host,username,password,dbname,folder, file = None, tablename = None, threads = UPLOAD_THREADS):
+    """
+    LOAD DATA the csv files in folder into the tables named after them, or
+    only folder/file into tablename. The tables are loaded in parallel over
+    threads connections. Their non-unique secondary indexes are dropped
+    before and rebuilt in parallel after the load, which is much faster than
+    updating them row by row. Until they are rebuilt, the statements that
+    rebuild them are kept in folder/INDEX_FILE.
+    """
+    connect = mysql_connector(host,username,password,dbname)
+    index_file = os.path.join(folder,INDEX_FILE)
+    if os.path.exists(index_file):
+        raise RuntimeError(index_file+' is left by an upload that did not rebuild its indexes, run its statements and delete it')
     if not file:
         diri = [f for f in os.listdir(folder) if os.path.isfile(os.path.join(folder,f))] # gets only files, not folders
-        for d in diri:
-            cursor.execute("load data local infile '"+os.path.join(folder,d)+"' into table "+d.replace('.csv','')+" fields terminated by '\t' lines terminated by '\r\n' ignore 1 lines")
-    if file:
-        file_name = folder + "/" + file
-        cursor.execute("load data local infile '"+file_name +"' into table "+tablename+" fields terminated by '\t' lines terminated by '\r\n' ignore 1 lines")
-    mydb.commit()
-    
+        tables = [(os.path.join(folder,d),d.replace('.csv','')) for d in diri]
+    else:
+        tables = [(folder + "/" + file,tablename)]
+    # largest tables first, so the longest load does not start last
+    tables.sort(key=lambda t: os.path.getsize(t[0]),reverse=True)
+    mydb = connect()
+    try:
+        cursor = mydb.cursor()
+        indexed = [(t,secondary_indexes(cursor,t)) for path,t in tables]
+    finally:
+        mydb.close()
+    indexed = [(t,indexes) for t,indexes in indexed if indexes]
+    write_index_file(index_file,indexed)
+    try:
+        mydb = connect()
+        try:
+            cursor = mydb.cursor()
+            for t,indexes in indexed:
+                drop_indexes(cursor,t,indexes)
+        finally:
+            mydb.close()
+        run_parallel(load_table,[(connect,t,path) for path,t in tables],threads)
+    finally:
+        # the indexes come back even when a drop or a load failed; the file stays if they do not
+        run_parallel(add_indexes,[(connect,t,indexes) for t,indexes in indexed],threads)
+        os.remove(index_file)
+
+def sorted_groups(rows,key,name):
+    """
+    The rows grouped by key, as (key, rows) pairs, for merge_join. The rows
+    must be sorted by key. upload_uspc sorts both of its inputs in utf-8 byte
+    order, so the ValueError, which names the input, name, is raised only if
+    MySQL and Python stop agreeing on that order.
+    """
+    previous = None
+    for k,group in itertools.groupby(rows,key):
+        if previous is not None and k < previous:
+            raise ValueError(name+' is not sorted: '+str(k)+' after '+str(previous))
+        previous = k
+        yield k,group
+
+def merge_join(left,right):
+    """
+    Join two sorted_groups on their keys, yielding (key, left rows, right
+    rows) for every key in both. Only the current group of each side is
+    read, and the rows must be used before the next pair is taken.
+    """
+    l = next(left,None)
+    r = next(right,None)
+    while l is not None and r is not None:
+        if l[0] < r[0]:
+            l = next(left,None)
+        elif r[0] < l[0]:
+            r = next(right,None)
+        else:
+            yield l[0],l[1],r[1]
+            l = next(left,None)
+            r = next(right,None)
 
 def upload_uspc(host,username,password,appdb,patdb,folder):
     
     def id_generator(size=25, chars=string.ascii_lowercase + string.digits):
         return ''.join(random.choice(chars) for _ in range(size))
     
-    mydb = MySQLdb.connect(host=host,
-        user=username,
-        passwd=password, db=patdb)
+    mydb = mysql_connector(host,username,password,patdb)()
     cursor = mydb.cursor()
-    # Get all patent numbers in the current database not to upload full USPC table going back to 19th century
-    cursor.execute('select id,number from '+patdb+'.patent')
-    patnums = {}
-    for field in cursor.fetchall():
-        patnums[field[1]] = field[0]
+    # Only patents in the current database get their classifications, not to upload full USPC table going back to 19th
+    # century. The patents, read in number order with a server side cursor, are merge joined with the classification
+    # file, sorted by number with external_sort, so neither is held in memory. Both sides are ordered by the utf-8
+    # bytes of the number: MySQL by the number converted to utf8mb4 and cast to binary, whatever the collation of the
+    # column, and Python by the bytes of the csv file and the encoded numbers of the patents.
+    patdb_stream = mysql_connector(host,username,password,patdb)()
+    patents = patdb_stream.cursor(MySQLdb.cursors.SSCursor)
+    patents.execute('select id,number from '+patdb+'.patent order by cast(convert(number using utf8mb4) as binary)')
     #Create USPC table off full master classification list
-    uspc_full = csv.reader(file(os.path.join(folder,'USPC_patent_classes_data.csv'),'rb'))
+    uspc_full = external_sort(csv.reader(file(os.path.join(folder,'USPC_patent_classes_data.csv'),'rb')),lambda m: m[0])
     errorlog = open(os.path.join(folder,'upload_error_patents.log'),'w')
-    current_exist = {}
-    for_csv_list =[]
+    uspc_current_out = open(os.path.join(folder, "uspc_current.csv"), 'wb')
+    uspc_current_file = csv.writer(uspc_current_out, delimiter = '\t')
     counter = 0
     counter2 = 0 
-    for m in uspc_full:
-        counter +=1
-        try:
-            gg = patnums[m[0]]
-        except:
-            gg = None
-        if gg:
-            current_exist[m[0]] = 1
+    joined = merge_join(sorted_groups(patents,lambda field: None if field[1] is None else field[1].encode('utf-8'),'patent'),
+                        sorted_groups(uspc_full,lambda m: m[0],'USPC_patent_classes_data.csv'))
+    for number,patent_rows,class_rows in joined:
+        # of patents with the same number the last one gets the classifications, as with the dict of numbers before
+        patent_id = list(patent_rows)[-1][0]
+        if not patent_id:
+            continue
+        for m in class_rows:
+            counter +=1
             towrite = [re.sub('"',"'",item) for item in m]
             towrite.insert(0,id_generator())
-            towrite[1] = gg
+            towrite[1] = patent_id
             for t in range(len(towrite)):
                 try:
                     gg = int(towrite[t])
@@ -254,52 +507,34 @@ def upload_uspc(host,username,password,appdb,patdb,folder):
                 if towrite[3] == '1/1':
                     towrite[3] = "No longer published"
                     towrite[2] = "No longer published"
-            for_csv_list.append(towrite)
-
-    uspc_current_file = csv.writer(open(os.path.join(folder, "uspc_current.csv"), 'wb'), delimiter = '\t')
-    for item in for_csv_list:
-        uspc_current_file.writerow(item)
+            uspc_current_file.writerow(towrite)
+    patdb_stream.close()
+    uspc_current_out.close()
     print "Done writing file"
-    to_upload = folder + "/uspc_current.csv"
-    cursor.execute("load data local infile '"+to_upload+"' into table uspc_current fields terminated by '\t' lines terminated by '\r\n'")
-    mydb.commit()
 
-    patents = set(patnums.keys())
-    current_exists_set = set(current_exist.keys())
-    missed_patents = list(patents - current_exists_set)
-    cursor.execute('select id from mainclass_current')
-    mainclass = set([item[0] for item in cursor.fetchall()])
-    cursor.execute('select id from subclass_current')
-    subclass = set([item[0] for item in cursor.fetchall()])
-    
-    to_add_main = []
-    to_add_sub = []
-    to_add_all = []
-
-    count =0
-    for patent in missed_patents:
-        cursor.execute('select * from uspc where patent_id ="'+str(patent)+'"')
-        datum = cursor.fetchall()
-        count +=1
-        if count%1000 ==0:
-            pass
-            #print str(count)
-        for d in datum:
-            if not d[2] in mainclass:
-                to_add_main.append(d[2])
-            if not d[3] in subclass:
-                to_add_sub.append(d[3])
-            d = list(d)
-            d[-1] = int(d[-1]) #fix the odd pythonic interpretation
-            to_add_all.append(d) 
-
-
-    data = pd.DataFrame(to_add_all)
-    data.columns = ['uuid', 'patent_id', 'mainclass_id', 'subclass_id', 'sequence']
-    data.to_sql(con=mydb, name='uspc_current_to_insert', if_exists='replace', flavor='mysql')
-    cursor.execute('alter table uspc_current_to_insert drop `index`;')
-    cursor.execute('insert into uspc_current select * from uspc_current_to_insert;')
+    # The new table is built next to uspc_current and swapped in at the end, so uspc_current
+    # is complete at any time. Patents the classification file has no rows for keep their rows
+    # from uspc, carried forward in one anti-join instead of a query per patent; distinct, as
+    # patents that share a number would each bring the uspc rows of that number again.
+    to_upload = folder + "/uspc_current.csv"
+    cursor.execute('drop table if exists uspc_current_new, uspc_current_old')
+    swapped = False
+    try:
+        cursor.execute('create table uspc_current_new like uspc_current')
+        cursor.execute("load data local infile '"+to_upload+"' into table uspc_current_new fields terminated by '\t' lines terminated by '\r\n'")
+        cursor.execute('insert into uspc_current_new select distinct u.* from '+patdb+'.patent p join uspc u on u.patent_id = p.number '
+                       'left join (select distinct patent_id from uspc_current_new) n on n.patent_id = p.id '
+                       'where n.patent_id is null')
+        mydb.commit()
+        cursor.execute('rename table uspc_current to uspc_current_old, uspc_current_new to uspc_current')
+        swapped = True
+    finally:
+        # uspc_current is left as it was, without the half-built table next to it
+        if not swapped:
+            cursor.execute('drop table if exists uspc_current_new')
+    cursor.execute('drop table uspc_current_old')
     mydb.commit()
+    print "Done uploading uspc_current"
 
     
     # if appdb:
@@ -367,13 +602,149 @@ def upload_uspc(host,username,password,appdb,patdb,folder):
     #     mydb.commit()
         
 
-def upload_cpc(host,username,password,appdb,patdb,folder):
+# hashes upload_cpc writes, and patents it deletes, at once
+CPC_HASH_BATCH = 1000
+
+def cpc_hash(towrite):
+    """
+    Hash of the classifications of one patent in the CPC master file: its
+    primary and additional CPC groups, as they make up its cpc_current rows.
+    """
+    return hashlib.sha1(towrite[2]+'\t'+towrite[3]).hexdigest()
+
+class CpcHashes(object):
+    """
+    The hashes of the patents loaded into cpc_current of db, kept in
+    cpc_current_hash (created if it does not exist yet). Without incremental
+    they are cleared, as for a full load, which stores them again.
+    idname is the column cpc_current refers to the patents with. A hash is
+    stored only by record, once the rows of the patent are loaded.
+    """
+
+    def __init__(self,cursor,db,idname,incremental):
+        self.cursor = cursor
+        self.db = db
+        self.idname = idname
+        self.pending = []
+        self.forgotten = []
+        cursor.execute('create table if not exists '+db+'.cpc_current_hash (id varchar(20) NOT NULL, hash char(40) NOT NULL, PRIMARY KEY (id)) ENGINE=InnoDB DEFAULT CHARSET=utf8')
+        if incremental:
+            cursor.execute('select id,hash from '+db+'.cpc_current_hash')
+            self.stored = dict(cursor.fetchall())
+        else:
+            cursor.execute('truncate table '+db+'.cpc_current_hash')
+            self.stored = {}
+
+    def changed(self,patent_id,digest):
+        """
+        Whether the classifications of a patent, hashed to digest, are not
+        the ones loaded last time. Nothing is stored.
+        """
+        return self.stored.get(patent_id) != digest
+
+    def record(self,patent_id,digest):
+        """
+        Store the hash of a patent whose rows are loaded, or were already.
+        """
+        if self.stored.pop(patent_id,None) != digest:
+            self.pending.append((patent_id,digest))
+            if len(self.pending) >= CPC_HASH_BATCH:
+                self.flush()
+
+    def forget(self,patent_id):
+        """
+        Delete the hash of a patent whose rows failed to load, so that they
+        are loaded again the next time.
+        """
+        if self.stored.pop(patent_id,None) is not None:
+            self.forgotten.append((patent_id,))
+            if len(self.forgotten) >= CPC_HASH_BATCH:
+                self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.cursor.executemany('replace into '+self.db+'.cpc_current_hash values (%s,%s)',self.pending)
+            self.pending = []
+        if self.forgotten:
+            self.cursor.executemany('delete from '+self.db+'.cpc_current_hash where id = %s',self.forgotten)
+            self.forgotten = []
+
+    def close(self):
+        """
+        Store the remaining hashes, and delete the rows and hashes of the
+        patents that were loaded before but were not seen this time.
+        """
+        self.flush()
+        gone = sorted(self.stored)
+        for n in range(0,len(gone),CPC_HASH_BATCH):
+            ids = '","'.join(gone[n:n+CPC_HASH_BATCH])
+            self.cursor.execute('delete from '+self.db+'.cpc_current where '+self.idname+'_id in ("'+ids+'")')
+            self.cursor.execute('delete from '+self.db+'.cpc_current_hash where id in ("'+ids+'")')
+        self.stored = {}
+
+def insert_cpc_rows(cursor,db,towrite,number,errorlog):
+    """
+    Insert the cpc_current rows of one patent of the CPC master file into db.
+    The rows that fail are written to errorlog; returns whether none did.
+    """
+    inserted = True
+    primaries = towrite[2].split("; ")
+    cpcnum = 0
+    for p in primaries:
+        try:
+            needed = [id_generator(),towrite[1]]+[p[0],p[:3],p[:4],p,'primary',str(cpcnum)]
+            query = """insert into """+db+""".cpc_current values ("""+'"'+'","'.join(needed)+'")'
+            query = query.replace(',"NULL"',",NULL")
+            cursor.execute(query)
+            cpcnum+=1
+        except Exception:
+            print>>errorlog,p+'\t'+' '.join(towrite)+'\t'+number
+            inserted = False
+    additionals = [t for t in towrite[3].split('; ') if t!= '']
+    for p in additionals:
+        try:
+            needed = [id_generator(),towrite[1]]+[p[0],p[:3],p[:4],p,'additional',str(cpcnum)]
+            query = """insert into """+db+""".cpc_current values ("""+'"'+'","'.join(needed)+'")'
+            query = query.replace(',"NULL"',",NULL")
+            cursor.execute(query)
+            cpcnum+=1
+        except Exception:
+            print>>errorlog,p+'\t'+' '.join(towrite)+'\t'+number
+            inserted = False
+    return inserted
+
+def load_cpc_patent(cursor,db,idname,hashes,towrite,digest,number,errorlog,incremental):
+    """
+    Load the cpc_current rows of one patent of the CPC master file into db,
+    if its classifications, hashed to digest, changed. Its hash is recorded
+    only after its rows are all in; if a row fails, its old hash is
+    forgotten instead, so it is loaded again the next time. An error of the
+    delete is raised.
+    """
+    patent_id = towrite[1]
+    if hashes.changed(patent_id,digest):
+        if incremental:
+            cursor.execute('delete from '+db+'.cpc_current where '+idname+'_id = "'+patent_id+'"')
+        if not insert_cpc_rows(cursor,db,towrite,number,errorlog):
+            hashes.forget(patent_id)
+            return
+    hashes.record(patent_id,digest)
+
+def id_generator(size=25, chars=string.ascii_lowercase + string.digits):
+    return ''.join(random.choice(chars) for _ in range(size))
+
+def upload_cpc(host,username,password,appdb,patdb,folder,incremental=False):
+    """
+    Load the CPC master classification files in folder into the CPC tables
+    of appdb and patdb. cpc_current is truncated and reloaded, unless
+    incremental is set: then only the patents whose classifications changed
+    since the last load, by the hashes kept in cpc_current_hash, get their
+    rows deleted and inserted again, and the patents no longer in the
+    master file lose theirs. A full load stores the hashes as well.
+    """
 
     files = ['applications_classes.csv','grants_classes.csv','cpc_subsection.csv','cpc_group.csv','cpc_subgroup.csv']
     
-    def id_generator(size=25, chars=string.ascii_lowercase + string.digits):
-        return ''.join(random.choice(chars) for _ in range(size))
-    
     mydb = MySQLdb.connect(host=host,
         user=username,
         passwd=password)
@@ -394,7 +765,8 @@ def upload_cpc(host,username,password,appdb,patdb,folder):
             cursor.execute('truncate table '+d+'.cpc_subsection')
             cursor.execute('truncate table '+d+'.cpc_group')
             cursor.execute('truncate table '+d+'.cpc_subgroup')
-            cursor.execute('truncate table '+d+'.cpc_current')
+            if not incremental:
+                cursor.execute('truncate table '+d+'.cpc_current')
             cursor.execute('set foreign_key_checks=1')
             mydb.commit() 
     
@@ -477,7 +849,9 @@ def upload_cpc(host,username,password,appdb,patdb,folder):
         uspc_full.next()
         errorlog = open(os.path.join(folder,'upload_error_patents.log'),'w')
         current_exist = {}
+        hashes = CpcHashes(cursor,patdb,'patent',incremental)
         for nnn in range(10000000):
+            patent = None
             try:
                 m = uspc_full.next()
                 good = None
@@ -497,32 +871,15 @@ def upload_cpc(host,username,password,appdb,patdb,folder):
                             towrite[t] = str(int(towrite[t]))
                         except:
                             pass
-                    primaries = towrite[2].split("; ")
-                    cpcnum = 0
-                    for p in primaries:
-                        try:
-                            needed = [id_generator(),towrite[1]]+[p[0],p[:3],p[:4],p,'primary',str(cpcnum)]
-                            query = """insert into """+patdb+""".cpc_current values ("""+'"'+'","'.join(needed)+'")'
-                            query = query.replace(',"NULL"',",NULL")
-                            cursor.execute(query)
-                            cpcnum+=1
-                        except:
-                            print>>errorlog,p+'\t'+' '.join(towrite)+'\t'+m[0]
-                    additionals = [t for t in towrite[3].split('; ') if t!= '']
-                    for p in additionals:
-                        try:
-                            needed = [id_generator(),towrite[1]]+[p[0],p[:3],p[:4],p,'additional',str(cpcnum)]
-                            query = """insert into """+patdb+""".cpc_current values ("""+'"'+'","'.join(needed)+'")'
-                            query = query.replace(',"NULL"',",NULL")
-                            cursor.execute(query)
-                            cpcnum+=1
-                        except:
-                            print>>errorlog,p+'\t'+' '.join(towrite)+'\t'+m[0]
+                    patent = towrite,cpc_hash(towrite)
             
             except:
                 pass
+            # outside the try, so that failures to load a patent are not hidden
+            if patent:
+                load_cpc_patent(cursor,patdb,'patent',hashes,patent[0],patent[1],m[0],errorlog,incremental)
             
-        
+        hashes.close()
         errorlog.close()
         mydb.commit()
     
@@ -537,7 +894,9 @@ def upload_cpc(host,username,password,appdb,patdb,folder):
         uspc_full = csv.reader(file(os.path.join(folder,'applications_classes.csv'),'rb'),delimiter = '\t')
         errorlog = open(os.path.join(folder,'upload_error_apps.log'),'w')
         current_exist = {}
+        hashes = CpcHashes(cursor,appdb,'application',incremental)
         for m in uspc_full:
+            patent = None
             try:
                 gg = patnums[m[0]]
                 current_exist[m[0]] = 1
@@ -550,32 +909,14 @@ def upload_cpc(host,username,password,appdb,patdb,folder):
                         towrite[t] = str(int(towrite[t]))
                     except:
                         pass
-                primaries = towrite[2].split("; ")
-                cpcnum = 0
-                for p in primaries:
-                    try:
-                        needed = [id_generator(),towrite[1]]+[p[0],p[:3],p[:4],p,'primary',str(cpcnum)]
-                        query = """insert into """+appdb+""".cpc_current values ("""+'"'+'","'.join(needed)+'")'
-                        query = query.replace(',"NULL"',",NULL")
-                        cursor.execute(query)
-                        cpcnum+=1
-                    except:
-                        print>>errorlog,p+'\t'+' '.join(towrite)+'\t'+m[0]
-            
-                additionals = [t for t in towrite[3].split('; ') if t!='']
-                for p in additionals:
-                    try:
-                        needed = [id_generator(),towrite[1]]+[p[0],p[:3],p[:4],p,'additional',str(cpcnum)]
-                        query = """insert into """+appdb+""".cpc_current values ("""+'"'+'","'.join(needed)+'")'
-                        query = query.replace(',"NULL"',",NULL")
-                        cursor.execute(query)
-                        cpcnum+=1
-                    except:
-                        print>>errorlog,p+'\t'+' '.join(towrite)+'\t'+m[0]
+                patent = towrite,cpc_hash(towrite)
             
             except:
                 pass
+            if patent:
+                load_cpc_patent(cursor,appdb,'application',hashes,patent[0],patent[1],m[0],errorlog,incremental)
             
+        hashes.close()
         errorlog.close()
         mydb.commit()
         
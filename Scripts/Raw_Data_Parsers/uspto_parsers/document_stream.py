@@ -0,0 +1,39 @@
+# Weekly IPG files are concatenations of complete XML documents, each one
+# introduced by its own DOCTYPE declaration
+DOCUMENT_DELIMITER = b'<!DOCTYPE'
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def iter_documents(filepath, delimiter=DOCUMENT_DELIMITER, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the raw bytes of every document in a concatenated patent file, one
+    at a time, without reading the whole file into memory.
+
+    The output matches open(filepath).read().split(delimiter)[1:]: every
+    document starts right after a delimiter and runs up to the next one, and
+    anything in front of the first delimiter is dropped. Only the current
+    chunk and the unfinished document are held in memory, so memory use is
+    bounded by chunk_size plus the largest document, not by the file size.
+    """
+    with open(filepath, 'rb') as infile:
+        buf = b''
+        started = False
+        while True:
+            chunk = infile.read(chunk_size)
+            # start searching just before the new data so that a delimiter
+            # split over two chunks is still found
+            search_from = max(0, len(buf) - len(delimiter) + 1)
+            buf += chunk
+            start = 0
+            pos = buf.find(delimiter, search_from)
+            while pos != -1:
+                if started:
+                    yield buf[start:pos]
+                started = True
+                start = pos + len(delimiter)
+                pos = buf.find(delimiter, start)
+            buf = buf[start:]
+            if not chunk:
+                break
+        if started:
+            yield buf
@@ -0,0 +1,1002 @@
+# Generated by build_entity_table.py from the htmlentities file. Do not edit by hand;
+# change htmlentities and run "python build_entity_table.py" instead.
+
+# entity name -> replacement text for the named entities used in USPTO full text
+ENTITIES = {
+    'AElig': u'\u00c6',
+    'Aacgr': u'\u0386',
+    'Aacute': u'\u00c1',
+    'Abreve': u'\u0102',
+    'Acirc': u'\u00c2',
+    'Acy': u'\u0410',
+    'Agr': u'\u0391',
+    'Agrave': u'\u00c0',
+    'Alpha': u'\u0391',
+    'Amacr': u'\u0100',
+    'Aogon': u'\u0104',
+    'Aring': u'\u00c5',
+    'Atilde': u'\u00c3',
+    'Auml': u'\u00c4',
+    'Barwed': u'\u2306',
+    'Bcy': u'\u0411',
+    'Beta': u'\u0392',
+    'Bgr': u'\u0392',
+    'CHcy': u'\u0427',
+    'Cacute': u'\u0106',
+    'Cap': u'\u22d2',
+    'Ccaron': u'\u010c',
+    'Ccedil': u'\u00c7',
+    'Ccirc': u'\u0108',
+    'Cdot': u'\u010a',
+    'Chi': u'\u03a7',
+    'Cup': u'\u22d3',
+    'DJcy': u'\u0402',
+    'DScy': u'\u0405',
+    'DZcy': u'\u040f',
+    'Dagger': u'\u2021',
+    'Dcaron': u'\u010e',
+    'Dcy': u'\u0414',
+    'Delta': u'\u0394',
+    'Dgr': u'\u0394',
+    'Dot': u'\u00a8',
+    'DotDot': u'\u20dc',
+    'Dstrok': u'\u0110',
+    'EEacgr': u'\u0389',
+    'EEgr': u'\u0397',
+    'ENG': u'\u014a',
+    'ETH': u'\u00d0',
+    'Eacgr': u'\u0388',
+    'Eacute': u'\u00c9',
+    'Ecaron': u'\u011a',
+    'Ecirc': u'\u00ca',
+    'Ecy': u'\u042d',
+    'Edot': u'\u0116',
+    'Egr': u'\u0395',
+    'Egrave': u'\u00c8',
+    'Emacr': u'\u0112',
+    'Eogon': u'\u0118',
+    'Epsilon': u'\u0395',
+    'Eta': u'\u0397',
+    'Euml': u'\u00cb',
+    'Fcy': u'\u0424',
+    'GJcy': u'\u0403',
+    'Gamma': u'\u0393',
+    'Gbreve': u'\u011e',
+    'Gcedil': u'\u0122',
+    'Gcirc': u'\u011c',
+    'Gcy': u'\u0413',
+    'Gdot': u'\u0120',
+    'Gg': u'\u22d9',
+    'Ggr': u'\u0393',
+    'Gt': u'\u226b',
+    'HARDcy': u'\u042a',
+    'Hcirc': u'\u0124',
+    'Hstrok': u'\u0126',
+    'IEcy': u'\u0415',
+    'IJlig': u'\u0132',
+    'IOcy': u'\u0401',
+    'Iacgr': u'\u038a',
+    'Iacute': u'\u00cd',
+    'Icirc': u'\u00ce',
+    'Icy': u'\u0418',
+    'Idigr': u'\u03aa',
+    'Idot': u'\u0130',
+    'Igr': u'\u0399',
+    'Igrave': u'\u00cc',
+    'Imacr': u'\u012a',
+    'Iogon': u'\u012e',
+    'Iota': u'\u0399',
+    'Itilde': u'\u0128',
+    'Iukcy': u'\u0406',
+    'Iuml': u'\u00cf',
+    'Jcirc': u'\u0134',
+    'Jcy': u'\u0419',
+    'Jsercy': u'\u0408',
+    'Jukcy': u'\u0404',
+    'KHcy': u'\u0425',
+    'KHgr': u'\u03a7',
+    'KJcy': u'\u040c',
+    'Kappa': u'\u039a',
+    'Kcedil': u'\u0136',
+    'Kcy': u'\u041a',
+    'Kgr': u'\u039a',
+    'LJcy': u'\u0409',
+    'Lacute': u'\u0139',
+    'Lambda': u'\u039b',
+    'Larr': u'\u219e',
+    'Lcaron': u'\u013d',
+    'Lcedil': u'\u013b',
+    'Lcy': u'\u041b',
+    'Lgr': u'\u039b',
+    'Ll': u'\u22d8',
+    'Lmidot': u'\u013f',
+    'Lstrok': u'\u0141',
+    'Lt': u'\u226a',
+    'Mcy': u'\u041c',
+    'Mgr': u'\u039c',
+    'Mu': u'\u039c',
+    'NJcy': u'\u040a',
+    'Nacute': u'\u0143',
+    'Ncaron': u'\u0147',
+    'Ncedil': u'\u0145',
+    'Ncy': u'\u041d',
+    'Ngr': u'\u039d',
+    'Ntilde': u'\u00d1',
+    'Nu': u'\u039d',
+    'OElig': u'\u0152',
+    'OHacgr': u'\u038f',
+    'OHgr': u'\u03a9',
+    'Oacgr': u'\u038c',
+    'Oacute': u'\u00d3',
+    'Ocirc': u'\u00d4',
+    'Ocy': u'\u041e',
+    'Odblac': u'\u0150',
+    'Ogr': u'\u039f',
+    'Ograve': u'\u00d2',
+    'Omacr': u'\u014c',
+    'Omega': u'\u03a9',
+    'Omicron': u'\u039f',
+    'Oslash': u'\u00d8',
+    'Otilde': u'\u00d5',
+    'Ouml': u'\u00d6',
+    'PHgr': u'\u03a6',
+    'PSgr': u'\u03a8',
+    'Pcy': u'\u041f',
+    'Pgr': u'\u03a0',
+    'Phi': u'\u03a6',
+    'Pi': u'\u03a0',
+    'Prime': u'\u2033',
+    'Psi': u'\u03a8',
+    'Racute': u'\u0154',
+    'Rarr': u'\u21a0',
+    'Rcaron': u'\u0158',
+    'Rcedil': u'\u0156',
+    'Rcy': u'\u0420',
+    'Rgr': u'\u03a1',
+    'Rho': u'\u03a1',
+    'SHCHcy': u'\u0429',
+    'SHcy': u'\u0428',
+    'SOFTcy': u'\u042c',
+    'Sacute': u'\u015a',
+    'Scaron': u'\u0160',
+    'Scedil': u'\u015e',
+    'Scirc': u'\u015c',
+    'Scy': u'\u0421',
+    'Sgr': u'\u03a3',
+    'Sigma': u'\u03a3',
+    'Sub': u'\u22d0',
+    'Sup': u'\u22d1',
+    'THORN': u'\u00de',
+    'THgr': u'\u0398',
+    'TSHcy': u'\u040b',
+    'TScy': u'\u0426',
+    'Tau': u'\u03a4',
+    'Tcaron': u'\u0164',
+    'Tcedil': u'\u0162',
+    'Tcy': u'\u0422',
+    'Tgr': u'\u03a4',
+    'Theta': u'\u0398',
+    'Tstrok': u'\u0166',
+    'Uacgr': u'\u038e',
+    'Uacute': u'\u00da',
+    'Ubrcy': u'\u040e',
+    'Ubreve': u'\u016c',
+    'Ucirc': u'\u00db',
+    'Ucy': u'\u0423',
+    'Udblac': u'\u0170',
+    'Udigr': u'\u03ab',
+    'Ugr': u'\u03a5',
+    'Ugrave': u'\u00d9',
+    'Umacr': u'\u016a',
+    'Uogon': u'\u0172',
+    'Upsi': u'\u03a5',
+    'Upsilon': u'\u03a5',
+    'Uring': u'\u016e',
+    'Utilde': u'\u0168',
+    'Uuml': u'\u00dc',
+    'Vcy': u'\u0412',
+    'Vdash': u'\u22a9',
+    'Verbar': u'\u2016',
+    'Vvdash': u'\u22aa',
+    'Wcirc': u'\u0174',
+    'Xgr': u'\u039e',
+    'Xi': u'\u039e',
+    'YAcy': u'\u042f',
+    'YIcy': u'\u0407',
+    'YUcy': u'\u042e',
+    'Yacute': u'\u00dd',
+    'Ycirc': u'\u0176',
+    'Ycy': u'\u042b',
+    'Yuml': u'\u0178',
+    'ZHcy': u'\u0416',
+    'Zacute': u'\u0179',
+    'Zcaron': u'\u017d',
+    'Zcy': u'\u0417',
+    'Zdot': u'\u017b',
+    'Zeta': u'\u0396',
+    'Zgr': u'\u0396',
+    'aacgr': u'\u03ac',
+    'aacute': u'\u00e1',
+    'abreve': u'\u0103',
+    'acirc': u'\u00e2',
+    'acute': u'\u00b4',
+    'acy': u'\u0430',
+    'aelig': u'\u00e6',
+    'agr': u'\u03b1',
+    'agrave': u'\u00e0',
+    'alefsym': u'\u2135',
+    'aleph': u'\u2135',
+    'alpha': u'\u03b1',
+    'amacr': u'\u0101',
+    'amalg': u'\u2210',
+    'amp': u'&',
+    'and': u'\u2227',
+    'ang': u'\u2220',
+    'ang90': u'\u221f',
+    'angmsd': u'\u2221',
+    'angsph': u'\u2222',
+    'angst': u'\u212b',
+    'aogon': u'\u0105',
+    'ap': u'\u2248',
+    'ape': u'\u224a',
+    'apos': u'\u02bc',
+    'aring': u'\u00e5',
+    'ast': u'*',
+    'asymp': u'\u2248',
+    'atilde': u'\u00e3',
+    'auml': u'\u00e4',
+    'b.Delta': u'\u0394',
+    'b.Gamma': u'\u0393',
+    'b.Lambda': u'\u039b',
+    'b.Omega': u'\u03a9',
+    'b.Phi': u'\u03a6',
+    'b.Pi': u'\u03a0',
+    'b.Psi': u'\u03a8',
+    'b.Sigma': u'\u03a3',
+    'b.Theta': u'\u0398',
+    'b.Upsi': u'\u03a5',
+    'b.Xi': u'\u039e',
+    'b.alpha': u'\u03b1',
+    'b.beta': u'\u03b2',
+    'b.chi': u'\u03c7',
+    'b.delta': u'\u03b4',
+    'b.epsi': u'\u03b5',
+    'b.epsis': u'\u03b5',
+    'b.epsiv': u'\u03b5',
+    'b.eta': u'\u03b7',
+    'b.gamma': u'\u03b3',
+    'b.gammad': u'\u03dc',
+    'b.iota': u'\u03b9',
+    'b.kappa': u'\u03ba',
+    'b.kappav': u'\u03f0',
+    'b.lambda': u'\u03bb',
+    'b.mu': u'\u03bc',
+    'b.nu': u'\u03bd',
+    'b.omega': u'\u03ce',
+    'b.phis': u'\u03c6',
+    'b.phiv': u'\u03d5',
+    'b.pi': u'\u03c0',
+    'b.piv': u'\u03d6',
+    'b.psi': u'\u03c8',
+    'b.rho': u'\u03c1',
+    'b.rhov': u'\u03f1',
+    'b.sigma': u'\u03c3',
+    'b.sigmav': u'\u03c2',
+    'b.tau': u'\u03c4',
+    'b.thetas': u'\u03b8',
+    'b.thetav': u'\u03d1',
+    'b.upsi': u'\u03c5',
+    'b.xi': u'\u03be',
+    'b.zeta': u'\u03b6',
+    'barwed': u'\u22bc',
+    'bcong': u'\u224c',
+    'bcy': u'\u0431',
+    'bdquo': u'\u201e',
+    'becaus': u'\u2235',
+    'bepsi': u'\u220d',
+    'bernou': u'\u212c',
+    'beta': u'\u03b2',
+    'beth': u'\u2136',
+    'bgr': u'\u03b2',
+    'blank': u'\u2423',
+    'blk12': u'\u2592',
+    'blk14': u'\u2591',
+    'blk34': u'\u2593',
+    'block': u'\u2588',
+    'bottom': u'\u22a5',
+    'bowtie': u'\u22c8',
+    'boxDL': u'\u2557',
+    'boxDR': u'\u2554',
+    'boxDl': u'\u2556',
+    'boxDr': u'\u2553',
+    'boxH': u'\u2550',
+    'boxHD': u'\u2566',
+    'boxHU': u'\u2569',
+    'boxHd': u'\u2564',
+    'boxHu': u'\u2567',
+    'boxUL': u'\u255d',
+    'boxUR': u'\u255a',
+    'boxUl': u'\u255c',
+    'boxUr': u'\u2559',
+    'boxV': u'\u2551',
+    'boxVH': u'\u256c',
+    'boxVL': u'\u2563',
+    'boxVR': u'\u2560',
+    'boxVh': u'\u256b',
+    'boxVl': u'\u2562',
+    'boxVr': u'\u255f',
+    'boxdL': u'\u2555',
+    'boxdR': u'\u2552',
+    'boxdl': u'\u2510',
+    'boxdr': u'\u250c',
+    'boxh': u'\u2500',
+    'boxhD': u'\u2565',
+    'boxhU': u'\u2568',
+    'boxhd': u'\u252c',
+    'boxhu': u'\u2534',
+    'boxuL': u'\u255b',
+    'boxuR': u'\u2558',
+    'boxul': u'\u2518',
+    'boxur': u'\u2514',
+    'boxv': u'\u2502',
+    'boxvH': u'\u256a',
+    'boxvL': u'\u2561',
+    'boxvR': u'\u255e',
+    'boxvh': u'\u253c',
+    'boxvl': u'\u2524',
+    'boxvr': u'\u251c',
+    'bprime': u'\u2035',
+    'breve': u'\u02d8',
+    'brkbar': u'\u00a6',
+    'brvbar': u'\u00a6',
+    'bsim': u'\u223d',
+    'bsime': u'\u22cd',
+    'bsol': u'\u005c',
+    'bull': u'\u2022',
+    'bump': u'\u224e',
+    'bumpe': u'\u224f',
+    'cacute': u'\u0107',
+    'cap': u'\u2229',
+    'caret': u'\u2041',
+    'caron': u'\u02c7',
+    'ccaron': u'\u010d',
+    'ccedil': u'\u00e7',
+    'ccirc': u'\u0109',
+    'cdot': u'\u010b',
+    'cedil': u'\u00b8',
+    'cent': u'\u00a2',
+    'chcy': u'\u0447',
+    'check': u'\u2713',
+    'chi': u'\u03c7',
+    'cir': u'\u25cb',
+    'circ': u'\u02c6',
+    'cire': u'\u2257',
+    'clubs': u'\u2663',
+    'colon': u':',
+    'colone': u'\u2254',
+    'comma': u',',
+    'commat': u'@',
+    'comp': u'\u2201',
+    'compfn': u'\u2218',
+    'cong': u'\u2245',
+    'conint': u'\u222e',
+    'coprod': u'\u2210',
+    'copy': u'\u00a9',
+    'copysr': u'\u2117',
+    'crarr': u'\u21b5',
+    'cross': u'\u2717',
+    'cuepr': u'\u22de',
+    'cuesc': u'\u22df',
+    'cularr': u'\u21b6',
+    'cup': u'\u222a',
+    'cupre': u'\u227c',
+    'curarr': u'\u21b7',
+    'curren': u'\u00a4',
+    'cuvee': u'\u22ce',
+    'cuwed': u'\u22cf',
+    'dArr': u'\u21d3',
+    'dagger': u'\u2020',
+    'daleth': u'\u2138',
+    'darr': u'\u2193',
+    'darr2': u'\u21ca',
+    'dash': u'\u2010',
+    'dashv': u'\u22a3',
+    'dblac': u'\u02dd',
+    'dcaron': u'\u010f',
+    'dcy': u'\u0434',
+    'deg': u'\u00b0',
+    'delta': u'\u03b4',
+    'dgr': u'\u03b4',
+    'dharl': u'\u21c3',
+    'dharr': u'\u21c2',
+    'diam': u'\u22c4',
+    'diams': u'\u2666',
+    'die': u'\u00a8',
+    'divide': u'\u00f7',
+    'divonx': u'\u22c7',
+    'djcy': u'\u0452',
+    'dlarr': u'\u2199',
+    'dlcorn': u'\u231e',
+    'dlcrop': u'\u230d',
+    'dollar': u'$',
+    'dot': u'\u02d9',
+    'drarr': u'\u2198',
+    'drcorn': u'\u231f',
+    'drcrop': u'\u230c',
+    'dscy': u'\u0455',
+    'dstrok': u'\u0111',
+    'dtri': u'\u25bf',
+    'dtrif': u'\u25be',
+    'dzcy': u'\u045f',
+    'eDot': u'\u2251',
+    'eacgr': u'\u03ad',
+    'eacute': u'\u00e9',
+    'ecaron': u'\u011b',
+    'ecir': u'\u2256',
+    'ecirc': u'\u00ea',
+    'ecolon': u'\u2255',
+    'ecy': u'\u044d',
+    'edot': u'\u0117',
+    'eeacgr': u'\u03ae',
+    'eegr': u'\u03b7',
+    'efDot': u'\u2252',
+    'egr': u'\u03b5',
+    'egrave': u'\u00e8',
+    'egs': u'\u22dd',
+    'ell': u'\u2113',
+    'els': u'\u22dc',
+    'emacr': u'\u0113',
+    'emdash': u'\u2014',
+    'empty': u'\u2205',
+    'emsp': u'\u2003',
+    'emsp13': u'\u2004',
+    'emsp14': u'\u2005',
+    'endash': u'\u2013',
+    'eng': u'\u014b',
+    'ensp': u'\u2002',
+    'eogon': u'\u0119',
+    'epsi': u'\u03b5',
+    'epsilon': u'\u03b5',
+    'epsis': u'\u220a',
+    'equals': u'=',
+    'equiv': u'\u2261',
+    'erDot': u'\u2253',
+    'esdot': u'\u2250',
+    'eta': u'\u03b7',
+    'eth': u'\u00f0',
+    'euml': u'\u00eb',
+    'euro': u'\u20ac',
+    'excl': u'!',
+    'exist': u'\u2203',
+    'fcy': u'\u0444',
+    'female': u'\u2640',
+    'ffilig': u'\ufb03',
+    'fflig': u'\ufb00',
+    'ffllig': u'\ufb04',
+    'filig': u'\ufb01',
+    'flat': u'\u266d',
+    'fllig': u'\ufb02',
+    'fnof': u'\u0192',
+    'forall': u'\u2200',
+    'fork': u'\u22d4',
+    'frac12': u'\u00bd',
+    'frac13': u'\u2153',
+    'frac14': u'\u00bc',
+    'frac15': u'\u2155',
+    'frac16': u'\u2159',
+    'frac18': u'\u215b',
+    'frac23': u'\u2154',
+    'frac25': u'\u2156',
+    'frac34': u'\u00be',
+    'frac35': u'\u2157',
+    'frac38': u'\u215c',
+    'frac45': u'\u2158',
+    'frac56': u'\u215a',
+    'frac58': u'\u215d',
+    'frac78': u'\u215e',
+    'frasl': u'\u2044',
+    'frown': u'\u2322',
+    'gE': u'\u2267',
+    'gacute': u'\u01f5',
+    'gamma': u'\u03b3',
+    'gammad': u'\u03dc',
+    'gbreve': u'\u011f',
+    'gcedil': u'\u0123',
+    'gcirc': u'\u011d',
+    'gcy': u'\u0433',
+    'gdot': u'\u0121',
+    'ge': u'\u2265',
+    'gel': u'\u22db',
+    'ges': u'\u2265',
+    'ggr': u'\u03b3',
+    'gimel': u'\u2137',
+    'gjcy': u'\u0453',
+    'gl': u'\u2277',
+    'gnE': u'\u2269',
+    'gne': u'\u2269',
+    'gnsim': u'\u22e7',
+    'grave': u'`',
+    'gsdot': u'\u22d7',
+    'gsim': u'\u2273',
+    'gt': u'>',
+    'gvnE': u'\u2269',
+    'hArr': u'\u21d4',
+    'hairsp': u'\u200a',
+    'half': u'\u00bd',
+    'hamilt': u'\u210b',
+    'hardcy': u'\u044a',
+    'harr': u'\u2194',
+    'harrw': u'\u21ad',
+    'hcirc': u'\u0125',
+    'hearts': u'\u2665',
+    'hellip': u'\u2026',
+    'hibar': u'\u00af',
+    'horbar': u'\u2015',
+    'hstrok': u'\u0127',
+    'hybull': u'\u2043',
+    'hyphen': u'-',
+    'iacgr': u'\u03af',
+    'iacute': u'\u00ed',
+    'icirc': u'\u00ee',
+    'icy': u'\u0438',
+    'idiagr': u'\u0390',
+    'idigr': u'\u03ca',
+    'iecy': u'\u0435',
+    'iexcl': u'\u00a1',
+    'iff': u'\u21d4',
+    'igr': u'\u03b9',
+    'igrave': u'\u00ec',
+    'ijlig': u'\u0133',
+    'imacr': u'\u012b',
+    'image': u'\u2111',
+    'incare': u'\u2105',
+    'infin': u'\u221e',
+    'inodot': u'\u0131',
+    'int': u'\u222b',
+    'intcal': u'\u22ba',
+    'iocy': u'\u0451',
+    'iogon': u'\u012f',
+    'iota': u'\u03b9',
+    'iquest': u'\u00bf',
+    'isin': u'\u2208',
+    'itilde': u'\u0129',
+    'iukcy': u'\u0456',
+    'iuml': u'\u00ef',
+    'jcirc': u'\u0135',
+    'jcy': u'\u0439',
+    'jsercy': u'\u0458',
+    'jukcy': u'\u0454',
+    'kappa': u'\u03ba',
+    'kappav': u'\u03f0',
+    'kcedil': u'\u0137',
+    'kcy': u'\u043a',
+    'kgr': u'\u03ba',
+    'kgreen': u'\u0138',
+    'khcy': u'\u0445',
+    'khgr': u'\u03c7',
+    'kjcy': u'\u045c',
+    'lAarr': u'\u21da',
+    'lArr': u'\u21d0',
+    'lE': u'\u2266',
+    'lacute': u'\u013a',
+    'lagran': u'\u2112',
+    'lambda': u'\u03bb',
+    'lang': u'\u2329',
+    'laquo': u'\u00ab',
+    'larr': u'\u2190',
+    'larr2': u'\u21c7',
+    'larrhk': u'\u21a9',
+    'larrlp': u'\u21ab',
+    'larrtl': u'\u21a2',
+    'lcaron': u'\u013e',
+    'lcedil': u'\u013c',
+    'lceil': u'\u2308',
+    'lcub': u'{',
+    'lcy': u'\u043b',
+    'ldot': u'\u22d6',
+    'ldquo': u'\u201c',
+    'ldquor': u'\u201e',
+    'le': u'\u2264',
+    'leg': u'\u22da',
+    'les': u'\u2264',
+    'lfloor': u'\u230a',
+    'lg': u'\u2276',
+    'lgr': u'\u03bb',
+    'lhard': u'\u21bd',
+    'lharu': u'\u21bc',
+    'lhblk': u'\u2584',
+    'ljcy': u'\u0459',
+    'lmidot': u'\u0140',
+    'lnE': u'\u2268',
+    'lne': u'\u2268',
+    'lnsim': u'\u22e6',
+    'lowast': u'\u2217',
+    'lowbar': u'_',
+    'loz': u'\u25ca',
+    'lozf': u'\u2726',
+    'lpar': u'(',
+    'lrarr2': u'\u21c6',
+    'lrhar2': u'\u21cb',
+    'lrm': u'\u200e',
+    'lsaquo': u'\u2039',
+    'lsh': u'\u21b0',
+    'lsim': u'\u2272',
+    'lsqb': u'[',
+    'lsquo': u'\u2018',
+    'lsquor': u'\u201a',
+    'lstrok': u'\u0142',
+    'lt': u'<',
+    'lthree': u'\u22cb',
+    'ltimes': u'\u22c9',
+    'ltri': u'\u25c3',
+    'ltrie': u'\u22b4',
+    'ltrif': u'\u25c2',
+    'lvnE': u'\u2268',
+    'macr': u'\u00af',
+    'male': u'\u2642',
+    'malt': u'\u2720',
+    'map': u'\u21a6',
+    'marker': u'\u25ae',
+    'mcy': u'\u043c',
+    'mdash': u'\u2014',
+    'mgr': u'\u03bc',
+    'micro': u'\u00b5',
+    'mid': u'\u2223',
+    'middot': u'\u00b7',
+    'minus': u'\u2212',
+    'minusb': u'\u229f',
+    'mldr': u'\u2026',
+    'mnplus': u'\u2213',
+    'models': u'\u22a7',
+    'mu': u'\u03bc',
+    'mumap': u'\u22b8',
+    'nVDash': u'\u22af',
+    'nVdash': u'\u22ae',
+    'nabla': u'\u2207',
+    'nacute': u'\u0144',
+    'nap': u'\u2249',
+    'napos': u'\u0149',
+    'natur': u'\u266e',
+    'nbsp': u' ',
+    'ncaron': u'\u0148',
+    'ncedil': u'\u0146',
+    'ncong': u'\u2247',
+    'ncy': u'\u043d',
+    'ndash': u'\u2013',
+    'ne': u'\u2260',
+    'nearr': u'\u2197',
+    'nequiv': u'\u2262',
+    'nexist': u'\u2204',
+    'nge': u'\u2271',
+    'nges': u'\u2271',
+    'ngr': u'\u03bd',
+    'ngt': u'\u226f',
+    'nhArr': u'\u21ce',
+    'nharr': u'\u21ae',
+    'ni': u'\u220b',
+    'njcy': u'\u045a',
+    'nlArr': u'\u21cd',
+    'nlarr': u'\u219a',
+    'nldr': u'\u2025',
+    'nle': u'\u2270',
+    'nles': u'\u2270',
+    'nlt': u'\u226e',
+    'nltri': u'\u22ea',
+    'nltrie': u'\u22ec',
+    'nmid': u'\u2224',
+    'not': u'\u00ac',
+    'notin': u'\u2209',
+    'npar': u'\u2226',
+    'npr': u'\u2280',
+    'npre': u'\u22e0',
+    'nrArr': u'\u21cf',
+    'nrarr': u'\u219b',
+    'nrtri': u'\u22eb',
+    'nrtrie': u'\u22ed',
+    'nsc': u'\u2281',
+    'nsce': u'\u22e1',
+    'nsim': u'\u2241',
+    'nsime': u'\u2244',
+    'nspar': u'\u2226',
+    'nsub': u'\u2284',
+    'nsubE': u'\u2288',
+    'nsube': u'\u2288',
+    'nsup': u'\u2285',
+    'nsupE': u'\u2289',
+    'nsupe': u'\u2289',
+    'ntilde': u'\u00f1',
+    'nu': u'\u03bd',
+    'num': u'#',
+    'numero': u'\u2116',
+    'numsp': u'\u2007',
+    'nvDash': u'\u22ad',
+    'nvdash': u'\u22ac',
+    'nwarr': u'\u2196',
+    'oS': u'\u24c8',
+    'oacgr': u'\u03cc',
+    'oacute': u'\u00f3',
+    'oast': u'\u229b',
+    'ocir': u'\u229a',
+    'ocirc': u'\u00f4',
+    'ocy': u'\u043e',
+    'odash': u'\u229d',
+    'odblac': u'\u0151',
+    'odot': u'\u2299',
+    'oelig': u'\u0153',
+    'ogon': u'\u02db',
+    'ogr': u'\u03bf',
+    'ograve': u'\u00f2',
+    'ohacgr': u'\u03ce',
+    'ohgr': u'\u03c9',
+    'ohm': u'\u2126',
+    'olarr': u'\u21ba',
+    'oline': u'\u203e',
+    'omacr': u'\u014d',
+    'omega': u'\u03c9',
+    'omicron': u'\u03bf',
+    'ominus': u'\u2296',
+    'oplus': u'\u2295',
+    'or': u'\u2228',
+    'orarr': u'\u21bb',
+    'order': u'\u2134',
+    'ordf': u'\u00aa',
+    'ordm': u'\u00ba',
+    'oslash': u'\u00f8',
+    'osol': u'\u2298',
+    'otilde': u'\u00f5',
+    'otimes': u'\u2297',
+    'ouml': u'\u00f6',
+    'par': u'\u2225',
+    'para': u'\u00b6',
+    'part': u'\u2202',
+    'pcy': u'\u043f',
+    'percnt': u'%',
+    'period': u'.',
+    'permil': u'\u2030',
+    'perp': u'\u22a5',
+    'pgr': u'\u03c0',
+    'phgr': u'\u03c6',
+    'phi': u'\u03c6',
+    'phis': u'\u03c6',
+    'phiv': u'\u03d5',
+    'phmmat': u'\u2133',
+    'phone': u'\u260e',
+    'pi': u'\u03c0',
+    'piv': u'\u03d6',
+    'planck': u'\u210f',
+    'plus': u'+',
+    'plusb': u'\u229e',
+    'plusdo': u'\u2214',
+    'plusmn': u'\u00b1',
+    'pound': u'\u00a3',
+    'pr': u'\u227a',
+    'pre': u'\u227c',
+    'prime': u'\u2032',
+    'prnsim': u'\u22e8',
+    'prod': u'\u220f',
+    'prop': u'\u221d',
+    'prsim': u'\u227e',
+    'psgr': u'\u03c8',
+    'psi': u'\u03c8',
+    'puncsp': u'\u2008',
+    'quest': u'?',
+    'quot': u'"',
+    'rAarr': u'\u21db',
+    'rArr': u'\u21d2',
+    'racute': u'\u0155',
+    'radic': u'\u221a',
+    'rang': u'\u232a',
+    'raquo': u'\u00bb',
+    'rarr': u'\u2192',
+    'rarr2': u'\u21c9',
+    'rarrhk': u'\u21aa',
+    'rarrlp': u'\u21ac',
+    'rarrtl': u'\u21a3',
+    'rarrw': u'\u219d',
+    'rcaron': u'\u0159',
+    'rcedil': u'\u0157',
+    'rceil': u'\u2309',
+    'rcub': u'}',
+    'rcy': u'\u0440',
+    'rdquo': u'\u201d',
+    'rdquor': u'\u201c',
+    'real': u'\u211c',
+    'rect': u'\u25ad',
+    'reg': u'\u00ae',
+    'rfloor': u'\u230b',
+    'rgr': u'\u03c1',
+    'rhard': u'\u21c1',
+    'rharu': u'\u21c0',
+    'rho': u'\u03c1',
+    'rhov': u'\u03f1',
+    'ring': u'\u02da',
+    'rlarr2': u'\u21c4',
+    'rlhar2': u'\u21cc',
+    'rlm': u'\u200f',
+    'rpar': u')',
+    'rsaquo': u'\u203a',
+    'rsh': u'\u21b1',
+    'rsqb': u']',
+    'rsquo': u'\u2019',
+    'rsquor': u'\u2018',
+    'rthree': u'\u22cc',
+    'rtimes': u'\u22ca',
+    'rtri': u'\u25b9',
+    'rtrie': u'\u22b5',
+    'rtrif': u'\u25b8',
+    'rx': u'\u211e',
+    'sacute': u'\u015b',
+    'samalg': u'\u2210',
+    'sbquo': u'\u201a',
+    'sbsol': u'\u005c',
+    'sc': u'\u227b',
+    'scaron': u'\u0161',
+    'sccue': u'\u227d',
+    'sce': u'\u227d',
+    'scedil': u'\u015f',
+    'scirc': u'\u015d',
+    'scnsim': u'\u22e9',
+    'scsim': u'\u227f',
+    'scy': u'\u0441',
+    'sdot': u'\u22c5',
+    'sdotb': u'\u22a1',
+    'sect': u'\u00a7',
+    'semi': u';',
+    'setmn': u'\u2216',
+    'sext': u'\u2736',
+    'sfgr': u'\u03c2',
+    'sfrown': u'\u2322',
+    'sgr': u'\u03c3',
+    'sharp': u'\u266f',
+    'shchcy': u'\u0449',
+    'shcy': u'\u0448',
+    'shy': u'\u00ad',
+    'sigma': u'\u03c3',
+    'sigmaf': u'\u03c2',
+    'sigmav': u'\u03c2',
+    'sim': u'\u223c',
+    'sime': u'\u2243',
+    'smile': u'\u2323',
+    'softcy': u'\u044c',
+    'sol': u'/',
+    'spades': u'\u2660',
+    'spar': u'\u2225',
+    'sqcap': u'\u2293',
+    'sqcup': u'\u2294',
+    'sqsub': u'\u228f',
+    'sqsube': u'\u2291',
+    'sqsup': u'\u2290',
+    'sqsupe': u'\u2292',
+    'squ': u'\u25a1',
+    'square': u'\u25a1',
+    'squf': u'\u25aa',
+    'ssetmn': u'\u2216',
+    'ssmile': u'\u2323',
+    'sstarf': u'\u22c6',
+    'star': u'\u2606',
+    'starf': u'\u2605',
+    'sub': u'\u2282',
+    'subE': u'\u2286',
+    'sube': u'\u2286',
+    'subnE': u'\u228a',
+    'subne': u'\u228a',
+    'sum': u'\u2211',
+    'sung': u'\u266a',
+    'sup': u'\u2283',
+    'sup1': u'\u00b9',
+    'sup2': u'\u00b2',
+    'sup3': u'\u00b3',
+    'supE': u'\u2287',
+    'supe': u'\u2287',
+    'supnE': u'\u228b',
+    'supne': u'\u228b',
+    'szlig': u'\u00df',
+    'target': u'\u2316',
+    'tau': u'\u03c4',
+    'tcaron': u'\u0165',
+    'tcedil': u'\u0163',
+    'tcy': u'\u0442',
+    'tdot': u'\u20db',
+    'telrec': u'\u2315',
+    'tgr': u'\u03c4',
+    'there4': u'\u2234',
+    'theta': u'\u03b8',
+    'thetas': u'\u03b8',
+    'thetasym': u'\u03d1',
+    'thetav': u'\u03d1',
+    'thgr': u'\u03b8',
+    'thinsp': u'\u2009',
+    'thkap': u'\u2248',
+    'thksim': u'\u223c',
+    'thorn': u'\u00fe',
+    'tilde': u'\u02dc',
+    'times': u'\u00d7',
+    'timesb': u'\u22a0',
+    'top': u'\u22a4',
+    'tprime': u'\u2034',
+    'trade': u'\u2122',
+    'trie': u'\u225c',
+    'tscy': u'\u0446',
+    'tshcy': u'\u045b',
+    'tstrok': u'\u0167',
+    'twixt': u'\u226c',
+    'uArr': u'\u21d1',
+    'uacgr': u'\u03cd',
+    'uacute': u'\u00fa',
+    'uarr': u'\u2191',
+    'uarr2': u'\u21c8',
+    'ubrcy': u'\u045e',
+    'ubreve': u'\u016d',
+    'ucirc': u'\u00fb',
+    'ucy': u'\u0443',
+    'udblac': u'\u0171',
+    'udiagr': u'\u03b0',
+    'udigr': u'\u03cb',
+    'ugr': u'\u03c5',
+    'ugrave': u'\u00f9',
+    'uharl': u'\u21bf',
+    'uharr': u'\u21be',
+    'uhblk': u'\u2580',
+    'ulcorn': u'\u231c',
+    'ulcrop': u'\u230f',
+    'umacr': u'\u016b',
+    'uml': u'\u00a8',
+    'uogon': u'\u0173',
+    'uplus': u'\u228e',
+    'upsi': u'\u03c5',
+    'upsih': u'\u03d2',
+    'upsilon': u'\u03c5',
+    'urcorn': u'\u231d',
+    'urcrop': u'\u230e',
+    'uring': u'\u016f',
+    'utilde': u'\u0169',
+    'utri': u'\u25b5',
+    'utrif': u'\u25b4',
+    'uuml': u'\u00fc',
+    'vArr': u'\u21d5',
+    'vDash': u'\u22a8',
+    'varr': u'\u2195',
+    'vcy': u'\u0432',
+    'vdash': u'\u22a2',
+    'veebar': u'\u22bb',
+    'vellip': u'\u22ee',
+    'verbar': u'|',
+    'vltri': u'\u22b2',
+    'vprime': u'\u2032',
+    'vprop': u'\u221d',
+    'vrtri': u'\u22b3',
+    'vsubnE': u'\u228a',
+    'vsubne': u'\u228a',
+    'vsupnE': u'\u228b',
+    'vsupne': u'\u228b',
+    'wcirc': u'\u0175',
+    'wedgeq': u'\u2259',
+    'weierp': u'\u2118',
+    'wreath': u'\u2240',
+    'xcirc': u'\u25cb',
+    'xdtri': u'\u25bd',
+    'xgr': u'\u03be',
+    'xhArr': u'\u2194',
+    'xharr': u'\u2194',
+    'xi': u'\u03be',
+    'xlArr': u'\u21d0',
+    'xrArr': u'\u21d2',
+    'xutri': u'\u25b3',
+    'yacute': u'\u00fd',
+    'yacy': u'\u044f',
+    'ycirc': u'\u0177',
+    'ycy': u'\u044b',
+    'yen': u'\u00a5',
+    'yicy': u'\u0457',
+    'yucy': u'\u044e',
+    'yuml': u'\u00ff',
+    'zacute': u'\u017a',
+    'zcaron': u'\u017e',
+    'zcy': u'\u0437',
+    'zdot': u'\u017c',
+    'zeta': u'\u03b6',
+    'zgr': u'\u03b6',
+    'zhcy': u'\u0436',
+    'zwj': u'\u200d',
+    'zwnj': u'\u200c',
+}
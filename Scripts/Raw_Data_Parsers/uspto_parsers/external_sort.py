@@ -0,0 +1,63 @@
+"""
+Sort for inputs too large to sort in memory.
+
+Input that fits in one chunk is sorted in memory. Larger input is sorted in
+chunks, every chunk is written to a temporary file, and the chunk files are
+then merged. Items with the same key keep their order, as with sorted(),
+which the USPC parsers rely on: the order of the classifications of a
+patent is their order in the MCF file.
+"""
+import heapq
+import itertools
+import marshal
+import tempfile
+
+# items sorted in memory at once
+CHUNK_SIZE = 1000000
+
+
+def external_sort(items, key, chunk_size=CHUNK_SIZE):
+    """
+    The items sorted by key, in a generator that holds at most chunk_size
+    of them in memory. The items must be values marshal writes: strings,
+    numbers, and lists and tuples of them.
+    """
+    items = iter(items)
+    chunks = []
+    try:
+        while True:
+            chunk = list(itertools.islice(items, chunk_size))
+            chunk.sort(key=key)
+            if len(chunk) < chunk_size and not chunks:
+                # all of it fits in memory
+                for item in chunk:
+                    yield item
+                return
+            if not chunk:
+                break
+            chunk_file = tempfile.TemporaryFile()
+            chunks.append(chunk_file)
+            for item in chunk:
+                marshal.dump(item, chunk_file)
+            chunk_file.seek(0)
+            del chunk
+        # the number of an item in the input breaks ties, so that items with
+        # the same key come out in input order and are never compared themselves
+        merged = heapq.merge(*[_read_chunk(f, key, n * chunk_size) for n, f in enumerate(chunks)])
+        for k, number, item in merged:
+            yield item
+    finally:
+        for chunk_file in chunks:
+            chunk_file.close()
+
+
+def _read_chunk(chunk_file, key, first):
+    """
+    The items of a chunk file, as (key, number in the input, item)
+    """
+    for number in itertools.count(first):
+        try:
+            item = marshal.load(chunk_file)
+        except EOFError:
+            return
+        yield key(item), number, item
@@ -1,224 +1,69 @@
-def parse_patents(fd,fd2):
-	import re,csv,os,codecs,zipfile,traceback
-	import string,random,HTMLParser
-	
-	def id_generator(size=25, chars=string.ascii_lowercase + string.digits):
-		return ''.join(random.choice(chars) for _ in range(size))
-	
-	type_kind = {'1': ["A","utility"],
-				 '2': ["E","reissue"],
-				 '3': ["I5","TVPP"],
-				 '4': ["S","design"],
-				 '5': ["I4","defensive publication"],
-				 '6': ["P","plant"],
-				 '7': ["H","statutory invention registration"]
-				 }    
-	
-	reldoctype = [
-				'continuation-in-part',
-				'continuation_in_part',
-				'continuing_reissue',
-				'division',
-				'reissue',
-				'related_publication',
-				'substitution',
-				'us_provisional_application',
-				'us_reexamination_reissue_merger',
-				'continuation'
-				]
-	
-	fd+='/'
-	fd2+='/'
-	diri = os.listdir(fd)
-	diri = [d for d in diri if d.endswith('zip')]
-
-	#Initiate HTML Parser for unescape characters
-	h = HTMLParser.HTMLParser()
-
-	#Remove all files from output dir before writing
-	outdir = os.listdir(fd2)
-	for oo in outdir:
-		os.remove(os.path.join(fd2,oo))
-
-	#Rewrite files and write headers to them
-	appfile = open(os.path.join(fd2,'application.csv'),'wb')
-	appfile.write(codecs.BOM_UTF8)
-	app = csv.writer(appfile,delimiter='\t')
-	app.writerow(['id','patent_id','type','number','country','date'])
-	
-	claimsfile = open(os.path.join(fd2,'claim.csv'),'wb')
-	claimsfile.write(codecs.BOM_UTF8)
-	clms = csv.writer(claimsfile,delimiter='\t')
-	clms.writerow(['uuid','patent_id','text','dependent','sequence', 'exemplary'])
-	
-	rawlocfile = open(os.path.join(fd2,'rawlocation.csv'),'wb')
-	rawlocfile.write(codecs.BOM_UTF8)
-	rawloc = csv.writer(rawlocfile,delimiter='\t')
-	rawloc.writerow(['id','location_id','city','state','country','zip_code'])
-	
-	rawinvfile = open(os.path.join(fd2,'rawinventor.csv'),'wb')
-	rawinvfile.write(codecs.BOM_UTF8)
-	rawinv = csv.writer(rawinvfile,delimiter='\t')
-	rawinv.writerow(['uuid','patent_id','inventor_id','rawlocation_id','name_first','name_last',"other_info",'sequence',"rule_47"])
-	
-	rawassgfile = open(os.path.join(fd2,'rawassignee.csv'),'wb')
-	rawassgfile.write(codecs.BOM_UTF8)
-	rawassg = csv.writer(rawassgfile,delimiter='\t')
-	rawassg.writerow(['uuid','patent_id','assignee_id','rawlocation_id','type','name_first','name_last','organization',"other_info",'sequence'])
-	
-	ipcrfile = open(os.path.join(fd2,'ipcr.csv'),'wb')
-	ipcrfile.write(codecs.BOM_UTF8)
-	ipcr = csv.writer(ipcrfile,delimiter='\t')
-	ipcr.writerow(['uuid','patent_id','classification_level','section','mainclass','subclass','main_group','subgroup','symbol_position','classification_value','classification_status','classification_data_source','action_date','ipc_version_indicator','sequence'])
-	
-	patfile = open(os.path.join(fd2,'patent.csv'),'wb')
-	patfile.write(codecs.BOM_UTF8)
-	pat = csv.writer(patfile,delimiter='\t')
-	pat.writerow(['id','type','number','country','date','abstract','title','kind','num_claims', 'filename'])
-	
-	uspatentcitfile = open(os.path.join(fd2,'uspatentcitation.csv'),'wb')
-	uspatentcitfile.write(codecs.BOM_UTF8)
-	uspatcit = csv.writer(uspatentcitfile,delimiter='\t')
-	uspatcit.writerow(['uuid','patent_id','citation_id','date','name','kind','country','category','sequence'])
-	
-	foreigncitfile = open(os.path.join(fd2,'foreigncitation.csv'),'wb')
-	foreigncitfile.write(codecs.BOM_UTF8)
-	foreigncit = csv.writer(foreigncitfile,delimiter='\t')
-	foreigncit.writerow(['uuid','patent_id','date','number','country','category','sequence'])
-	
-	otherreffile = open(os.path.join(fd2,'otherreference.csv'),'wb')
-	otherreffile.write(codecs.BOM_UTF8)
-	otherref = csv.writer(otherreffile,delimiter='\t')
-	otherref.writerow(['uuid','patent_id','text','sequence'])
-	
-	examfile = open(os.path.join(fd2,'examiner.csv'),'wb')
-	examfile.write(codecs.BOM_UTF8)
-	examiner = csv.writer(examfile,delimiter='\t')
-	examiner.writerow(['id','patent_id','fname','lname','role','group'])
-	
-	rawlawyerfile = open(os.path.join(fd2,'rawlawyer.csv'),'wb')
-	rawlawyerfile.write(codecs.BOM_UTF8)
-	rawlawyer = csv.writer(rawlawyerfile,delimiter='\t')
-	rawlawyer.writerow(['uuid','lawyer_id','patent_id','name_first','name_last','organization','country','sequence'])
-	
-	uspcfile = open(os.path.join(fd2,'uspc.csv'),'wb')
-	uspcfile.write(codecs.BOM_UTF8)
-	uspcc = csv.writer(uspcfile,delimiter='\t')
-	uspcc.writerow(['uuid','patent_id','mainclass_id','subclass_id','sequence'])
-
-	mainclassfile = open(os.path.join(fd2,'mainclass.csv'),'wb')
-	mainclassfile.write(codecs.BOM_UTF8)
-	mainclass = csv.writer(mainclassfile,delimiter='\t')
-	mainclass.writerow(['id'])
-
-	subclassfile = open(os.path.join(fd2,'subclass.csv'),'wb')
-	subclassfile.write(codecs.BOM_UTF8)
-	subclass = csv.writer(subclassfile,delimiter='\t')
-	subclass.writerow(['id'])
-	
-	### New fields ###
-	forpriorityfile = open(os.path.join(fd2,'foreign_priority.csv'),'wb')
-	forpriorityfile.write(codecs.BOM_UTF8)
-	forpriority = csv.writer(forpriorityfile,delimiter='\t')
-	forpriority.writerow(['uuid', 'patent_id', "sequence", "kind", "app_num", "app_date", "country"])
-
-	##### BEGIN PARENT CASE logical group is the USRELDOC #####
+import re,csv,os,codecs,zipfile,traceback
+import HTMLParser
+import multiprocessing
+import shutil
+import tempfile
+from row_ids import RowIds
 
-	usreldocfile = open(os.path.join(fd2,'usreldoc.csv'), 'wb')
-	usreldocfile.write(codecs.BOM_UTF8)
-	usrel = csv.writer(usreldocfile, delimiter='\t')
-	usrel.writerow(['uuid', 'patent_id', 'doc_type',  'relkind', 'reldocno', 'relcountry', 'reldate',  'parent_status', 'rel_seq','kind'])
+type_kind = {'1': ["A","utility"],
+			 '2': ["E","reissue"],
+			 '3': ["I5","TVPP"],
+			 '4': ["S","design"],
+			 '5': ["I4","defensive publication"],
+			 '6': ["P","plant"],
+			 '7': ["H","statutory invention registration"]
+			 }    
 
-	##### END PARENT CASE logical group is the USRELDOC #####
-	
-	us_term_of_grantfile = open(os.path.join(fd2,'us_term_of_grant.csv'), 'wb')
-	us_term_of_grantfile.write(codecs.BOM_UTF8)
-	us_term_of_grant = csv.writer(us_term_of_grantfile, delimiter='\t')
-	us_term_of_grant.writerow(['uuid','patent_id','lapse_of_patent', 'disclaimer_date' 'term_disclaimer', 'term_grant', 'term_ext'])
+reldoctype = [
+			'continuation-in-part',
+			'continuation_in_part',
+			'continuing_reissue',
+			'division',
+			'reissue',
+			'related_publication',
+			'substitution',
+			'us_provisional_application',
+			'us_reexamination_reissue_merger',
+			'continuation'
+			]
 
-	draw_desc_textfile = open(os.path.join(fd2,'draw_desc_text.csv'), 'wb')
-	draw_desc_textfile.write(codecs.BOM_UTF8)
-	drawdesc = csv.writer(draw_desc_textfile, delimiter='\t')
-	drawdesc.writerow(['uuid', 'patent_id', 'text', 'seq'])
+loggroups = ['PATN','INVT','ASSG','PRIR','REIS','RLAP','CLAS','UREF','FREF','OREF','LREP','PCTA','ABST','GOVT','PARN','BSUM','DRWD','DETD','CLMS','DCLM']
 
-	brf_sum_textfile = open(os.path.join(fd2,'brf_sum_text.csv'), 'wb')
-	brf_sum_textfile.write(codecs.BOM_UTF8)
-	brf_sum = csv.writer(brf_sum_textfile, delimiter='\t')
-	brf_sum.writerow(['uuid', 'patent_id', 'text'])
 
-	det_desc_textfile = open(os.path.join(fd2,'detail_desc_text.csv'), 'wb')
-	det_desc_textfile.write(codecs.BOM_UTF8)
-	det_desc = csv.writer(det_desc_textfile, delimiter='\t')
-	det_desc.writerow(['uuid', 'patent_id', 'text', 'length'])
-
-	rel_app_textfile = open(os.path.join(fd2,'rel_app_text.csv'), 'wb')
-	rel_app_textfile.write(codecs.BOM_UTF8)
-	rel_app = csv.writer(rel_app_textfile, delimiter='\t')
-	rel_app.writerow(['uuid', 'patent_id',"text"])
-
-	non_inventor_applicantfile = open(os.path.join(fd2,'non_inventor_applicant.csv'),'wb')
-	non_inventor_applicantfile.write(codecs.BOM_UTF8)
-	noninventorapplicant = csv.writer(non_inventor_applicantfile,delimiter='\t')
-	noninventorapplicant.writerow(['uuid', 'patent_id', "location_id", "last_name", "first_name", "org_name", "sequence", "designation", "applicant_type"])
+def iter_records(member):
+	"""
+	Read the patent records of an APS text file one at a time from the open file
+	member, e.g. a zip member, without loading the whole file. A record starts at
+	a line beginning with PATN; the file header before the first one is skipped.
+	Each record is decoded and unescaped the way the whole file used to be and
+	returned as unicode text without its leading PATN.
+	"""
+	h = HTMLParser.HTMLParser()
+	record = None
+	for line in member:
+		if line.startswith('PATN'):
+			if record is not None:
+				yield h.unescape(''.join(record).decode('utf-8','ignore').replace('&angst','&aring')).replace("\r","")[4:]
+			record = []
+		if record is not None:
+			record.append(line)
+	if record is not None:
+		yield h.unescape(''.join(record).decode('utf-8','ignore').replace('&angst','&aring')).replace("\r","")[4:]
 
-	pct_datafile = open(os.path.join(fd2,'pct_data.csv'), 'wb')
-	pct_datafile.write(codecs.BOM_UTF8)
-	pct_data = csv.writer(pct_datafile, delimiter='\t')
-	pct_data.writerow(['uuid', 'patent_id', 'rel_id', 'date', '371_date', 'country', 'kind', "doc_type","102_date"])
 
-	botanicfile = open(os.path.join(fd2,'botanic.csv'), 'wb')
-	botanicfile.write(codecs.BOM_UTF8)
-	botanic_info = csv.writer(botanicfile, delimiter='\t')
-	botanic_info.writerow(['uuid', 'patent_id', 'latin_name', "variety"])
-
-	figurefile = open(os.path.join(fd2,'figures.csv'), 'wb')
-	figurefile.write(codecs.BOM_UTF8)
-	figure_info = csv.writer(figurefile, delimiter='\t')
-	figure_info.writerow(['uuid', 'patent_id', 'num_figs', "num_sheets"])   
-	
-	mainclassfile.close()
-	subclassfile.close()
-	appfile.close()
-	rawlocfile.close()
-	rawinvfile.close()
-	rawassgfile.close()
-	ipcrfile.close()
-	otherreffile.close()
-	foreigncitfile.close()
-	patfile.close()
-	rawlawyerfile.close()
-	uspatentcitfile.close()
-	uspcfile.close()
-	claimsfile.close()
-	examfile.close()
-	forpriorityfile.close()
-	us_term_of_grantfile.close()
-	usreldocfile.close()
-	non_inventor_applicantfile.close()
-	draw_desc_textfile.close()
-	brf_sum_textfile.close()
-	rel_app_textfile.close()
-	det_desc_textfile.close()
-	pct_datafile.close()
-	botanicfile.close()
-	figurefile.close()
-	
-	
-	loggroups = ['PATN','INVT','ASSG','PRIR','REIS','RLAP','CLAS','UREF','FREF','OREF','LREP','PCTA','ABST','GOVT','PARN','BSUM','DRWD','DETD','CLMS','DCLM']
-	
+def parse_file(fd, d, fd2, rawlocation, mainclassdata, subclassdata):
+	"""
+	Parse one zip archive of APS text files and append its rows to the csv files
+	in fd2. The archive members are streamed a record at a time. Rawlocation,
+	mainclass and subclass rows are collected in the dicts passed in so the
+	caller can write them once after all archives are done.
+	Returns the number of records in the archive.
+	"""
 	numii = 0
-	rawlocation = {}
-	mainclassdata = {}
-	subclassdata = {}
-
-	for d in diri:
-	  print d
-	  inp = zipfile.ZipFile(os.path.join(fd,d))
-	  for i in inp.namelist():
-		infile = h.unescape(inp.open(i).read().decode('utf-8','ignore').replace('&angst','&aring')).replace("\r","").split('PATN')
-		del infile[0]
-
-		for i in infile:
+	print d
+	inp = zipfile.ZipFile(os.path.join(fd,d))
+	for member in inp.namelist():
+		for i in iter_records(inp.open(member)):
 			numii+=1
 			try:    
 				i = i.encode('utf-8','ignore')
@@ -303,6 +148,8 @@ def parse_patents(fd,fd2):
 							if len(patnum) > 7 and patnum.startswith('0'):
 								updnum = patnum[1:8]
 							patent_id = updnum
+							# ids are derived from the patent number, a re-parse gives every row the same id again
+							row_ids = RowIds(patent_id)
 						if line.startswith('SRC'):
 							seriescode = re.search('SRC\s+(.*?)$',line).group(1)
 							try:
@@ -366,7 +213,7 @@ def parse_patents(fd,fd2):
 								assistexam = re.search('EXA\s+(.*?)$',line).group(1).split("; ")
 								assistexamfname = assistexam[1]
 								assistexamlname = assistexam[0]
-								examiner[id_generator()] = [patent_id,assistexamfname,assistexamlname,"assistant", "NULL"]
+								examiner[row_ids('rawexaminer')] = [patent_id,assistexamfname,assistexamlname,"assistant", "NULL"]
 							except:
 								pass
 						if line.startswith("EXP"):
@@ -375,7 +222,7 @@ def parse_patents(fd,fd2):
 								primexam = re.search('EXP\s+(.*?)$',line).group(1).split("; ")
 								primexamfname = primexam[1]
 								primexamlname = primexam[0]
-								examiner[id_generator()] = [patent_id,primexamfname,primexamlname,"primary", "NULL"]
+								examiner[row_ids('rawexaminer')] = [patent_id,primexamfname,primexamlname,"primary", "NULL"]
 							except:
 								pass
 
@@ -383,9 +230,9 @@ def parse_patents(fd,fd2):
 							exemplary = re.search('ECL\s+(.*?)$',line).group(1)
 							exemplary_list = exemplary.split(",")
 					if numfigs!='' or numsheets!='':
-					  	figureinfo[id_generator()] = [updnum,numfigs,numsheets]
+					  	figureinfo[row_ids('figures')] = [updnum,numfigs,numsheets]
 					if termpat!='' or disclaimerdate!='':
-						termofgrant[id_generator()] = [updnum,'',disclaimerdate,'',termpat,'']
+						termofgrant[row_ids('us_term_of_grant')] = [updnum,'',disclaimerdate,'',termpat,'']
 					
 					if int(appdate[:4]) >= 1992 and seriescode == "D":
 						seriescode = "29"
@@ -446,12 +293,12 @@ def parse_patents(fd,fd2):
 							invtotherinfo = re.sub('\s+',' ',invtotherinfo)
 						
 					
-					loc_idd = id_generator()
+					loc_idd = row_ids('rawlocation')
 					if invtcountry == "NULL":
 						invtcountry = 'US'
 					locs = [loc_idd,"NULL",invtcity,invtstate,invtcountry,invtzip]
-					rawlocation[id_generator()] = [l.replace("\r",'') for l in locs]
-					rawinventor[id_generator()] = [patent_id,"NULL",loc_idd,fname,lname,invtotherinfo,str(n),invtr47]
+					rawlocation[loc_idd] = [l.replace("\r",'') for l in locs]
+					rawinventor[row_ids('rawinventor')] = [patent_id,"NULL",loc_idd,fname,lname,invtotherinfo,str(n),invtr47]
 			except:
 				pass
 			
@@ -510,13 +357,13 @@ def parse_patents(fd,fd2):
 							assgotherinfo = ' '.join([o for o in assgotherinfo if o!=''])
 							assgotherinfo = re.sub('\s+',' ',assgotherinfo)
 							
-					loc_idd = id_generator()
+					loc_idd = row_ids('rawlocation')
 					if assgcountry == 'NULL':
 						assgcountry = 'US'
 					locs = [loc_idd,"NULL",assgcity,assgstate,assgcountry,assgzip]
-					rawlocation[id_generator()] = [l.replace("\r",'') for l in locs]
+					rawlocation[loc_idd] = [l.replace("\r",'') for l in locs]
 					assgd = [patent_id,"NULL",loc_idd,assgtype,assgfname,assglname,assgorg,assgotherinfo,str(n)]
-					rawassignee[id_generator()] = [a.replace("\r",'') for a in assgd]
+					rawassignee[row_ids('rawassignee')] = [a.replace("\r",'') for a in assgd]
 			except:
 				pass
 			
@@ -563,7 +410,7 @@ def parse_patents(fd,fd2):
 							group = re.sub('^\s+','',intclass[4:7])
 							subgroup = re.sub('^\s+','',intclass[7:])
 						
-						ipcr[id_generator()] = [patent_id,"NULL",intsec,mainclass,subclass, group,subgroup,"NULL","NULL","NULL","NULL","NULL","NULL",str(num)]
+						ipcr[row_ids('ipcr')] = [patent_id,"NULL",intsec,mainclass,subclass, group,subgroup,"NULL","NULL","NULL","NULL","NULL","NULL",str(num)]
 						num+=1     
 						
 					if line.startswith("OCL"):
@@ -579,7 +426,7 @@ def parse_patents(fd,fd2):
 							origsubclass = origsubclass.replace('.','')
 						if origsubclass != "":
 							mainclassdata[origmainclass] = [origmainclass]
-							uspc[id_generator()] = [patent_id,origmainclass,origmainclass+'/'+origsubclass,'0']
+							uspc[row_ids('uspc')] = [patent_id,origmainclass,origmainclass+'/'+origsubclass,'0']
 							subclassdata[origmainclass+'/'+origsubclass] = [origmainclass+'/'+origsubclass]
 						
 					if line.startswith("XCL"):
@@ -595,7 +442,7 @@ def parse_patents(fd,fd2):
 							crossrefsub = crossrefsub.replace(".","")
 						if crossrefsub != "":
 							mainclassdata[crossrefmain] = [crossrefmain]
-							uspc[id_generator()] = [patent_id,crossrefmain,crossrefmain+'/'+crossrefsub,str(crossclass)]
+							uspc[row_ids('uspc')] = [patent_id,crossrefmain,crossrefmain+'/'+crossrefsub,str(crossclass)]
 							subclassdata[crossrefmain+'/'+crossrefsub] = [crossrefmain+'/'+crossrefsub]
 							crossclass+=1
 						
@@ -632,7 +479,7 @@ def parse_patents(fd,fd2):
 							
 						if line.startswith('OCL'):
 							refpatclass = re.search('OCL\s\s(.*?)$',line).group(1) 
-					uspatentcitation[id_generator()] = [patent_id,refpatnum,refpatdate,refpatname,"NULL",'US',"NULL",str(n)]
+					uspatentcitation[row_ids('uspatentcitation')] = [patent_id,refpatnum,refpatdate,refpatname,"NULL",'US',"NULL",str(n)]
 			except:
 				pass
 			
@@ -668,7 +515,7 @@ def parse_patents(fd,fd2):
 							
 						if line.startswith('ICL'):
 							forrefpatclass = re.search('ICL\s\s(.*?)$',line).group(1) 
-					foreigncitation[id_generator()] = [patent_id,forrefpatdate,forrefpatnum,forrefpatcountry,"NULL",str(n)] 
+					foreigncitation[row_ids('foreigncitation')] = [patent_id,forrefpatdate,forrefpatnum,forrefpatcountry,"NULL",str(n)] 
 			except:
 				pass
 			
@@ -690,7 +537,7 @@ def parse_patents(fd,fd2):
 						if line.startswith('APN'):
 							priorappnum = re.search('APN\s+(.*?)$',line).group(1)
 							
-					prioritydata[id_generator()] = [patent_id,str(n),"",priorappnum,priorappdate,priorcountry] 
+					prioritydata[row_ids('foreign_priority')] = [patent_id,str(n),"",priorappnum,priorappdate,priorcountry] 
 					
 			except:
 				pass
@@ -708,13 +555,13 @@ def parse_patents(fd,fd2):
 							otherref = re.sub('\s+',' ',allrefs[a])
 							otherref = re.sub('^\s+[A-Z]+\s+','',otherref)
 							#print otherref
-							otherreference[id_generator()] = [patent_id,otherref,str(a)]
+							otherreference[row_ids('otherreference')] = [patent_id,otherref,str(a)]
 					else:
 						otherref = 'NULL'
 						otherref = re.sub('\s+',' ',otherreflist[n])
 						otherref = re.sub('^\s+[A-Z]+\s+','',otherref)
 						#print otherref
-						otherreference[id_generator()] = [patent_id,otherref,str(n)]
+						otherreference[row_ids('otherreference')] = [patent_id,otherref,str(n)]
 			except:
 				pass
 			
@@ -744,8 +591,8 @@ def parse_patents(fd,fd2):
 						if line.startswith('PCD'):
 							pctpubdate = re.sub('[\n\t\r\f]+','',re.search('PCD\s+(.*?)$',line).group(1))
 					
-					pctdata[id_generator()] = [patent_id,pctpubnum,pctpubdate,pct371,"WO","A","wo_grant",pct102]
-					pctdata[id_generator()] = [patent_id,pctnum,pctdate,pct371,"WO","00","pct_application",pct102]
+					pctdata[row_ids('pct_data')] = [patent_id,pctpubnum,pctpubdate,pct371,"WO","A","wo_grant",pct102]
+					pctdata[row_ids('pct_data')] = [patent_id,pctnum,pctdate,pct371,"WO","00","pct_application",pct102]
 					#pct_data.writerow(['uuid', 'patent_id', 'rel_id', 'date', '371_date', 'country', 'kind', "doc_type","sequence"])
 			except:
 				pass
@@ -778,7 +625,7 @@ def parse_patents(fd,fd2):
 									
 					
 						if [attfname,attlname,legalfirm,legalcountry] != ['NULL','NULL','NULL','NULL']:
-							rawlawyer[id_generator()] = ["NULL",patent_id,attfname,attlname,legalfirm,legalcountry,str(nnnn)]
+							rawlawyer[row_ids('rawlawyer')] = ["NULL",patent_id,attfname,attlname,legalfirm,legalcountry,str(nnnn)]
 							nnnn+=1
 						
 			except:
@@ -818,7 +665,7 @@ def parse_patents(fd,fd2):
 				draw_sequence = 1
 				for n in range(0,len(drawdesc) ):
 					if drawdesc[n] >1: #filter out blank entries
-						drawdescdata[id_generator()] =[patent_id,drawdesc[n],str(draw_sequence)] 
+						drawdescdata[row_ids('draw_desc_text')] =[patent_id,drawdesc[n],str(draw_sequence)] 
 						draw_sequence +=1
 			except:
 				pass
@@ -831,7 +678,7 @@ def parse_patents(fd,fd2):
 				detdesc = re.sub('PA\d+\s+',' ',detdesc)
 				detdesc = re.sub('TBL\s+','',detdesc)
 				detdesc = re.sub('\s+',' ',detdesc)
-				detail_desc_text[id_generator()] = [patent_id, detdesc, len(detdesc)]
+				detail_desc_text[row_ids('detail_desc_text')] = [patent_id, detdesc, len(detdesc)]
 			except:
 				pass
 
@@ -890,9 +737,9 @@ def parse_patents(fd,fd2):
 						reldoc = doctype
 						data = re.findall(doctype+' of.*?\s([\d+,]?\d+,\d+)\W|'+doctype+' of.*?\s(\d+/\d+,\d+)\W',parent.lower().replace('conti9nuation','continuation'))
 						for l in range(len(data)):
-							usreldoc[id_generator()] =[updnum,doctype.replace(" ","_").replace("-",'_'),'',data[l].replace(',',''),'','','',str(l),'']
+							usreldoc[row_ids('usreldoc')] =[updnum,doctype.replace(" ","_").replace("-",'_'),'',data[l].replace(',',''),'','','',str(l),'']
 				
-				relappdata[id_generator()] = [updnum,parent]
+				relappdata[row_ids('rel_app_text')] = [updnum,parent]
 				
 					
 			except:
@@ -984,7 +831,7 @@ def parse_patents(fd,fd2):
 						exemplary = True
 					claim_stripped = re.sub('^\s\d+\.\s','',v)
 					claim_stripped = claim_stripped.lstrip('12234567890.')
-					claimsdata[id_generator()] = [updnum,claim_stripped,"NULL",str(k), exemplary]
+					claimsdata[row_ids('claim')] = [updnum,claim_stripped,"NULL",str(k), exemplary]
 					#claimsdata[id_generator()] = [updnum,re.sub('^\s\d+\.\s','',v),"NULL",str(k), exemplary]
 				if len(datum) == 0:
 					pass
@@ -1013,7 +860,7 @@ def parse_patents(fd,fd2):
 						exemplary = True
 					text_stripped = re.sub('^PAR\s+','',text)
 					text_stripped = text_stripped.lstrip('12234567890.')
-					claimsdata[id_generator()]=[updnum,text_stripped,"NULL",'1', exemplary]
+					claimsdata[row_ids('claim')]=[updnum,text_stripped,"NULL",'1', exemplary]
 					#claimsdata[id_generator()]=[updnum,re.sub('^PAR\s+','',text),"NULL",'1', exemplary]
 				else:
 					pass
@@ -1025,7 +872,7 @@ def parse_patents(fd,fd2):
 			
 			
 			brf_sum_textfile = csv.writer(open(os.path.join(fd2,'brf_sum_text.csv'),'ab'),delimiter='\t')
-			brf_sum_textfile.writerow([id_generator(),patent_id, bsum])
+			brf_sum_textfile.writerow([row_ids('brf_sum_text'),patent_id, bsum])
 			
 			det_desc_textfile = csv.writer(open(os.path.join(fd2,'detail_desc_text.csv'),'ab'),delimiter='\t')
 			for k,v in detail_desc_text.items():
@@ -1104,10 +951,248 @@ def parse_patents(fd,fd2):
 			us_term_of_grantfile = csv.writer(open(os.path.join(fd2,'us_term_of_grant.csv'),'ab'),delimiter='\t')
 			for k,v in termofgrant.items():
 				us_term_of_grantfile.writerow([k]+v)
-			
-		# except:
-		# 	traceback.print_exc()
-			  
+	return numii
+
+
+def shard_job(fd2, fd, d, shard_dir):
+	"""
+	Arguments of parse_file_shard for the archive d in fd, parsed into
+	shard_dir for the output in fd2
+	"""
+	return fd, d, shard_dir
+
+
+def parse_file_shard(args):
+	"""
+	Worker for parse_files_parallel and the parse engine: parse one archive into its own shard
+	directory and hand back the de-duplication dicts instead of writing them
+	"""
+	fd, d, shard_dir = args
+	os.mkdir(shard_dir)
+	rawlocation = {}
+	mainclassdata = {}
+	subclassdata = {}
+	numii = parse_file(fd, d, shard_dir, rawlocation, mainclassdata, subclassdata)
+	return d, numii, rawlocation, mainclassdata, subclassdata
+
+
+def merge_shard(fd2, shard_dir):
+	"""
+	Append the csv files of a shard directory to those in fd2
+	"""
+	for table in sorted(os.listdir(shard_dir)):
+		with open(os.path.join(fd2, table), 'ab') as outfile:
+			with open(os.path.join(shard_dir, table), 'rb') as shardfile:
+				shutil.copyfileobj(shardfile, outfile)
+
+
+def parse_files_parallel(fd, diri, fd2, processes, rawlocation, mainclassdata, subclassdata):
+	"""
+	Parse archives in a pool of worker processes. Every worker writes its rows
+	to a shard directory of its own; the shards are appended to the csv files
+	in fd2 in the order of diri, so the output does not depend on which worker
+	finishes first. The workers' rawlocation, mainclass and subclass dicts are
+	merged into the ones passed in, in the same order.
+	Returns the number of records parsed.
+	"""
+	shard_root = tempfile.mkdtemp(prefix='shards_', dir=fd2)
+	jobs = [shard_job(fd2, fd, d, os.path.join(shard_root, str(n))) for n, d in enumerate(diri)]
+	numii = 0
+	pool = multiprocessing.Pool(processes)
+	try:
+		for job, result in zip(jobs, pool.imap(parse_file_shard, jobs)):
+			d, file_numii, file_rawlocation, file_mainclassdata, file_subclassdata = result
+			shard_dir = job[2]
+			merge_shard(fd2, shard_dir)
+			shutil.rmtree(shard_dir)
+			rawlocation.update(file_rawlocation)
+			mainclassdata.update(file_mainclassdata)
+			subclassdata.update(file_subclassdata)
+			numii += file_numii
+			print d, "merged"
+		pool.close()
+	except:
+		pool.terminate()
+		raise
+	finally:
+		pool.join()
+		shutil.rmtree(shard_root, ignore_errors=True)
+	return numii
+
+
+def open_output(fd2):
+	"""
+	Write the header of every csv file in fd2. Returns fd2, which parse_file
+	appends the rows to.
+	"""
+	appfile = open(os.path.join(fd2,'application.csv'),'wb')
+	appfile.write(codecs.BOM_UTF8)
+	app = csv.writer(appfile,delimiter='\t')
+	app.writerow(['id','patent_id','type','number','country','date'])
+	
+	claimsfile = open(os.path.join(fd2,'claim.csv'),'wb')
+	claimsfile.write(codecs.BOM_UTF8)
+	clms = csv.writer(claimsfile,delimiter='\t')
+	clms.writerow(['uuid','patent_id','text','dependent','sequence', 'exemplary'])
+	
+	rawlocfile = open(os.path.join(fd2,'rawlocation.csv'),'wb')
+	rawlocfile.write(codecs.BOM_UTF8)
+	rawloc = csv.writer(rawlocfile,delimiter='\t')
+	rawloc.writerow(['id','location_id','city','state','country','zip_code'])
+	
+	rawinvfile = open(os.path.join(fd2,'rawinventor.csv'),'wb')
+	rawinvfile.write(codecs.BOM_UTF8)
+	rawinv = csv.writer(rawinvfile,delimiter='\t')
+	rawinv.writerow(['uuid','patent_id','inventor_id','rawlocation_id','name_first','name_last',"other_info",'sequence',"rule_47"])
+	
+	rawassgfile = open(os.path.join(fd2,'rawassignee.csv'),'wb')
+	rawassgfile.write(codecs.BOM_UTF8)
+	rawassg = csv.writer(rawassgfile,delimiter='\t')
+	rawassg.writerow(['uuid','patent_id','assignee_id','rawlocation_id','type','name_first','name_last','organization',"other_info",'sequence'])
+	
+	ipcrfile = open(os.path.join(fd2,'ipcr.csv'),'wb')
+	ipcrfile.write(codecs.BOM_UTF8)
+	ipcr = csv.writer(ipcrfile,delimiter='\t')
+	ipcr.writerow(['uuid','patent_id','classification_level','section','mainclass','subclass','main_group','subgroup','symbol_position','classification_value','classification_status','classification_data_source','action_date','ipc_version_indicator','sequence'])
+	
+	patfile = open(os.path.join(fd2,'patent.csv'),'wb')
+	patfile.write(codecs.BOM_UTF8)
+	pat = csv.writer(patfile,delimiter='\t')
+	pat.writerow(['id','type','number','country','date','abstract','title','kind','num_claims', 'filename'])
+	
+	uspatentcitfile = open(os.path.join(fd2,'uspatentcitation.csv'),'wb')
+	uspatentcitfile.write(codecs.BOM_UTF8)
+	uspatcit = csv.writer(uspatentcitfile,delimiter='\t')
+	uspatcit.writerow(['uuid','patent_id','citation_id','date','name','kind','country','category','sequence'])
+	
+	foreigncitfile = open(os.path.join(fd2,'foreigncitation.csv'),'wb')
+	foreigncitfile.write(codecs.BOM_UTF8)
+	foreigncit = csv.writer(foreigncitfile,delimiter='\t')
+	foreigncit.writerow(['uuid','patent_id','date','number','country','category','sequence'])
+	
+	otherreffile = open(os.path.join(fd2,'otherreference.csv'),'wb')
+	otherreffile.write(codecs.BOM_UTF8)
+	otherref = csv.writer(otherreffile,delimiter='\t')
+	otherref.writerow(['uuid','patent_id','text','sequence'])
+	
+	examfile = open(os.path.join(fd2,'examiner.csv'),'wb')
+	examfile.write(codecs.BOM_UTF8)
+	examiner = csv.writer(examfile,delimiter='\t')
+	examiner.writerow(['id','patent_id','fname','lname','role','group'])
+	
+	rawlawyerfile = open(os.path.join(fd2,'rawlawyer.csv'),'wb')
+	rawlawyerfile.write(codecs.BOM_UTF8)
+	rawlawyer = csv.writer(rawlawyerfile,delimiter='\t')
+	rawlawyer.writerow(['uuid','lawyer_id','patent_id','name_first','name_last','organization','country','sequence'])
+	
+	uspcfile = open(os.path.join(fd2,'uspc.csv'),'wb')
+	uspcfile.write(codecs.BOM_UTF8)
+	uspcc = csv.writer(uspcfile,delimiter='\t')
+	uspcc.writerow(['uuid','patent_id','mainclass_id','subclass_id','sequence'])
+
+	mainclassfile = open(os.path.join(fd2,'mainclass.csv'),'wb')
+	mainclassfile.write(codecs.BOM_UTF8)
+	mainclass = csv.writer(mainclassfile,delimiter='\t')
+	mainclass.writerow(['id'])
+
+	subclassfile = open(os.path.join(fd2,'subclass.csv'),'wb')
+	subclassfile.write(codecs.BOM_UTF8)
+	subclass = csv.writer(subclassfile,delimiter='\t')
+	subclass.writerow(['id'])
+	
+	### New fields ###
+	forpriorityfile = open(os.path.join(fd2,'foreign_priority.csv'),'wb')
+	forpriorityfile.write(codecs.BOM_UTF8)
+	forpriority = csv.writer(forpriorityfile,delimiter='\t')
+	forpriority.writerow(['uuid', 'patent_id', "sequence", "kind", "app_num", "app_date", "country"])
+
+	##### BEGIN PARENT CASE logical group is the USRELDOC #####
+
+	usreldocfile = open(os.path.join(fd2,'usreldoc.csv'), 'wb')
+	usreldocfile.write(codecs.BOM_UTF8)
+	usrel = csv.writer(usreldocfile, delimiter='\t')
+	usrel.writerow(['uuid', 'patent_id', 'doc_type',  'relkind', 'reldocno', 'relcountry', 'reldate',  'parent_status', 'rel_seq','kind'])
+
+	##### END PARENT CASE logical group is the USRELDOC #####
+	
+	us_term_of_grantfile = open(os.path.join(fd2,'us_term_of_grant.csv'), 'wb')
+	us_term_of_grantfile.write(codecs.BOM_UTF8)
+	us_term_of_grant = csv.writer(us_term_of_grantfile, delimiter='\t')
+	us_term_of_grant.writerow(['uuid','patent_id','lapse_of_patent', 'disclaimer_date' 'term_disclaimer', 'term_grant', 'term_ext'])
+
+	draw_desc_textfile = open(os.path.join(fd2,'draw_desc_text.csv'), 'wb')
+	draw_desc_textfile.write(codecs.BOM_UTF8)
+	drawdesc = csv.writer(draw_desc_textfile, delimiter='\t')
+	drawdesc.writerow(['uuid', 'patent_id', 'text', 'seq'])
+
+	brf_sum_textfile = open(os.path.join(fd2,'brf_sum_text.csv'), 'wb')
+	brf_sum_textfile.write(codecs.BOM_UTF8)
+	brf_sum = csv.writer(brf_sum_textfile, delimiter='\t')
+	brf_sum.writerow(['uuid', 'patent_id', 'text'])
+
+	det_desc_textfile = open(os.path.join(fd2,'detail_desc_text.csv'), 'wb')
+	det_desc_textfile.write(codecs.BOM_UTF8)
+	det_desc = csv.writer(det_desc_textfile, delimiter='\t')
+	det_desc.writerow(['uuid', 'patent_id', 'text', 'length'])
+
+	rel_app_textfile = open(os.path.join(fd2,'rel_app_text.csv'), 'wb')
+	rel_app_textfile.write(codecs.BOM_UTF8)
+	rel_app = csv.writer(rel_app_textfile, delimiter='\t')
+	rel_app.writerow(['uuid', 'patent_id',"text"])
+
+	non_inventor_applicantfile = open(os.path.join(fd2,'non_inventor_applicant.csv'),'wb')
+	non_inventor_applicantfile.write(codecs.BOM_UTF8)
+	noninventorapplicant = csv.writer(non_inventor_applicantfile,delimiter='\t')
+	noninventorapplicant.writerow(['uuid', 'patent_id', "location_id", "last_name", "first_name", "org_name", "sequence", "designation", "applicant_type"])
+
+	pct_datafile = open(os.path.join(fd2,'pct_data.csv'), 'wb')
+	pct_datafile.write(codecs.BOM_UTF8)
+	pct_data = csv.writer(pct_datafile, delimiter='\t')
+	pct_data.writerow(['uuid', 'patent_id', 'rel_id', 'date', '371_date', 'country', 'kind', "doc_type","102_date"])
+
+	botanicfile = open(os.path.join(fd2,'botanic.csv'), 'wb')
+	botanicfile.write(codecs.BOM_UTF8)
+	botanic_info = csv.writer(botanicfile, delimiter='\t')
+	botanic_info.writerow(['uuid', 'patent_id', 'latin_name', "variety"])
+
+	figurefile = open(os.path.join(fd2,'figures.csv'), 'wb')
+	figurefile.write(codecs.BOM_UTF8)
+	figure_info = csv.writer(figurefile, delimiter='\t')
+	figure_info.writerow(['uuid', 'patent_id', 'num_figs', "num_sheets"])   
+	
+	mainclassfile.close()
+	subclassfile.close()
+	appfile.close()
+	rawlocfile.close()
+	rawinvfile.close()
+	rawassgfile.close()
+	ipcrfile.close()
+	otherreffile.close()
+	foreigncitfile.close()
+	patfile.close()
+	rawlawyerfile.close()
+	uspatentcitfile.close()
+	uspcfile.close()
+	claimsfile.close()
+	examfile.close()
+	forpriorityfile.close()
+	us_term_of_grantfile.close()
+	usreldocfile.close()
+	non_inventor_applicantfile.close()
+	draw_desc_textfile.close()
+	brf_sum_textfile.close()
+	rel_app_textfile.close()
+	det_desc_textfile.close()
+	pct_datafile.close()
+	botanicfile.close()
+	figurefile.close()
+	return fd2
+
+
+def close_output(fd2, rawlocation, mainclassdata, subclassdata):
+	"""
+	Append the de-duplicated rawlocation, mainclass and subclass rows.
+	"""
 	rawlocfile = csv.writer(open(os.path.join(fd2,'rawlocation.csv'),'ab'),delimiter='\t')
 	for k,v in rawlocation.items():
 		rawlocfile.writerow(v)
@@ -1119,6 +1204,37 @@ def parse_patents(fd,fd2):
 	subclassfile = csv.writer(open(os.path.join(fd2,'subclass.csv'),'ab'),delimiter='\t')
 	for k,v in subclassdata.items():
 		subclassfile.writerow(v)
+
+
+def parse_patents(fd,fd2,processes=1):
+	fd+='/'
+	fd2+='/'
+	diri = os.listdir(fd)
+	diri = [d for d in diri if d.endswith('zip')]
+
+	#Remove all files from output dir before writing
+	outdir = os.listdir(fd2)
+	for oo in outdir:
+		if os.path.isdir(os.path.join(fd2,oo)):
+			shutil.rmtree(os.path.join(fd2,oo))
+		else:
+			os.remove(os.path.join(fd2,oo))
+
+	#Rewrite files and write headers to them
+	open_output(fd2)
+
+	numii = 0
+	rawlocation = {}
+	mainclassdata = {}
+	subclassdata = {}
+
+	if processes > 1:
+		numii = parse_files_parallel(fd, diri, fd2, processes, rawlocation, mainclassdata, subclassdata)
+	else:
+		for d in diri:
+			numii += parse_file(fd, d, fd2, rawlocation, mainclassdata, subclassdata)
+	
+	close_output(fd2, rawlocation, mainclassdata, subclassdata)
 		
 if __name__ == '__main__':
 	parse_patents("D:/PV_Patches/MissingApplicationDate/DataIn", "D:/PV_Patches/MissingApplicationDate/DataOut")
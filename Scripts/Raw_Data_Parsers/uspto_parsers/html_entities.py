@@ -0,0 +1,101 @@
+"""
+Entity unescaping shared by the parsers and loaders.
+
+The entity table is generated once from the htmlentities file into
+entity_table.py (see build_entity_table.py), so nothing needs to be read or
+rebuilt at runtime. Both functions make a single pass over the text and
+return the same type they are given: unicode text comes back as unicode,
+utf-8 encoded byte strings come back utf-8 encoded.
+
+Both keep the output the parsers and loaders have always produced. The
+parsers only replace the USPTO entities that stand for ASCII text: their
+old lookup failed to utf-8 encode the others and left them in place. The
+loaders decode what HTMLParser.unescape did, the standard HTML entities.
+"""
+import re
+
+try:
+    from htmlentitydefs import name2codepoint
+except ImportError:
+    from html.entities import name2codepoint
+
+from entity_table import ENTITIES
+
+try:
+    unichr
+except NameError:
+    unichr = chr
+
+# named references only, as the parsers have always matched them
+ENTITY_REF = re.compile(r'&(\w+?);')
+# named and numeric references
+CHAR_REF = re.compile(r'&(#[xX][0-9a-fA-F]+|#\d+|\w+?);')
+ENTITY_REF_BYTES = re.compile(br'&(\w+?);')
+CHAR_REF_BYTES = re.compile(br'&(#[xX][0-9a-fA-F]+|#\d+|\w+?);')
+
+# the USPTO entities the parsers replace
+ASCII_ENTITIES = dict((name, text) for name, text in ENTITIES.items() if all(ord(c) < 128 for c in text))
+ASCII_ENTITIES['apos'] = u"'"
+# the entities the loaders replace, those of HTMLParser.unescape
+HTML_ENTITIES = dict((name, unichr(codepoint)) for name, codepoint in name2codepoint.items())
+HTML_ENTITIES['apos'] = u"'"
+
+
+def _lookup(ref, table):
+    """
+    Replacement text for the entity or character reference ref (without the
+    & and ;), or None when it is unknown.
+    """
+    if ref[0] != '#':
+        return table.get(ref)
+    try:
+        if ref[1] in 'xX':
+            return unichr(int(ref[2:], 16))
+        return unichr(int(ref[1:]))
+    except (ValueError, OverflowError):
+        return None
+
+
+def _replacer(table, encoded):
+    def replace(m):
+        ref = m.group(1)
+        if encoded:
+            ref = ref.decode('ascii')
+        text = _lookup(ref, table)
+        if text is None:
+            return m.group()
+        if encoded:
+            try:
+                return text.encode('utf-8')
+            except UnicodeError:
+                # lone surrogates have no utf-8 encoding
+                return m.group()
+        return text
+    return replace
+
+
+_entity = _replacer(ASCII_ENTITIES, False)
+_entity_bytes = _replacer(ASCII_ENTITIES, True)
+_char = _replacer(HTML_ENTITIES, False)
+_char_bytes = _replacer(HTML_ENTITIES, True)
+
+
+def unescape_entities(text):
+    """
+    Replace the USPTO named entities that stand for ASCII text (&lsqb; and
+    the like) in text. The others, numeric references and unknown names are
+    left alone.
+    """
+    if isinstance(text, bytes):
+        return ENTITY_REF_BYTES.sub(_entity_bytes, text)
+    return ENTITY_REF.sub(_entity, text)
+
+
+def unescape(text):
+    """
+    Replace the standard HTML named entities and numeric character
+    references in text, like HTMLParser.unescape.
+    """
+    if isinstance(text, bytes):
+        return CHAR_REF_BYTES.sub(_char_bytes, text)
+    return CHAR_REF.sub(_char, text)
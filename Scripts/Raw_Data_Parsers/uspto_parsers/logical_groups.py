@@ -0,0 +1,69 @@
+import re
+
+# every line-leading tag or processing instruction, e.g. "\n<claims" or "\n<?BRFSUM"
+_TAG_START = re.compile(r'\n<([?\w-]+)')
+
+
+def index_logical_groups(doc, loggroups, tag_cache=None):
+    """
+    Split a patent document into its top-level logical groups in one pass.
+
+    Returns the same avail_fields dict the per-group split loop used to build:
+    for each group j, the text that follows every "\\n<" + j up to the first
+    j + ">" (or the next occurrence of the group), as a string when the group
+    occurs once and as a list when it occurs several times. Like the split it
+    replaces, j matches any tag that starts with j, so "priority-claim" also
+    picks up "priority-claims".
+
+    The document is scanned once for line-leading tags; afterwards each group
+    only searches its own slice. tag_cache maps tag names to the groups they
+    belong to and can be shared between documents.
+    """
+    if tag_cache is None:
+        tag_cache = {}
+    starts = {}
+    for m in _TAG_START.finditer(doc):
+        tag = m.group(1)
+        groups = tag_cache.get(tag)
+        if groups is None:
+            groups = [j for j in loggroups if tag.startswith(j)]
+            tag_cache[tag] = groups
+        for j in groups:
+            starts.setdefault(j, []).append(m.start())
+
+    avail_fields = {}
+    for j, positions in starts.items():
+        offset = len(j) + 2
+        end_tag = j + ">"
+        items = []
+        for n, pos in enumerate(positions):
+            start = pos + offset
+            if n + 1 < len(positions):
+                stop = positions[n + 1]
+            else:
+                stop = len(doc)
+            end = doc.find(end_tag, start, stop)
+            if end == -1:
+                end = stop
+            items.append(doc[start:end])
+        if len(items) == 1:
+            avail_fields[j] = items[0]
+        else:
+            avail_fields[j] = items
+    return avail_fields
+
+
+def text_between(doc, start_marker, end_marker=None):
+    """
+    Return the text after the first start_marker, up to end_marker or, when no
+    end_marker is given, up to the next start_marker. Returns None when
+    start_marker is missing.
+    """
+    start = doc.find(start_marker)
+    if start == -1:
+        return None
+    start += len(start_marker)
+    end = doc.find(end_marker or start_marker, start)
+    if end == -1:
+        return doc[start:]
+    return doc[start:end]
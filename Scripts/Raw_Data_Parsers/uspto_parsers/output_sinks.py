@@ -0,0 +1,370 @@
+"""
+Output sinks for the parser tables.
+
+A sink takes the rows of one table and writes them out as the tab separated
+files the parsers have always produced. Rows are formatted into an in-memory
+buffer and written every flush_rows rows, instead of reopening the file for
+every document. There are three kinds of sink:
+
+  CsvSink       writes <table>.csv, or <table>.csv.gz when compressed
+  LoadDataSink  streams the rows, cleaned up as csv_to_mysql.mysql_upload
+                does, into MySQL with LOAD DATA LOCAL INFILE through a named
+                pipe, so the file never touches the disk
+  ParquetSink   writes <table>.parquet with typed columns, for loaders and
+                analysis that should not have to parse text (needs pyarrow)
+
+sink_factory picks one of them from the output options.
+"""
+import codecs
+import csv
+import errno
+import fcntl
+import gzip
+import os
+import shutil
+import tempfile
+import threading
+import time
+from cStringIO import StringIO
+
+from html_entities import unescape
+
+FLUSH_ROWS = 1000
+COMPRESS_LEVEL = 6
+
+# tables whose rows LoadDataSink leaves out when their id is already in the database, as mysql_upload does
+EXISTING_ID_TABLES = frozenset(['rawlocation', 'mainclass', 'subclass'])
+
+# columns stored as integers in Parquet output, every other column is a string
+INTEGER_COLUMNS = frozenset(['sequence', 'dependent', 'num_claims', 'num_figs', 'num_sheets', 'rel_seq', 'term_ext'])
+
+
+class CsvSink(object):
+    """
+    Buffered writer for the rows of one table. When a header is given the
+    file starts with a UTF-8 BOM and the header row, as the parsers' csv files
+    always have.
+    """
+
+    def __init__(self, path, header=None, flush_rows=FLUSH_ROWS, compress=False):
+        if compress:
+            path += '.gz'
+        self.path = path
+        self.flush_rows = flush_rows
+        self.compress = compress
+        self.buffer = StringIO()
+        self.writer = csv.writer(self.buffer, delimiter='\t')
+        self.pending = 0
+        self.outfile = self._open()
+        if header is not None:
+            self.buffer.write(codecs.BOM_UTF8)
+            self.writerow(header)
+
+    def _open(self):
+        if self.compress:
+            return gzip.open(self.path, 'wb', COMPRESS_LEVEL)
+        return open(self.path, 'wb')
+
+    def writerow(self, row):
+        self.writer.writerow(row)
+        self.pending += 1
+        if self.pending >= self.flush_rows:
+            self.flush()
+
+    def writerows(self, rows):
+        for row in rows:
+            self.writerow(row)
+
+    def write_raw(self, infile):
+        """
+        Append rows that are already formatted, e.g. a shard file written by
+        another sink, by copying them from the open file infile.
+        """
+        self.flush()
+        shutil.copyfileobj(infile, self.outfile)
+
+    def flush(self):
+        self.outfile.write(self.buffer.getvalue())
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        self.pending = 0
+
+    def close(self):
+        self.flush()
+        self.outfile.close()
+
+
+class LoadDataSink(CsvSink):
+    """
+    Sink that loads the rows of a table straight into MySQL. The rows go into
+    a named pipe which a loader thread hands to LOAD DATA LOCAL INFILE, using
+    the same statement as csv_to_mysql.upload_csv. connect is called in the
+    loader thread and must return a connection that allows local infile (see
+    mysql_connector); the table must exist with the columns of the csv file.
+
+    Every row gets the cleanup csv_to_mysql.mysql_upload gives the csv files:
+    entities are unescaped, " becomes ', and rows of the tables in
+    EXISTING_ID_TABLES whose id is already in the database are left out.
+    mysql_upload also folds the rows of duplicate and merged patents into
+    one patent, which a stream cannot do, so a patent row with a number seen
+    before, or without one, raises DuplicatePatentError instead of being
+    loaded; parse such input to csv files and run mysql_upload.
+    """
+
+    def __init__(self, connect, table, header=None, flush_rows=FLUSH_ROWS):
+        self.table = table
+        self.error = None
+        self.existing = None
+        if table in EXISTING_ID_TABLES:
+            self.existing = existing_ids(connect, table)
+        self.number_column = None
+        if table == 'patent' and header is not None and 'number' in header:
+            self.number_column = list(header).index('number')
+        self.numbers = set()
+        self.header_written = header is None
+        self.pipe_dir = tempfile.mkdtemp(prefix='sink_')
+        path = os.path.join(self.pipe_dir, table + '.csv')
+        os.mkfifo(path)
+        self.loader = threading.Thread(target=self._load, args=(connect, path, header is not None))
+        self.loader.daemon = True
+        self.loader.start()
+        CsvSink.__init__(self, path, header, flush_rows)
+
+    def _load(self, connect, path, skip_header):
+        query = ("load data local infile '" + path + "' into table " + self.table +
+                 " fields terminated by '\t' optionally enclosed by '\"' lines terminated by '\r\n'")
+        if skip_header:
+            query += " ignore 1 lines"
+        try:
+            mydb = connect()
+            try:
+                mydb.cursor().execute(query)
+                mydb.commit()
+            finally:
+                mydb.close()
+        except Exception as e:
+            self.error = e
+
+    def _open(self):
+        # Opening a pipe for writing blocks until the MySQL client opens it for reading. Poll
+        # without blocking instead, so a LOAD DATA that fails before that raises here rather
+        # than hanging the parser.
+        while True:
+            try:
+                fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+                break
+            except OSError as e:
+                if e.errno != errno.ENXIO:
+                    raise
+                if not self.loader.is_alive():
+                    shutil.rmtree(self.pipe_dir, ignore_errors=True)
+                    raise IOError("LOAD DATA into {} failed: {}".format(self.table, self.error))
+                time.sleep(0.01)
+        fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) & ~os.O_NONBLOCK)
+        return os.fdopen(fd, 'wb')
+
+    def writerow(self, row):
+        row = [clean_value(value) for value in row]
+        if not self.header_written:
+            self.header_written = True
+        elif self.existing is not None and _id_key(row[0]) in self.existing:
+            return
+        elif self.number_column is not None:
+            number = row[self.number_column] if self.number_column < len(row) else None
+            if number is None or number == 'NULL' or number in self.numbers:
+                raise DuplicatePatentError("Patent {} has {} number {}; --load-data cannot merge duplicate patents, "
+                                           "write csv files and run csv_to_mysql.mysql_upload".format(
+                                               row[1] if len(row) > 1 else row[0],
+                                               'a duplicate' if number in self.numbers else 'no', number))
+            self.numbers.add(number)
+        CsvSink.writerow(self, row)
+
+    def write_raw(self, infile):
+        """
+        Append the rows of a csv shard file, read back so they get the same
+        cleanup as the rows written directly.
+        """
+        for row in csv.reader(infile, delimiter='\t'):
+            self.writerow(row)
+
+    def close(self):
+        try:
+            CsvSink.close(self)
+            self.loader.join()
+        finally:
+            shutil.rmtree(self.pipe_dir, ignore_errors=True)
+        if self.error is not None:
+            raise self.error
+
+
+class DuplicatePatentError(ValueError):
+    pass
+
+
+def clean_value(value):
+    """
+    A value as csv_to_mysql.mysql_upload writes it: entities unescaped, "
+    replaced by ', and utf-8 encoded.
+    """
+    if isinstance(value, unicode):
+        value = value.encode('utf-8')
+    if isinstance(value, str):
+        return unescape(value).replace('"', "'")
+    return value
+
+
+def _id_key(value):
+    if isinstance(value, unicode):
+        value = value.encode('utf-8')
+    return str(value).lower()
+
+
+def existing_ids(connect, table):
+    """
+    The ids already in a table, lower case and utf-8 encoded, as
+    csv_to_mysql.mysql_upload compares them.
+    """
+    mydb = connect()
+    try:
+        cursor = mydb.cursor()
+        cursor.execute('select id from ' + table)
+        return set(_id_key(f[0]) for f in cursor.fetchall())
+    finally:
+        mydb.close()
+
+
+def _integer(value):
+    if value is None or value == '' or value == 'NULL':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _text(value):
+    if value is None or value == 'NULL':
+        return None
+    if isinstance(value, unicode):
+        return value
+    if isinstance(value, str):
+        return value.decode('utf-8', 'replace')
+    return unicode(value)
+
+
+class ParquetSink(object):
+    """
+    Sink that writes the rows of one table to a Parquet file. The columns are
+    named after the header; those in INTEGER_COLUMNS are int64, the others
+    strings, and NULL values (and empty integers) are stored as nulls. Rows
+    shorter than the header leave the remaining columns null.
+
+    Every flush writes one row group. writerows only flushes after the whole
+    batch, so the rows of a patent that the parser passes in one call never
+    straddle two row groups.
+    """
+
+    def __init__(self, path, header, flush_rows=FLUSH_ROWS, compress=False):
+        import pyarrow
+        import pyarrow.parquet
+        self.pyarrow = pyarrow
+        self.path = path
+        self.flush_rows = flush_rows
+        self.columns = list(header)
+        self.converters = [_integer if name in INTEGER_COLUMNS else _text for name in self.columns]
+        self.schema = pyarrow.schema([pyarrow.field(name, pyarrow.int64() if name in INTEGER_COLUMNS else pyarrow.string())
+                                      for name in self.columns])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema, compression='gzip' if compress else 'snappy')
+        self.rows = []
+
+    def _append(self, row):
+        if len(row) > len(self.columns):
+            raise ValueError("{} values for the {} columns of {}".format(len(row), len(self.columns), self.path))
+        self.rows.append(row)
+
+    def writerow(self, row):
+        self._append(row)
+        if len(self.rows) >= self.flush_rows:
+            self.flush()
+
+    def writerows(self, rows):
+        for row in rows:
+            self._append(row)
+        if len(self.rows) >= self.flush_rows:
+            self.flush()
+
+    def write_raw(self, infile):
+        """
+        Append the row groups of the Parquet shard in the open file infile as
+        they are.
+        """
+        import pyarrow.parquet
+        self.flush()
+        shard = pyarrow.parquet.ParquetFile(infile)
+        for n in range(shard.num_row_groups):
+            self.writer.write_table(shard.read_row_group(n))
+
+    def flush(self):
+        if not self.rows:
+            return
+        arrays = []
+        for n, (field, convert) in enumerate(zip(self.schema, self.converters)):
+            values = [convert(row[n]) if n < len(row) else None for row in self.rows]
+            arrays.append(self.pyarrow.array(values, type=field.type))
+        self.writer.write_table(self.pyarrow.Table.from_arrays(arrays, schema=self.schema))
+        self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def mysql_connector(host, username, password, dbname):
+    """
+    Function that opens a MySQL connection for LoadDataSink.
+    """
+    import MySQLdb
+
+    def connect():
+        return MySQLdb.connect(host=host,
+                               user=username,
+                               passwd=password,
+                               db=dbname,
+                               charset='utf8',
+                               use_unicode=True,
+                               local_infile=1)
+    return connect
+
+
+def sink_factory(output_dir, flush_rows=FLUSH_ROWS, compress=False, connect=None, parquet=False, shard=False):
+    """
+    Function that opens the sink for a table, called as open_sink(table, header).
+    Tables are loaded into MySQL when connect is given, written to
+    <table>.parquet in output_dir when parquet is set, and written to
+    <table>.csv in output_dir otherwise. compress gzips the csv files, and
+    switches Parquet from snappy to gzip compression.
+    Shard sinks are appended to another sink later, so their csv files get no
+    BOM and header row.
+    """
+    def open_sink(table, header=None):
+        if connect is not None:
+            return LoadDataSink(connect, table, header, flush_rows)
+        if parquet:
+            return ParquetSink(os.path.join(output_dir, table + '.parquet'), header, flush_rows, compress)
+        return CsvSink(os.path.join(output_dir, table + '.csv'), None if shard else header, flush_rows, compress)
+    return open_sink
+
+
+def close_sinks(sinks):
+    """
+    Close every sink in the dict sinks, and raise the first error afterwards.
+    """
+    error = None
+    for table in sorted(sinks):
+        try:
+            sinks[table].close()
+        except Exception as e:
+            if error is None:
+                error = e
+    if error is not None:
+        raise error
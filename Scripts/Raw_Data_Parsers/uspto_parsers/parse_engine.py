@@ -0,0 +1,186 @@
+"""
+Parse engine for input directories that mix the USPTO full-text formats.
+
+The format of every input file is worked out from keywords in its first
+lines, the way USPTO_GI_Parser does it, instead of being given by --period:
+
+  1976-2001  APS text archives (zip), parsed by generic_parser_1976_2001
+  2002-2004  ST.32 SGML/XML archives (zip), parsed by generic_parser_2002_2004
+  2005       XML version 4.x weekly files, parsed by generic_parser_2005
+
+The files of all formats are parsed in one pool of worker processes, each
+file by the parser of its format. The three parsers write tables with
+different columns, so every format gets a subdirectory of the output
+directory named after it, holding the same files its parser writes on its
+own.
+"""
+import itertools
+import multiprocessing
+import os
+import shutil
+import tempfile
+import zipfile
+
+import generic_parser_1976_2001
+import generic_parser_2002_2004
+import generic_parser_2005
+from output_sinks import FLUSH_ROWS
+
+# Keywords found in the first lines of the data files, and the format they identify
+SUPPORTED_FILE_TYPES = [["HHHHHT", "1976-2001"],
+                        ["DTD ST.32 US PATENT GRANT V2.4", "2002-2004"],
+                        ["ST32-US-Grant-025xml.dtd", "2002-2004"],
+                        ["us-patent-grant-v4", "2005"]]  # us-patent-grant-v40-2004-12-02.dtd and later
+SNIFF_LINES = 6
+
+PARSERS = {"1976-2001": generic_parser_1976_2001,
+           "2002-2004": generic_parser_2002_2004,
+           "2005": generic_parser_2005}
+# whether the parser of a format reads zip archives or unzipped files
+ZIPPED = {"1976-2001": True, "2002-2004": True, "2005": False}
+# formats whose parser takes the output options, the others always write csv files
+SINK_FORMATS = ("2005",)
+
+
+def _match_file_type(infile):
+    for n in range(SNIFF_LINES):
+        lower_line = infile.readline().lower()
+        for keyword, file_type in SUPPORTED_FILE_TYPES:
+            if keyword.lower() in lower_line:
+                return file_type
+    return None
+
+
+def ascertain_file_type(path):
+    """
+    The format of the file at path, from the first lines of the file or, for
+    a zip archive, of its first member. None when the format is not supported.
+    """
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            names = archive.namelist()
+            if not names:
+                return None
+            infile = archive.open(names[0])
+            try:
+                return _match_file_type(infile)
+            finally:
+                infile.close()
+    with open(path, 'rb') as infile:
+        return _match_file_type(infile)
+
+
+def classify_files(fd):
+    """
+    List the files in fd with their format, in the order of their names.
+    Files of an unsupported format, and files that are zipped when their
+    parser reads them unzipped or the other way round, are skipped.
+    """
+    files = []
+    for d in sorted(os.listdir(fd)):
+        path = os.path.join(fd, d)
+        if not os.path.isfile(path):
+            continue
+        file_type = ascertain_file_type(path)
+        if file_type is None:
+            print d, "skipped, file type not recognized"
+        elif zipfile.is_zipfile(path) != ZIPPED[file_type]:
+            print d, "skipped, the", file_type, "parser reads", "zip archives" if ZIPPED[file_type] else "unzipped files"
+        else:
+            files.append((d, file_type))
+    return files
+
+
+def parse_file_shard(args):
+    """
+    Worker for parse_patents: parse one file into a shard directory with the
+    parser of its format
+    """
+    file_type, job = args
+    return PARSERS[file_type].parse_file_shard(job)
+
+
+def close_outputs(outputs, deduplicated):
+    """
+    Close the output of every format, and raise the first error afterwards.
+    """
+    error = None
+    for file_type in sorted(outputs):
+        try:
+            rawlocation, mainclassdata, subclassdata = deduplicated[file_type]
+            PARSERS[file_type].close_output(outputs[file_type], rawlocation, mainclassdata, subclassdata)
+        except Exception as e:
+            if error is None:
+                error = e
+    if error is not None:
+        raise error
+
+
+def parse_patents(fd, fd2, processes=1, flush_rows=FLUSH_ROWS, compress=False, connect=None, parquet=False):
+    """
+    Parse every file of a supported format in fd into fd2/<format>, with
+    processes worker processes shared by all formats. Every file is parsed
+    into a shard directory and the shards are merged in the order of the file
+    names, so the output does not depend on which worker finishes first.
+    The output options only apply to the 2005+ tables and work as in
+    generic_parser_2005.parse_patents.
+    """
+    fd += '/'
+    fd2 += '/'
+    files = classify_files(fd)
+    file_types = sorted(set(file_type for d, file_type in files))
+
+    # Remove all files from output dir before writing
+    for oo in os.listdir(fd2):
+        if os.path.isdir(os.path.join(fd2, oo)):
+            shutil.rmtree(os.path.join(fd2, oo))
+        else:
+            os.remove(os.path.join(fd2, oo))
+
+    outputs = {}
+    # Rawlocation, mainclass and subclass of every format are written after all else is done to prevent duplicate values
+    deduplicated = dict((file_type, ({}, {}, {})) for file_type in file_types)
+    numi = dict((file_type, 0) for file_type in file_types)
+    shard_root = tempfile.mkdtemp(prefix='shards_', dir=fd2)
+    pool = None
+    try:
+        for file_type in file_types:
+            output_dir = os.path.join(fd2, file_type)
+            os.mkdir(output_dir)
+            if file_type in SINK_FORMATS:
+                outputs[file_type] = PARSERS[file_type].open_output(output_dir, flush_rows, compress, connect, parquet)
+            else:
+                outputs[file_type] = PARSERS[file_type].open_output(output_dir)
+
+        jobs = [(file_type, PARSERS[file_type].shard_job(outputs[file_type], fd, d, os.path.join(shard_root, str(n))))
+                for n, (d, file_type) in enumerate(files)]
+        if processes > 1:
+            pool = multiprocessing.Pool(processes)
+            results = pool.imap(parse_file_shard, jobs)
+        else:
+            results = itertools.imap(parse_file_shard, jobs)
+        for (file_type, job), result in itertools.izip(jobs, results):
+            d, file_numi, file_rawlocation, file_mainclassdata, file_subclassdata = result
+            shard_dir = job[2]
+            PARSERS[file_type].merge_shard(outputs[file_type], shard_dir)
+            shutil.rmtree(shard_dir)
+            rawlocation, mainclassdata, subclassdata = deduplicated[file_type]
+            rawlocation.update(file_rawlocation)
+            mainclassdata.update(file_mainclassdata)
+            subclassdata.update(file_subclassdata)
+            numi[file_type] += file_numi
+            print d, file_type, "merged"
+        if pool is not None:
+            pool.close()
+    except:
+        if pool is not None:
+            pool.terminate()
+        raise
+    finally:
+        if pool is not None:
+            pool.join()
+        shutil.rmtree(shard_root, ignore_errors=True)
+        close_outputs(outputs, deduplicated)
+
+    for file_type in file_types:
+        print file_type, numi[file_type]
@@ -0,0 +1,51 @@
+"""
+Deterministic row ids for the parser output tables.
+
+An id is the hash of (patent_id, table, sequence), where sequence numbers the
+rows a patent has in that table. Parsing the same patent again gives every
+row the same id, so re-parses can be diffed against, or upserted into, an
+existing database. The ids keep the shape of the old random ones: 25
+characters from [a-z0-9].
+"""
+import hashlib
+
+ID_LENGTH = 25
+
+
+def row_id(patent_id, table, sequence):
+    """
+    The id of row number sequence (counting from 0) of table for patent_id.
+    """
+    key = u'{0}\t{1}\t{2}'.format(patent_id, table, sequence)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:ID_LENGTH]
+
+
+def row_id_batch(patent_id, table, count, start=0):
+    """
+    The ids of count consecutive rows of table for patent_id, starting at
+    row number start.
+    """
+    prefix = u'{0}\t{1}\t'.format(patent_id, table)
+    return [hashlib.sha1((prefix + str(sequence)).encode('utf-8')).hexdigest()[:ID_LENGTH]
+            for sequence in range(start, start + count)]
+
+
+class RowIds(object):
+    """
+    Hands out the ids for the rows of one patent. Every table keeps its own
+    running sequence, so the n-th claim of a patent always gets the same id.
+    """
+
+    def __init__(self, patent_id):
+        self.patent_id = patent_id
+        self.sequences = {}
+
+    def __call__(self, table):
+        sequence = self.sequences.get(table, 0)
+        self.sequences[table] = sequence + 1
+        return row_id(self.patent_id, table, sequence)
+
+    def batch(self, table, count):
+        start = self.sequences.get(table, 0)
+        self.sequences[table] = start + count
+        return row_id_batch(self.patent_id, table, count, start)
@@ -0,0 +1,90 @@
+"""
+Compiled regular expressions shared by the text-split patent parsers
+(generic_parser_2005, generic_parser_2002_2004 and the XMLParsers
+application parser).
+
+The parsers run these inside per-line loops. Python's re module only caches
+a small number of compiled patterns (100 in Python 2, and the whole cache is
+dropped once it fills up), and these parsers use more than that, so inline
+re.search calls keep recompiling. Everything here is compiled once per
+process instead.
+"""
+import re
+
+
+class PatternRegistry(dict):
+    """
+    Compiled patterns built from a template and keyed by the value filled into
+    it, e.g. TAG_TEXT['doc-number'] is '<doc-number>(.*?)</doc-number>'.
+    Keys that were not listed up front are compiled on first use and kept.
+    """
+
+    def __init__(self, template, keys=(), flags=0):
+        dict.__init__(self)
+        self.template = template
+        self.flags = flags
+        for key in keys:
+            self[key] = self.__missing__(key)
+
+    def __missing__(self, key):
+        pattern = re.compile(self.template.format(key), self.flags)
+        self[key] = pattern
+        return pattern
+
+
+# <tag>value</tag>
+TAG_TEXT = PatternRegistry('<{0}>(.*?)</{0}>', keys=[
+    'category', 'city', 'class', 'classification-data-source', 'classification-level',
+    'classification-status', 'classification-value', 'country', 'date', 'department', 'doc-number',
+    'first-name', 'firstname', 'kind', 'lapse-of-patent', 'last-name', 'lastname', 'latin-name',
+    'length-of-grant', 'main-group', 'name', 'number-of-drawing-sheets', 'number-of-figures', 'orgname',
+    'othercit', 'role', 'section', 'state', 'street', 'subclass', 'subgroup', 'symbol-position', 'text',
+    'us-term-extension', 'variety', 'zip', 'B620', 'B631', 'B632', 'B633', 'B640', 'B650', 'B660', 'DOC',
+    'PDAT', 'PDOC', 'PPUB', 'PSTA'])
+
+# <tag>value</tag spanning several lines
+TAG_BLOCK = PatternRegistry('<{0}>(.*?)</{0}>', keys=['BTEXT', 'PDAT'], flags=re.DOTALL)
+
+# <tag>value</tag without the closing bracket
+OPEN_TAG_TEXT = PatternRegistry('<{0}>(.*?)</{0}', keys=[
+    'main-classification', 'further-classification', 'parent-status', 'priority-doc-requested'])
+
+# <TAG><PDAT>value</PDAT> in the 2002-2004 SGML
+PDAT_TEXT = PatternRegistry('<{0}><PDAT>(.*?)</PDAT>', keys=[
+    'B511', 'B516', 'CITY', 'CTRY', 'DATE', 'DNUM', 'FNM', 'KIND', 'PCODE', 'STATE'])
+
+# <TAG><STEXT><PDAT>value</PDAT> in the 2002-2004 SGML
+STEXT_PDAT_TEXT = PatternRegistry('<{0}><STEXT><PDAT>(.*?)</PDAT>', keys=['ONM', 'SNM'])
+
+# <TAG>...<PDAT>value</PDAT>...</TAG> in the 2002-2004 SGML
+NESTED_PDAT_TEXT = PatternRegistry('<{0}>.*?<PDAT>(.*?)</PDAT>.*?</{0}>', keys=[
+    'B310', 'B320', 'B330', 'CDOC'])
+
+# name="value" attributes
+ATTRIBUTE = PatternRegistry('{0}="(.*?)"', keys=[
+    'app-type', 'applicant-authority-category', 'designation', 'kind', 'num', 'rep-type', 'sequence'])
+
+DIGITS = re.compile(r'\d+')
+LETTERS = re.compile('[a-zA-Z]+')
+# citation numbers made of an optional letter prefix and digits only
+CITATION_NUMBER = re.compile(r'^[A-Z]*\d+$')
+MARKUP = re.compile('<.*?>|</.*?>')
+ANY_TAG = re.compile('<.*?>')
+LINE_BREAKS = re.compile('[\n\t\r\f]+')
+WHITESPACE = re.compile(r'\s+')
+LEADING_WHITESPACE = re.compile(r'^\s+')
+LEADING_ZEROS = re.compile('^0+')
+LEADING_CAPITAL = re.compile('^[A-Z]')
+THREE_CAPITALS = re.compile('[A-Z]{3}')
+# "1. " in front of the claim text
+CLAIM_NUMBER = re.compile(r'^\d+\.\s+')
+CLAIM_REF = re.compile(r'<claim-ref idref="CLM-(\d+)">')
+CLAIMS_BLOCK = re.compile('<claims.*?>(.*?)</claims>', re.DOTALL)
+CLAIM_ID = re.compile('<claim id(.*?)>', re.DOTALL)
+CLAIM_TEXT = re.compile('<claim.*?>(.*?)</claim>', re.DOTALL)
+# text of a one-line element: <heading ...>text</heading>
+ELEMENT_TEXT = re.compile('>(.*?)<')
+ELEMENT_TEXT_TO_CLOSE = re.compile('>(.*?)</')
+PARAGRAPH_TEXT = re.compile('>(.*?)</p>')
+ABSTRACT_TEXT = re.compile('">(.*?)</p')
+QUOTED = re.compile('"(.*?)"')
@@ -0,0 +1,61 @@
+import re
+import sys
+import timeit
+
+from document_stream import iter_documents
+import text_patterns
+
+
+def registered_patterns():
+    """
+    Every compiled pattern in text_patterns, the way the parsers use them.
+    """
+    patterns = []
+    for name in sorted(dir(text_patterns)):
+        value = getattr(text_patterns, name)
+        if isinstance(value, text_patterns.PatternRegistry):
+            patterns.extend(value[key] for key in sorted(value))
+        elif name.isupper() and hasattr(value, 'search'):
+            patterns.append(value)
+    return patterns
+
+
+def extract_inline(documents, patterns):
+    found = 0
+    for doc in documents:
+        for line in doc.split("\n"):
+            for pattern in patterns:
+                if re.search(pattern.pattern, line, pattern.flags):
+                    found += 1
+    return found
+
+
+def extract_compiled(documents, patterns):
+    found = 0
+    for doc in documents:
+        for line in doc.split("\n"):
+            for pattern in patterns:
+                if pattern.search(line):
+                    found += 1
+    return found
+
+
+if __name__ == '__main__':
+
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python {} {} {}".format(sys.argv[0], "<XML FILE>", "[MAX DOCUMENTS]"))
+        sys.exit(1)
+
+    max_documents = int(sys.argv[2]) if len(sys.argv) == 3 else 50
+    documents = []
+    for doc in iter_documents(sys.argv[1]):
+        documents.append(doc.decode('utf-8', 'ignore'))
+        if len(documents) == max_documents:
+            break
+    patterns = registered_patterns()
+
+    assert extract_inline(documents, patterns) == extract_compiled(documents, patterns)
+    print("{} documents, {} patterns".format(len(documents), len(patterns)))
+    for label, extract in (("inline re.search", extract_inline), ("text_patterns", extract_compiled)):
+        seconds = min(timeit.repeat(lambda: extract(documents, patterns), number=1, repeat=3))
+        print("{:<18} {:8.3f} ms per document".format(label, 1000.0 * seconds / len(documents)))
@@ -1,6 +1,7 @@
 import re
 import os
 from zipfile import ZipFile
+from external_sort import external_sort
 from parser_utils import write_csv
 
 
@@ -18,7 +19,8 @@ def parse_and_write_uspc(inputdir, outputdir):
 
 def parse_uspc_applications(inputdir, zip_filename):
     """
-    Parse USPC Application information from the USPTO MCF Application zip file
+    Parse USPC Application information from the USPTO MCF Application zip
+    file, yielding the rows one at a time
 
     Original Data:
         US20180027683A1361724000S
@@ -48,14 +50,29 @@ def parse_uspc_applications(inputdir, zip_filename):
     assert(number_of_files_in_zip == 1 and
            re.search('mcfappl[\d]+\.txt$', name_of_first_file_in_zip))
 
-    rows = []
     with zip.open(name_of_first_file_in_zip) as f:
-        for classification in f:
+        for classification in by_patent(f, lambda line: line[2:13]):
             # TODO: Check with the team that this is correct
-            row = parse_uspc_application(classification)
-            rows.append(row)
+            yield parse_uspc_application(classification)
 
-    return rows
+
+def by_patent(lines, patent_number):
+    """
+    Pass on the lines of an MCF file in patent number order, sorted with
+    external_sort so the file need not be, and forget the orders counted in
+    found_patents each time the patent changes, so only the current
+    patent's are held. The lines of a patent keep their order in the file.
+    The lines are bytes, so the order is that of the bytes.
+
+    patent_number: function that returns the patent number of a line
+    """
+    previous = None
+    for line in external_sort(lines, patent_number):
+        number = patent_number(line)
+        if number != previous:
+            found_patents.clear()
+            previous = number
+        yield line
 
 
 def parse_uspc_application(row):
@@ -111,7 +128,8 @@ def parse_subclass(subclass):
 
 def parse_uspc_patents(inputdir, zip_filename):
     """
-    Parse USPC Patent information from the USPTO MCF Patent zip file
+    Parse USPC Patent information from the USPTO MCF Patent zip file,
+    yielding the rows one at a time
 
     Original Data:
         0000001295004000O
@@ -133,7 +151,6 @@ def parse_uspc_patents(inputdir, zip_filename):
     """
     global found_patents
     found_patents = {}
-    rows = []
 
     zip = ZipFile(os.path.join(inputdir, zip_filename), 'r')
 
@@ -144,11 +161,8 @@ def parse_uspc_patents(inputdir, zip_filename):
            re.search('mcfpat[\d]+\.txt$', name_of_first_file_in_zip))
 
     with zip.open(name_of_first_file_in_zip) as f:
-        for classification in f:
-            row = parse_uspc_patent(classification)
-            rows.append(row)
-
-    return rows
+        for classification in by_patent(f, lambda line: line[:7]):
+            yield parse_uspc_patent(classification)
 
 
 def parse_uspc_patent(row):
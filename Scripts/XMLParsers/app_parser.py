@@ -1,14 +1,11 @@
 import argparse
 import concurrent.futures as cf
-from itertools import repeat
 import logging
 import logging.config
 import os
 from pprint import pprint
-import random
 import re
 import requests
-import string
 import sys
 import time
 import uuid
@@ -17,11 +14,25 @@ from lxml import etree, html
 
 from db_pgsql import Db_applications as Db
 import settings
+from metrics import FileMetrics, timed
+from parser_helpers import get_text_or_none
+from xml_stream import iter_documents, open_xml, xml_basename
+
+# row ids are shared with the text-split parsers in Raw_Data_Parsers
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'Raw_Data_Parsers', 'uspto_parsers'))
+from row_ids import row_id
 
 
 WORK_DIR = settings.APP_XMLDIR
 LOG_DIR = 'logs/'
+# one JSON line of metrics per parsed file
+METRICS_FILE = LOG_DIR + 'app_metrics.jsonl'
 MAIN_URL = 'https://bulkdata.uspto.gov/data/patent/application/redbook/fulltext/2018/'
+# tables a re-parsed application is deleted from, children before the application itself
+APP_TABLES = [
+    'claim', 'uspc', 'rawassignee_transformed', 'rawinventor', 'description',
+    'application'
+]
 
 
 def create_logger():
@@ -56,18 +67,6 @@ def download_html(url):
             return html_content
 
 
-def id_generator(size=25, chars=string.ascii_lowercase + string.digits):
-        return ''.join(random.choice(chars) for _ in range(size))
-
-
-def get_text_or_none(element, item_name):
-    item = element.xpath(item_name)
-    if len(item) > 0:
-        return str(item[0])
-    else:
-        return None
-
-
 def print_children(element, level=0):
     if element is None:
         return
@@ -91,67 +90,36 @@ def print_children(element, level=0):
             pass
 
 
-def clean_file(raw_file):
+def download_file(url):
     '''
-    Alters the raw patentsview data files to produce valid XML.
-    Original is invalid because it lacks a root tag and has multiple xml version tags
-    :param raw_file: raw patentsview file
-    :return  null, creates list of files
+    Downloads the zip at url into WORK_DIR, unless it or the xml file it holds is there already.
+    The zip is not extracted, parse_file reads the xml file straight from it.
+    :return the path of the xml file when it is there, of the zip otherwise
     '''
-    logger.info('Cleaning XML file')
-    if WORK_DIR not in raw_file:
-            raw_file = os.path.join(WORK_DIR, raw_file)
-    new_file = raw_file[:-4] + '_clean.xml'
-    file_already_cleaned = False
-    try:
-        with open(raw_file, 'r+') as f:
-            with open(new_file, 'w') as new_f:
-                new_f.write('<?xml version="1.0" encoding="UTF-8"?>' + "\n")
-                new_f.write('<root>' + '\n')
-                for line in f.readlines():
-                    if not line.lstrip().startswith('<?xml') and not line.lstrip().startswith('<!DOCTYPE'):
-                        if line.lstrip().startswith('<root'):
-                            file_already_cleaned = True
-                            break
-                        new_f.write(line)
-                new_f.write('</root>')
-        if file_already_cleaned:
-            os.remove(new_file)
-        else:
-            os.replace(new_file, raw_file)
-        # move(new_file, raw_file)
-    except Exception:
-        logger.exception('message')
-
-
-def download_file(url):
     zip_filename = os.path.join(WORK_DIR, url.split('/')[-1])
-    xml_filename = zip_filename.replace('zip', 'xml')
-    if os.path.isfile(zip_filename) or os.path.isfile(xml_filename):
+    xml_filename = os.path.join(WORK_DIR, xml_basename(zip_filename))
+    if os.path.isfile(xml_filename):
         logger.debug('File already exists.')
-    else:
-        logger.info('Downloading %s', url)
-        # NOTE the stream=True parameter
-        # logger.debug('Getting zip from %s' % url)
-        start_time = time.time()
-        r = requests.get(url, stream=True)
-        with open(zip_filename, 'wb') as f:
-            for chunk in r.iter_content(chunk_size=1024):
-                if chunk:  # filter out keep-alive new chunks
-                    f.write(chunk)
-        r.close()
-        logger.info('File %s downloaded in [%s sec].', zip_filename, time.time() - start_time)
-    if not os.path.isfile(xml_filename) and os.path.isfile(zip_filename):
-        try:
-            zip_ref = zipfile.ZipFile(zip_filename, 'r')
-            zip_ref.extractall(WORK_DIR)
-            zip_ref.close()
-            clean_file(xml_filename)
-            os.remove(zip_filename)
-        except Exception:
-            logger.error('UNZIP ERROR. Deleting file %s' % zip_filename)
-            os.remove(zip_filename)
-    return os.path.basename(xml_filename)
+        return xml_filename
+    if os.path.isfile(zip_filename):
+        logger.debug('File already exists.')
+        return zip_filename
+    logger.info('Downloading %s', url)
+    # NOTE the stream=True parameter
+    # logger.debug('Getting zip from %s' % url)
+    start_time = time.time()
+    r = requests.get(url, stream=True)
+    with open(zip_filename, 'wb') as f:
+        for chunk in r.iter_content(chunk_size=1024):
+            if chunk:  # filter out keep-alive new chunks
+                f.write(chunk)
+    r.close()
+    logger.info('File %s downloaded in [%s sec].', zip_filename, time.time() - start_time)
+    if not zipfile.is_zipfile(zip_filename):
+        logger.error('UNZIP ERROR. Deleting file %s' % zip_filename)
+        os.remove(zip_filename)
+        return None
+    return zip_filename
 
 
 def get_urls(main_url, err_count=0):
@@ -182,49 +150,67 @@ def get_urls(main_url, err_count=0):
     return None
 
 
+def get_app_id(case):
+    app_ref = case.find('us-bibliographic-data-application/application-reference')
+    return int(get_text_or_none(app_ref, 'document-id/doc-number/text()'))
+
+
+def replace_existing_applications(filename, dbc):
+    """
+    Pre-pass over a weekly file: look up all of its applications in the
+    database with one query, and delete those the file replaces with one
+    set-based delete per table. Returns the app_ids to keep as they are.
+    """
+    app_ids = []
+    with open_xml(filename) as inputfile:
+        for case in iter_documents(inputfile, 'us-patent-application'):
+            app_ids.append(get_app_id(case))
+    new_file_date = int(re.sub(r"\D", "", xml_basename(filename)))
+    replaced = []
+    kept = set()
+    for app_id, app_id_db in dbc.app_ids_get(app_ids).items():
+        logger.info('APP_id %s exists in database', app_id)
+        db_file_date = int(re.sub(r"\D", "", app_id_db['filename']))
+        if new_file_date > db_file_date \
+                or (app_id_db['status'] == 'new' and args.force) \
+                or (new_file_date >= db_file_date and args.parseall and args.force):
+            replaced.append(app_id)
+        else:
+            kept.add(app_id)
+    if replaced:
+        logger.warning('Deleting %s existing applications', len(replaced))
+        if dbc.delete_applications(replaced, APP_TABLES) is None:
+            raise RuntimeError('Failed to delete the applications replaced by {}'.format(filename))
+    return kept
+
+
 def parse_file(filename, file_id):
     dbc = Db()
     if WORK_DIR not in filename:
         filename = os.path.join(WORK_DIR, filename)
-    with open(filename, 'rb') as inputfile:
+    kept = replace_existing_applications(filename, dbc)
+    metrics = FileMetrics(xml_basename(filename))
+    with open_xml(filename) as inputfile:
         file_start_time = time.time()
         logger.info('Parsing file %s' % filename)
-        context = etree.iterparse(inputfile, events=('end',), tag='us-patent-application')
         app_counter = 1
-        for event, case in context:
-            data_application = case.find('us-bibliographic-data-application')
-            app_ref = data_application.find('application-reference')
-            app_id = int(get_text_or_none(app_ref, 'document-id/doc-number/text()'))
-            app_id_db = dbc.app_id_get(app_id, file_id)
-            if app_id_db is not None:
-                logger.info('APP_id %s exists in database', app_id)
-                new_file_date = int(re.sub(r"\D", "", filename))
-                db_file_date = int(re.sub(r"\D", "", app_id_db['filename']))
-                if new_file_date > db_file_date \
-                        or (app_id_db['status'] == 'new' and args.force) \
-                        or (new_file_date >= db_file_date and args.parseall and args.force):
-                    table_names = [
-                        'claim', 'uspc', 'rawassignee_transformed', 'rawinventor', 'description',
-                        'application'
-                    ]
-                    logger.warning('Deleting existing application with id %s', app_id)
-                    with cf.ThreadPoolExecutor(max_workers=len(table_names)) as executor:
-                        executor.map(dbc.delete_application, repeat(app_id), table_names)
-                    dbc.cnx.commit()
-                    parse_app(case, filename, dbc)
-            else:
-                logger.info('Processing new app_id %s', app_id)
-                parse_app(case, filename, dbc)
+        for case in iter_documents(inputfile, 'us-patent-application'):
+            app_id = get_app_id(case)
+            if app_id not in kept:
+                logger.info('Processing app_id %s', app_id)
+                timings = {}
+                parse_app(case, xml_basename(filename), dbc, timings)
+                metrics.add(timings)
             app_counter += 1
-            case.clear()
             # if app_counter == 5:
             #     sys.exit()
+    metrics.write(METRICS_FILE)
     dbc.file_update_status(file_id, 'finished')
     os.remove(filename)
     logger.info('Finished parsing file %s in [%s sec]', filename, time.time() - file_start_time)
 
 
-def parse_app(case, filename, dbc):
+def parse_app(case, filename, dbc, timings=None):
     global rawlocation_list
     global mainclassdata
     global subclassdata
@@ -348,9 +334,9 @@ def parse_app(case, filename, dbc):
     def parse_assignees():
         assignees_element_list = data_application.findall('assignees/assignee')
         rawassignee_list = []
-        for assignee_element in assignees_element_list:
+        for n, assignee_element in enumerate(assignees_element_list):
 
-            loc_idd = id_generator()
+            loc_idd = row_id(application['id'], 'assignee_rawlocation', n)
             rawassignee = {
                 'uuid': str(uuid.uuid1()),
                 'application_id': application['id'],
@@ -383,8 +369,8 @@ def parse_app(case, filename, dbc):
         inventors_element_list = data_application.findall('us-parties/inventors/inventor')
         rawinventor_list = []
 
-        for inventor_element in inventors_element_list:
-            loc_idd = id_generator()
+        for n, inventor_element in enumerate(inventors_element_list):
+            loc_idd = row_id(application['id'], 'inventor_rawlocation', n)
             rawinventor = {
                 'uuid': str(uuid.uuid1()),
                 'application_id': application['id'],
@@ -415,8 +401,8 @@ def parse_app(case, filename, dbc):
         # print_children(data_application.find('us-parties/us-applicants'), 3)
         applicants_element_list = data_application.findall('us-parties/us-applicants/us-applicant')
         applicants_list = []
-        for applicant_element in applicants_element_list:
-            loc_idd = id_generator()
+        for n, applicant_element in enumerate(applicants_element_list):
+            loc_idd = row_id(application['id'], 'applicant_rawlocation', n)
             applicant = {
                 'uuid': str(uuid.uuid1()),
                 'application_id': application['id'],
@@ -442,9 +428,11 @@ def parse_app(case, filename, dbc):
             }
             rawlocation_list.append(rawlocation)
 
+    if timings is None:
+        timings = {}
     start_time = time.time()
 
-    application = parse_application()
+    application = timed(parse_application, timings)()
     # print(application)
     # parse_claims()
     # parse_description()
@@ -454,11 +442,11 @@ def parse_app(case, filename, dbc):
     # parse_uspc()
 
     with cf.ThreadPoolExecutor(max_workers=5) as executor:
-        executor.submit(parse_claims)
-        executor.submit(parse_description)
-        executor.submit(parse_assignees)
-        executor.submit(parse_inventors)
-        executor.submit(parse_uspc)
+        executor.submit(timed(parse_claims, timings))
+        executor.submit(timed(parse_description, timings))
+        executor.submit(timed(parse_assignees, timings))
+        executor.submit(timed(parse_inventors, timings))
+        executor.submit(timed(parse_uspc, timings))
 
     # dbc.case_file_update_status(doc_id, 'true')
     logger.info('Inserted application %s in [%s sec]', app_id, time.time() - start_time)
@@ -468,19 +456,15 @@ def main_worker(file):
     dbc = Db()
     file_check = dbc.file_check(file)
     if file_check is None:
-        xml_filename = download_file(file['url'])
-        if xml_filename is not None:
-            inserted_id = dbc.file_insert(file, os.path.basename(xml_filename))
-            parse_file(xml_filename, inserted_id)
+        filename = download_file(file['url'])
+        if filename is not None:
+            inserted_id = dbc.file_insert(file, xml_basename(filename))
+            parse_file(filename, inserted_id)
     elif file_check['status'] in ['new', ''] or file_check['status'] is None:
         logger.warning('File %s exists into database. Going to process again', file_check['filename'])
-        if not os.path.isfile(os.path.join(WORK_DIR, file_check['filename'])):
-            xml_filename = download_file(file['url'])
-        else:
-            xml_filename = file_check['filename']
-        if WORK_DIR not in xml_filename:
-            xml_filename = os.path.join(WORK_DIR, xml_filename)
-        parse_file(xml_filename, file_check['id'])
+        filename = download_file(file['url'])
+        if filename is not None:
+            parse_file(filename, file_check['id'])
     else:
         logger.info('File %s is already inserted into database.', file_check['filename'])
         if args.parse:
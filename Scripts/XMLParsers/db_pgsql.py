@@ -1,19 +1,249 @@
+import io
 import logging
+import queue
 import sys
+import threading
 import time
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 from psycopg2.extensions import AsIs
 from psycopg2.extras import execute_values
 
 import settings
 
+# backslashes, tabs and line breaks are escaped in the text format of COPY
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+# the last document of a file whose rows are committed, see db_connection.file_add_checkpoint_columns
+CHECKPOINT_UPDATE = "UPDATE file_info SET last_doc_offset = %s, last_doc_number = %s, modified = now() WHERE id = %s"
+
+
+def copy_value(value):
+    """
+    A value in the text format of COPY, where NULL is \\N
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return str(value).translate(COPY_ESCAPES)
+
+
+class CopyWriter(object):
+    """
+    Gathers the rows of every table across many patents and writes them with
+    COPY FROM STDIN, one COPY per table and one transaction per flush.
+    The grant parser adds rows from the single RowWriter thread only; adding
+    rows is locked for a db_connection whose insert methods are called from
+    several threads, as app_parser parses the sections of an application.
+    """
+
+    def __init__(self, cnx, logger, flush_rows=settings.COPY_FLUSH_ROWS):
+        self.cnx = cnx
+        self.logger = logger
+        self.flush_rows = flush_rows
+        self.lock = threading.Lock()
+        self.tables = {}
+        self.row_count = 0
+        self.checkpoint = None
+
+    def add(self, lst, table_name):
+        """
+        Buffer a list of row dicts for table_name. Rows are grouped by their
+        columns, and the tables keep the order they were first added in, so
+        a patent is written before the rows that refer to it.
+        """
+        with self.lock:
+            for d in lst:
+                self.tables.setdefault((table_name, tuple(d.keys())), []).append(tuple(d.values()))
+            self.row_count += len(lst)
+        return len(lst)
+
+    def set_checkpoint(self, file_id, doc_offset, doc_number):
+        """
+        Record in file_info, with the next flush, that the documents up to
+        doc_offset of file file_id are written, the last being doc_number.
+        The checkpoint is committed in the same transaction as the rows.
+        """
+        with self.lock:
+            self.checkpoint = (doc_offset, doc_number, file_id)
+
+    def full(self):
+        return self.row_count >= self.flush_rows
+
+    def flush(self):
+        """
+        Write the buffered rows and commit. When a COPY fails the transaction
+        is rolled back and the rows are inserted one at a time instead, so only
+        the rows the database rejects are lost, and logged, as with insert_dict.
+        """
+        with self.lock:
+            tables, row_count, checkpoint = self.tables, self.row_count, self.checkpoint
+            self.tables, self.row_count, self.checkpoint = {}, 0, None
+        if row_count == 0 and checkpoint is None:
+            return 0
+        start_time = time.time()
+        cur = self.cnx.cursor()
+        try:
+            for (table_name, columns), rows in tables.items():
+                data = io.StringIO()
+                for row in rows:
+                    data.write('\t'.join(map(copy_value, row)))
+                    data.write('\n')
+                data.seek(0)
+                cur.copy_expert('COPY {0} ({1}) FROM STDIN'.format(table_name, ', '.join(columns)), data)
+            self.write_checkpoint(cur, checkpoint)
+            self.cnx.commit()
+            self.logger.debug('Copied %s rows into %s tables [%s sec]', row_count, len(tables), time.time() - start_time)
+        except psycopg2.Error as err:
+            self.logger.error('COPY failed, inserting %s rows one at a time', row_count)
+            self.logger.error(err)
+            self.cnx.rollback()
+            self.insert_rows(cur, tables, checkpoint)
+        finally:
+            cur.close()
+        return row_count
+
+    def write_checkpoint(self, cur, checkpoint):
+        if checkpoint is not None:
+            cur.execute(CHECKPOINT_UPDATE, checkpoint)
+
+    def insert_rows(self, cur, tables, checkpoint=None):
+        for (table_name, columns), rows in tables.items():
+            q = 'INSERT INTO {0} ({1}) values ({2})'.format(table_name, ', '.join(columns), ', '.join(['%s'] * len(columns)))
+            for row in rows:
+                cur.execute('SAVEPOINT copy_row')
+                try:
+                    cur.execute(q, row)
+                    cur.execute('RELEASE SAVEPOINT copy_row')
+                except psycopg2.Error as err:
+                    self.logger.error('Insert failed for table_name %s', table_name)
+                    self.logger.error(err)
+                    cur.execute('ROLLBACK TO SAVEPOINT copy_row')
+        self.write_checkpoint(cur, checkpoint)
+        self.cnx.commit()
+
+
+class RowCollector(object):
+    """
+    Stands in for a db_connection in the parse worker processes: insert_dict
+    and insert_listdict only collect the rows, as (table_name, rows) pairs in
+    the order they are inserted, for a RowWriter to write.
+    """
+
+    def __init__(self):
+        self.tables = []
+
+    def insert_listdict(self, lst, table_name):
+        if len(lst) == 0:
+            return None
+        self.tables.append((table_name, lst))
+        return len(lst)
+
+    def insert_dict(self, d, table_name):
+        if d is None or table_name is None:
+            logging.error('INSERT ERROR: Missing dict or table_name')
+            return None
+        self.tables.append((table_name, [d]))
+        return None
+
+
+class RowWriter(threading.Thread):
+    """
+    Writer thread for the rows the parse workers collect. It owns one
+    connection of pool and writes all rows through a CopyWriter, so no other
+    thread touches that connection. write() queues the (table_name, rows)
+    pairs of a patent, with the (file_id, doc_offset, doc_number) checkpoint
+    the patent completes; close() writes what is left and waits for the thread.
+    After an error the rest of the queue is dropped and close() raises it.
+    """
+
+    def __init__(self, pool, logger, flush_rows=settings.COPY_FLUSH_ROWS, queue_size=1000):
+        super().__init__(daemon=True)
+        self.pool = pool
+        self.logger = logger
+        self.flush_rows = flush_rows
+        self.queue = queue.Queue(queue_size)
+        self.error = None
+
+    def run(self):
+        cnx = None
+        copy_writer = None
+        while True:
+            item = self.queue.get()
+            if self.error is None:
+                try:
+                    if copy_writer is None:
+                        cnx = self.pool.getconn()
+                        copy_writer = CopyWriter(cnx, self.logger, self.flush_rows)
+                    if item is None:
+                        copy_writer.flush()
+                    else:
+                        tables, checkpoint = item
+                        for table_name, lst in tables:
+                            copy_writer.add(lst, table_name)
+                        if checkpoint is not None:
+                            copy_writer.set_checkpoint(*checkpoint)
+                        if copy_writer.full():
+                            copy_writer.flush()
+                except Exception as err:
+                    self.error = err
+                    self.logger.exception('Writing rows failed, dropping the rest of the file')
+            if item is None:
+                break
+        if cnx is not None:
+            self.pool.putconn(cnx)
+
+    def write(self, tables, checkpoint=None):
+        self.queue.put((tables, checkpoint))
+
+    def close(self):
+        self.queue.put(None)
+        self.join()
+        if self.error is not None:
+            raise self.error
+
+
+def connection_pool(schema, maxconn=4):
+    """
+    Thread-safe pool of connections to the database in settings, with the
+    search path set to schema.
+    """
+    return psycopg2.pool.ThreadedConnectionPool(1, maxconn, options='-c search_path={}'.format(schema), **settings.config)
+
 
 class db_connection(object):
     """
     Main class for db connection
     """
 
+    copy_writer = None
+
+    def start_copy(self, flush_rows=settings.COPY_FLUSH_ROWS):
+        """
+        Buffer the rows of insert_dict and insert_listdict in a CopyWriter
+        instead of inserting them, until finish_copy.
+        """
+        self.copy_writer = CopyWriter(self.cnx, self.logger, flush_rows)
+
+    def commit(self):
+        """
+        Commit the rows inserted since the last commit. Rows buffered for COPY
+        are only written once flush_rows of them have been gathered.
+        """
+        if self.copy_writer is None:
+            self.cnx.commit()
+        elif self.copy_writer.full():
+            self.copy_writer.flush()
+
+    def finish_copy(self):
+        """
+        Write the rows still buffered for COPY and insert rows directly again.
+        """
+        copy_writer, self.copy_writer = self.copy_writer, None
+        if copy_writer is not None:
+            copy_writer.flush()
+
     def file_check(self, file):
         zip_filename = file['url'].split('/')[-1]
         xml_filename = zip_filename.replace('zip', 'xml')
@@ -63,9 +293,94 @@ class db_connection(object):
             cur.close()
         return None
 
+    def file_add_checkpoint_columns(self):
+        """
+        Add the checkpoint columns to file_info where they are missing:
+        last_doc_offset, the offset in the file of the last document whose
+        rows are committed, and last_doc_number, the number of that document.
+        """
+        q = "ALTER TABLE file_info ADD COLUMN IF NOT EXISTS last_doc_offset integer, \
+            ADD COLUMN IF NOT EXISTS last_doc_number text"
+        try:
+            cur = self.cnx.cursor()
+            cur.execute(q)
+            self.cnx.commit()
+            cur.close()
+        except psycopg2.Error as err:
+            self.logger.error(err)
+            self.cnx.rollback()
+
+    def file_get_checkpoint(self, id):
+        q = "SELECT id, status, last_doc_offset, last_doc_number FROM file_info WHERE id = %s"
+        try:
+            cur = self.cnx.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            cur.execute(q, (id,))
+            result = cur.fetchone()
+            self.cnx.commit()
+        except psycopg2.Error as err:
+            result = None
+            self.logger.error(err)
+            self.cnx.rollback()
+        finally:
+            cur.close()
+        return result
+
+    def file_update_checkpoint(self, id, doc_offset, doc_number):
+        try:
+            cur = self.cnx.cursor()
+            cur.execute(CHECKPOINT_UPDATE, (doc_offset, doc_number, id))
+            rowcount = cur.rowcount
+            self.cnx.commit()
+            cur.close()
+            return rowcount
+        except psycopg2.Error as err:
+            self.logger.error(err)
+            self.cnx.rollback()
+        return None
+
+    def create_id_table(self, cur, ids, id_type):
+        """
+        Fill the temporary table replace_ids with ids, for set-based lookups
+        and deletes in the current transaction. The table is dropped on commit.
+        """
+        cur.execute('CREATE TEMPORARY TABLE replace_ids (id {}) ON COMMIT DROP'.format(id_type))
+        cur.copy_expert('COPY replace_ids (id) FROM STDIN', io.StringIO(''.join(copy_value(i) + '\n' for i in ids)))
+        cur.execute('ANALYZE replace_ids')
+
+    def delete_ids(self, ids, id_type, tables):
+        """
+        Delete the rows of ids from every table in tables, given as (table,
+        id column) pairs, with one DELETE ... USING replace_ids per table, all
+        in one transaction. Returns the number of rows deleted, or None when
+        the transaction was rolled back.
+        """
+        if len(ids) == 0:
+            return 0
+        start_time = time.time()
+        rowcount = 0
+        cur = self.cnx.cursor()
+        try:
+            self.create_id_table(cur, ids, id_type)
+            for table, column in tables:
+                cur.execute('DELETE FROM {0} t USING replace_ids r WHERE t.{1} = r.id'.format(table, column))
+                rowcount += cur.rowcount
+            self.cnx.commit()
+            self.logger.debug(
+                'Deleted %s rows of %s ids from %s tables [%s sec]',
+                rowcount, len(ids), len(tables), time.time() - start_time)
+            return rowcount
+        except psycopg2.Error as err:
+            self.logger.error(err)
+            self.cnx.rollback()
+        finally:
+            cur.close()
+        return None
+
     def insert_listdict(self, lst, table_name):
         if len(lst) == 0:
             return None
+        if self.copy_writer is not None:
+            return self.copy_writer.add(lst, table_name)
         keys = lst[0].keys()
         columns = ', '.join(keys)
         values = []
@@ -93,6 +408,9 @@ class db_connection(object):
         if d is None or table_name is None:
             logging.error('INSERT ERROR: Missing dict or table_name')
             return None
+        if self.copy_writer is not None:
+            self.copy_writer.add([d], table_name)
+            return None
         keys = d.keys()
         columns = ', '.join(keys)
         values = ', '.join(['%({})s'.format(k) for k in keys])
@@ -145,6 +463,28 @@ class Db_applications(db_connection):
         cur.close()
         return result
 
+    def app_ids_get(self, app_ids):
+        """
+        Look up many applications with one query, through a temporary table of
+        app_ids. Returns the rows app_id_get returns by app_id, for the
+        applications that exist.
+        """
+        q = "SELECT app.app_id, app.id, app.date, app.filename, fi.status FROM replace_ids r \
+            JOIN application app ON app.app_id = r.id JOIN file_info fi ON fi.filename = app.filename"
+        cur = self.cnx.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        self.create_id_table(cur, app_ids, 'bigint')
+        cur.execute(q)
+        result = {row['app_id']: row for row in cur.fetchall()}
+        self.cnx.commit()
+        cur.close()
+        return result
+
+    def delete_applications(self, app_ids, tables):
+        """
+        Delete the applications app_ids from every table in tables at once.
+        """
+        return self.delete_ids(app_ids, 'bigint', [(table, 'app_id') for table in tables])
+
     def case_file_update_status(self, serial_number, status):
         if serial_number is None or status is None:
             logging.error('UPDATE ERROR: Missing serial_number or status')
@@ -215,6 +555,29 @@ class Db_grants(db_connection):
         cur.close()
         return result
 
+    def patent_ids_get(self, patent_ids):
+        """
+        Look up many patents with one query, through a temporary table of
+        patent_ids. Returns the rows patent_id_get returns by patent id, for
+        the patents that exist.
+        """
+        q = "SELECT pat.id, pat.date, pat.filename, fi.status FROM replace_ids r \
+            JOIN patent pat ON pat.id = r.id LEFT JOIN file_info fi ON fi.filename = pat.filename"
+        cur = self.cnx.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        self.create_id_table(cur, patent_ids, 'text')
+        cur.execute(q)
+        result = {row['id']: row for row in cur.fetchall()}
+        self.cnx.commit()
+        cur.close()
+        return result
+
+    def delete_patents(self, patent_ids, tables):
+        """
+        Delete the patents patent_ids from every table in tables at once.
+        """
+        return self.delete_ids(patent_ids, 'text', [(table, 'id' if table in ['patent'] else 'patent_id')
+                                                    for table in tables])
+
     def case_file_update_status(self, serial_number, status):
         if serial_number is None or status is None:
             logging.error('UPDATE ERROR: Missing serial_number or status')
@@ -1,12 +1,9 @@
 import copy
 import csv
-from html.parser import HTMLParser
 import inspect
 import logging
 import os
-import random
 import re
-import string
 import sys
 # import numpy as np
 from bs4 import BeautifulSoup as bs
@@ -14,6 +11,14 @@ from bs4 import BeautifulSoup as bs
 
 currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
 parentdir = os.path.dirname(currentdir)
+# the compiled patterns and the entity table are shared with the text-split parsers in Raw_Data_Parsers
+sys.path.append(os.path.join(os.path.dirname(parentdir), 'Raw_Data_Parsers', 'uspto_parsers'))
+from html_entities import unescape_entities
+from row_ids import RowIds
+from text_patterns import (ABSTRACT_TEXT, ATTRIBUTE, CITATION_NUMBER, CLAIMS_BLOCK, CLAIM_ID, CLAIM_NUMBER,
+                           CLAIM_REF, CLAIM_TEXT, DIGITS, ELEMENT_TEXT, ELEMENT_TEXT_TO_CLOSE, LEADING_CAPITAL,
+                           LEADING_ZEROS, LETTERS, LINE_BREAKS, MARKUP, OPEN_TAG_TEXT, PARAGRAPH_TEXT, QUOTED,
+                           TAG_TEXT, THREE_CAPITALS, WHITESPACE)
 logger = logging.getLogger(__name__)
 
 
@@ -179,38 +184,6 @@ def prepare_output_dir(csv_dir):
 
 
 def parse_patents(xml_dir, csv_dir):
-    _char = re.compile(r'&(\w+?);')
-
-    # Generate some extra HTML entities
-    # defs=htmlentitydefs.entitydefs
-    defs = {}
-    defs['apos'] = "'"
-    # find the entities file
-    try:
-        htmlentities_path = os.path.join(parentdir, 'htmlentities.txt')
-        entities = open(htmlentities_path, 'rb').read().decode().split('\n')
-    except Exception:  # slighly hacky for running separately to debug
-        logger.warning('Cannot open htmlentities')
-        raise
-    for e in entities:
-        try:
-            first = re.sub('\s+|\"|;|&', '', e[3:15])
-            second = re.sub('\s+|\"|;|&', '', e[15:24])
-            define = re.search("(?<=\s\s\').*?$", e).group()
-            defs[first] = define[:-1].encode('utf-8')
-            defs[second] = define[:-1].encode('utf-8')
-        except Exception:
-            pass
-
-    def _char_unescape(m, defs=defs):
-        try:
-            return defs[m.group(1)].encode('utf-8', 'ignore')
-        except Exception:
-            return m.group()
-
-    def id_generator(size=25, chars=string.ascii_lowercase + string.digits):
-        return ''.join(random.choice(chars) for _ in range(size))
-
     xml_dir += '/'
     csv_dir += '/'
     diri = os.listdir(xml_dir)
@@ -220,9 +193,6 @@ def parse_patents(xml_dir, csv_dir):
     # Emty content of CSV_DIR and create new empty csv files
     prepare_output_dir(csv_dir)
 
-    # Initiate HTML Parser for unescape characters
-    h = HTMLParser()
-
     loggroups = ["publication-reference", "application-reference", "us-application-series-code", "number-of-claims",
                  "claims", "?BRFSUM", "?DETDESC", "pct-or-regional-filing-data", "us-botanic", "citations", 
                  "assignees", "inventors", "agents", "us-related-documents", "applicants", "us-applicants",
@@ -244,7 +214,7 @@ def parse_patents(xml_dir, csv_dir):
         logger.info('Starting with file %s', d)
         infile = open(xml_dir+d, 'rb').read().decode('utf-8', 'ignore').replace('&angst', '&aring')
         # infile = infile.encode('utf-8', 'ignore')
-        infile = _char.sub(_char_unescape, infile)
+        infile = unescape_entities(infile)
         # infile = h.unescape(infile).encode('utf-8')
         infile = infile.split('<!DOCTYPE')
         del infile[0]
@@ -342,28 +312,33 @@ def parse_patents(xml_dir, csv_dir):
             new_title = {}
 
             # PARSERS FOR LOGICAL GROUPS
+            # reset for every document, so one whose number cannot be parsed never gets the previous one's ids
+            docno = None
+            patent_id = None
             try:
                 publication = avail_fields['publication-reference'].split("\n")
                 for line in publication:
                     if line.startswith("<doc-number"):
-                        docno = re.search('<doc-number>(.*?)</doc-number>', line).group(1)
+                        docno = TAG_TEXT['doc-number'].search(line).group(1)
                     if line.startswith("<kind"):
-                        patkind = re.search('<kind>(.*?)</kind>', line).group(1)
+                        patkind = TAG_TEXT['kind'].search(line).group(1)
                     if line.startswith("<country"):
-                        patcountry = re.search('<country>(.*?)</country>', line).group(1)
+                        patcountry = TAG_TEXT['country'].search(line).group(1)
                     if line.startswith("<date"):
-                        issdate = re.search('<date>(.*?)</date>', line).group(1)
+                        issdate = TAG_TEXT['date'].search(line).group(1)
                         if issdate[6:] != "00":
                             issdate = issdate[:4] + '-' + issdate[4:6] + '-' + issdate[6:]
                         else:
                             issdate = issdate[:4] + '-' + issdate[4:6] + '-' + '01'
                             year = issdate[:4]
 
-                num = re.findall('\d+', docno)
+                num = DIGITS.findall(docno)
                 num = num[0]  # turns it from list to string
                 if num[0].startswith("0"):
                     num = num[1:]
-                    let = re.findall('[a-zA-Z]+', docno)
+                    let = LETTERS.findall(docno)
+                else:
+                    let = None
                 if let:
                     let = let[0]  # list to string
                     docno = let + num
@@ -373,19 +348,24 @@ def parse_patents(xml_dir, csv_dir):
             except Exception:
                 print(docno)
                 pass
+            if patent_id is None:
+                logger.warning('Skipping a document of %s, no patent number', d)
+                continue
+            # ids are derived from the patent number, a re-parse gives every row the same id again
+            row_ids = RowIds(patent_id)
 
             try:
                 abst = None
                 for_abst = avail_fields['abstract']
                 split_lines = for_abst.split("\n")
-                abst = re.search('">(.*?)</p', split_lines[1]).group(1)
+                abst = ABSTRACT_TEXT.search(split_lines[1]).group(1)
             except Exception:
                 pass
 
             # try:
             title = None
             if 'invention-title' in avail_fields:
-                title = re.search('>(.*?)<', avail_fields["invention-title"]).group(1)
+                title = ELEMENT_TEXT.search(avail_fields["invention-title"]).group(1)
                 if title == '':
                     text = avail_fields['invention-title']
                     title = text[text.find('>')+1:text.rfind('<')]
@@ -394,7 +374,7 @@ def parse_patents(xml_dir, csv_dir):
             try:
                 series_code = "NULL"
                 app_series_code = avail_fields['us-application-series-code']
-                series_code = re.search(">(.*?)</", app_series_code).group(1)
+                series_code = ELEMENT_TEXT_TO_CLOSE.search(app_series_code).group(1)
             except Exception:
                 pass
 
@@ -403,19 +383,19 @@ def parse_patents(xml_dir, csv_dir):
                 apptype = None
                 for line in application_list:
                     if line.startswith("<doc-number"):
-                        appnum = re.search('<doc-number>(.*?)</doc-number>', line).group(1)
+                        appnum = TAG_TEXT['doc-number'].search(line).group(1)
                         app_id = appnum
                     if line.startswith("<country"):
-                        appcountry = re.search('<country>(.*?)</country>', line).group(1)
+                        appcountry = TAG_TEXT['country'].search(line).group(1)
                     if line.startswith("<date"):
-                        appdate = re.search('<date>(.*?)</date>', line).group(1)
+                        appdate = TAG_TEXT['date'].search(line).group(1)
                         if appdate[6:] != "00":
                             appdate = appdate[:4]+'-' + appdate[4:6]+'-' + appdate[6:]
                         else:
                             appdate = appdate[:4]+'-'+appdate[4:6]+'-'+'01'
                             year = appdate[:4]
                     if line.startswith(" appl-type"):
-                        apptype = re.search('"(.*?)"', line).group(1)
+                        apptype = QUOTED.search(line).group(1)
                 # modeled on the 2005 approach because apptype can be none in 2005, amking the 2002 approach not work
                 # but using the full application number as done in 2005
                 application[app_id] = [appdate[:4]+"/"+appnum, patent_id, series_code, appnum,
@@ -428,7 +408,7 @@ def parse_patents(xml_dir, csv_dir):
                 if 'number-of-claims' in avail_fields:
                     no_claims = avail_fields['number-of-claims'].split("\n")
                     for line in no_claims:
-                        numclaims = re.search('>(.*?)</', line).group(1)
+                        numclaims = ELEMENT_TEXT_TO_CLOSE.search(line).group(1)
 
             except Exception:
                 pass
@@ -442,13 +422,13 @@ def parse_patents(xml_dir, csv_dir):
                 exemplary_claims = []
                 for item in claim:
                     exemplary_claims.append(
-                        re.search(">(.*?)<", item).group(1))
+                        ELEMENT_TEXT.search(item).group(1))
 
             # claims_list = []
             try:
-                claimsdata = re.search('<claims.*?>(.*?)</claims>', i, re.DOTALL).group(1)
-                claim_number = re.finditer('<claim id(.*?)>', claimsdata, re.DOTALL)
-                claims_iter = re.finditer('<claim.*?>(.*?)</claim>', claimsdata, re.DOTALL)
+                claimsdata = CLAIMS_BLOCK.search(i).group(1)
+                claim_number = CLAIM_ID.finditer(claimsdata)
+                claims_iter = CLAIM_TEXT.finditer(claimsdata)
 
                 claim_info = []
                 claim_num_info = []
@@ -456,15 +436,15 @@ def parse_patents(xml_dir, csv_dir):
                     claim = claim.group(1)
                     this_claim = []
                     try:
-                        dependent = re.search('<claim-ref idref="CLM-(\d+)">', claim).group(1)
+                        dependent = CLAIM_REF.search(claim).group(1)
                         dependent = int(dependent)
                         # this_claim.append(dependent)
                     except Exception:
                         dependent = None
-                    text = re.sub('<.*?>|</.*?>', '', claim)
-                    text = re.sub('[\n\t\r\f]+', '', text)
-                    text = re.sub('^\d+\.\s+', '', text)
-                    text = re.sub('\s+', ' ', text)
+                    text = MARKUP.sub('', claim)
+                    text = LINE_BREAKS.sub('', text)
+                    text = CLAIM_NUMBER.sub('', text)
+                    text = WHITESPACE.sub(' ', text)
                     sequence = i+1  # claims are 1-indexed
                     this_claim.append(text)
                     # this_claim.append(sequence)
@@ -473,7 +453,7 @@ def parse_patents(xml_dir, csv_dir):
 
                 for i, claim_num in enumerate(claim_number):
                     claim_num = claim_num.group(1)
-                    clnum = re.search('num="(.*?)"', claim_num).group(1)
+                    clnum = ATTRIBUTE['num'].search(claim_num).group(1)
                     claim_num_info.append(clnum)
                 for i in range(len(claim_info)):
                     # this adds a flag for whether this is an exemplary claim (can be several)
@@ -482,7 +462,7 @@ def parse_patents(xml_dir, csv_dir):
                     if claim_num_info[i].lstrip("0") in exemplary_claims:
                         exemplary = True
                     # this would be clearer using a dictionary. it is patent id, text, dependnecy, number
-                    claims[app_id] = [id_generator(), patent_id, claim_info[i][0],
+                    claims[app_id] = [row_ids('claim'), patent_id, claim_info[i][0],
                                       claim_info[i][1], str(claim_num_info[i]), exemplary]
             except Exception:
                 pass
@@ -513,36 +493,33 @@ def parse_patents(xml_dir, csv_dir):
                     ipcr_fields = j.split("\n")
                     for line in ipcr_fields:
                         if line.startswith("<classification-level"):
-                            class_level = re.search('<classification-level>(.*?)</classification-level>', line).group(1)
+                            class_level = TAG_TEXT['classification-level'].search(line).group(1)
                         if line.startswith("<section"):
-                            section = re.search('<section>(.*?)</section>', line).group(1)
+                            section = TAG_TEXT['section'].search(line).group(1)
                         if line.startswith("<class>"):
-                            mainclass = re.search('<class>(.*?)</class>', line).group(1)
+                            mainclass = TAG_TEXT['class'].search(line).group(1)
                         if line.startswith("<subclass"):
-                            subclass = re.search('<subclass>(.*?)</subclass>', line).group(1)
+                            subclass = TAG_TEXT['subclass'].search(line).group(1)
                         if line.startswith("<main-group"):
-                            group = re.search('<main-group>(.*?)</main-group>', line).group(1)
+                            group = TAG_TEXT['main-group'].search(line).group(1)
                         if line.startswith("<subgroup"):
-                            subgroup = re.search('<subgroup>(.*?)</subgroup>', line).group(1)
+                            subgroup = TAG_TEXT['subgroup'].search(line).group(1)
                         if line.startswith("<ipc-version-indicator"):
-                            ipcrversion = re.search('<date>(.*?)</date>', line).group(1)
+                            ipcrversion = TAG_TEXT['date'].search(line).group(1)
                             if ipcrversion[6:] != "00":
                                 ipcrversion = ipcrversion[:4]+'-' + ipcrversion[4:6]+'-'+ipcrversion[6:]
                             else:
                                 ipcrversion = ipcrversion[:4] + '-'+ipcrversion[4:6]+'-'+'01'
                         if line.startswith("<symbol-position"):
-                            symbol_position = re.search('<symbol-position>(.*?)</symbol-position>', line).group(1)
+                            symbol_position = TAG_TEXT['symbol-position'].search(line).group(1)
                         if line.startswith("<classification-value"):
-                            classification_value = re.search(
-                                '<classification-value>(.*?)</classification-value>', line).group(1)
+                            classification_value = TAG_TEXT['classification-value'].search(line).group(1)
                         if line.startswith("<classification-status"):
-                            classification_status = re.search(
-                                '<classification-status>(.*?)</classification-status>', line).group(1)
+                            classification_status = TAG_TEXT['classification-status'].search(line).group(1)
                         if line.startswith("<classification-data-source"):
-                            classification_source = re.search(
-                                '<classification-data-source>(.*?)</classification-data-source>', line).group(1)
+                            classification_source = TAG_TEXT['classification-data-source'].search(line).group(1)
                         if line.startswith("<action-date>"):
-                            action_date = re.search('<date>(.*?)</date>', line).group(1)
+                            action_date = TAG_TEXT['date'].search(line).group(1)
                             if action_date[6:] != "00":
                                 action_date = action_date[:4]+'-' + action_date[4:6]+'-'+action_date[6:]
                             else:
@@ -551,7 +528,7 @@ def parse_patents(xml_dir, csv_dir):
                     values = set(
                         [section, mainclass, subclass, group, subgroup])
                     if len(values) > 1:  # get rid of the situation in which there is no data
-                        ipcr[app_id] = [id_generator(), patent_id, class_level, section, mainclass, subclass, group, 
+                        ipcr[app_id] = [row_ids('ipcr'), patent_id, class_level, section, mainclass, subclass, group, 
                                         subgroup, symbol_position, classification_value, classification_status,
                                         classification_source, action_date, ipcrversion, str(num)]
                     num += 1
@@ -568,30 +545,29 @@ def parse_patents(xml_dir, csv_dir):
                 n = 0
                 for line in national:
                     if line.startswith('<main-classification'):
-                        main = re.search('<main-classification>(.*?)</main-classification', line).group(1)
+                        main = OPEN_TAG_TEXT['main-classification'].search(line).group(1)
                         crossrefsub = main[3:].replace(" ", "")
-                        if len(crossrefsub) > 3 and re.search('^[A-Z]', crossrefsub[3:]) is None:
+                        if len(crossrefsub) > 3 and LEADING_CAPITAL.search(crossrefsub[3:]) is None:
                             crossrefsub = crossrefsub[:3]+'.'+crossrefsub[3:]
-                        crossrefsub = re.sub('^0+', '', crossrefsub)
-                        if re.search('[A-Z]{3}', crossrefsub[:3]):
+                        crossrefsub = LEADING_ZEROS.sub('', crossrefsub)
+                        if THREE_CAPITALS.search(crossrefsub[:3]):
                             crossrefsub = crossrefsub.replace(".", "")
                         main = main[:3].replace(" ", "")
                         sub = crossrefsub
                         mainclassdata[main] = [main]
                         subclassdata[sub] = [sub]
                     elif line.startswith("<further-classification"):
-                        further_class = re.search(
-                            '<further-classification>(.*?)</further-classification', line).group(1)
+                        further_class = OPEN_TAG_TEXT['further-classification'].search(line).group(1)
                         further_sub_class = further_class[3:].replace(" ", "")
-                        if len(further_sub_class) > 3 and re.search('^[A-Z]', further_sub_class[3:]) is None:
+                        if len(further_sub_class) > 3 and LEADING_CAPITAL.search(further_sub_class[3:]) is None:
                             further_sub_class = further_sub_class[:3] + '.'+further_sub_class[3:]
-                        further_sub_class = re.sub('^0+', '', further_sub_class)
-                        if re.search('[A-Z]{3}', further_sub_class[:3]):
+                        further_sub_class = LEADING_ZEROS.sub('', further_sub_class)
+                        if THREE_CAPITALS.search(further_sub_class[:3]):
                             further_sub_class = further_sub_class.replace(".", "")
                         further_class = further_class[:3].replace(" ", "")
                         mainclassdata[further_class] = [further_class]
                         if further_sub_class != "":
-                            uspc[app_id] = [id_generator(), patent_id, further_class,
+                            uspc[app_id] = [row_ids('uspc'), patent_id, further_class,
                                             further_class+'/'+further_sub_class, str(n)]
                             subclassdata[further_class+'/'+further_sub_class] = [
                                 further_class+'/'+further_sub_class]
@@ -625,14 +601,14 @@ def parse_patents(xml_dir, csv_dir):
                     to_process = i.split('\n')
                     for line in to_process:
                         if line.startswith("<doc-number"):
-                            citdocno = re.search('<doc-number>(.*?)</doc-number>', line).group(1)
+                            citdocno = TAG_TEXT['doc-number'].search(line).group(1)
                             # figure out if this is a citation to an application
-                            if re.match(r'^[A-Z]*\d+$', citdocno):
-                                num = re.findall('\d+', citdocno)
+                            if CITATION_NUMBER.match(citdocno):
+                                num = DIGITS.findall(citdocno)
                                 num = num[0]  # turns it from list to string
                                 if num[0] == '0':  # drop leading zeros
                                     num = num[1:]
-                                let = re.findall('[a-zA-Z]+', citdocno)
+                                let = LETTERS.findall(citdocno)
                                 if let:
                                     let = let[0]  # list to string
                                     citdocno = let + num
@@ -643,41 +619,41 @@ def parse_patents(xml_dir, csv_dir):
                                 app_flag = True
                         try:
                             if line.startswith("<kind"):
-                                citkind = re.search('<kind>(.*?)</kind>', line).group(1)
+                                citkind = TAG_TEXT['kind'].search(line).group(1)
                             if line.startswith("<category"):
-                                citcategory = re.search('<category>(.*?)</category>', line).group(1)
+                                citcategory = TAG_TEXT['category'].search(line).group(1)
                             if line.startswith("<country"):
-                                citcountry = re.search('<country>(.*?)</country>', line).group(1)
+                                citcountry = TAG_TEXT['country'].search(line).group(1)
                             if line.startswith("<name"):
-                                name = re.search("<name>(.*?)</name>", line).group(1)
+                                name = TAG_TEXT['name'].search(line).group(1)
                             if line.startswith("<classification-national"):
-                                ref_class = re.search("<main-classification>(.*?)</main-classification", line).group(1)
+                                ref_class = OPEN_TAG_TEXT['main-classification'].search(line).group(1)
                             if line.startswith("<date"):
-                                citdate = re.search('<date>(.*?)</date>', line).group(1)
+                                citdate = TAG_TEXT['date'].search(line).group(1)
                                 if citdate[6:] != "00":
                                     citdate = citdate[:4]+'-' + citdate[4:6]+'-'+citdate[6:]
                                 else:
                                     citdate = citdate[:4] + '-'+citdate[4:6]+'-'+'01'
                                     year = citdate[:4]
                             if line.startswith("<othercit"):
-                                text = re.search("<othercit>(.*?)</othercit>", line).group(1)
+                                text = TAG_TEXT['othercit'].search(line).group(1)
                         except Exception:
                             print("Problem with other variables")
                     if citcountry == "US":
                         if citdocno != "NULL" and not app_flag:
-                            uspatentcitation[app_id] = [id_generator(), patent_id, citdocno, citdate, name, 
+                            uspatentcitation[app_id] = [row_ids('uspatentcitation'), patent_id, citdocno, citdate, name, 
                                                         citkind, citcountry, citcategory, str(uspatseq), ref_class]
                             uspatseq += 1
                         if citdocno != 'NULL' and app_flag:
-                            usappcitation[app_id] = [id_generator(), patent_id, citdocno, citdate, name,
+                            usappcitation[app_id] = [row_ids('usapplicationcitation'), patent_id, citdocno, citdate, name,
                                                      citkind, citdocno, citcountry, citcategory, str(appseq)]
                             appseq += 1
                     elif citdocno != "NULL":
-                        foreigncitation[app_id] = [id_generator(), patent_id, citdate, citdocno,
+                        foreigncitation[app_id] = [row_ids('foreigncitation'), patent_id, citdate, citdocno,
                                                    citcountry, citcategory, str(forpatseq)]
                         forpatseq += 1
                     if text != "NULL":
-                        otherreference[app_id] = [id_generator(), patent_id, text, str(otherseq)]
+                        otherreference[app_id] = [row_ids('otherreference'), patent_id, text, str(otherseq)]
                         otherseq += 1
 
             try:
@@ -698,29 +674,29 @@ def parse_patents(xml_dir, csv_dir):
                         one_assignee = assignees[i].split("\n")
                         for line in one_assignee:
                             if line.startswith("<orgname"):
-                                assgorg = re.search('<orgname>(.*?)</orgname>', line).group(1)
+                                assgorg = TAG_TEXT['orgname'].search(line).group(1)
                             if line.startswith("<firstname"):
-                                assgfname = re.search('<firstname>(.*?)</firstname>', line).group(1)
+                                assgfname = TAG_TEXT['firstname'].search(line).group(1)
                             if line.startswith("<lastname"):
-                                assglname = re.search('<lastname>(.*?)</lastname>', line).group(1)
+                                assglname = TAG_TEXT['lastname'].search(line).group(1)
                             # handle differnt spelling of tags
                             if line.startswith("<last-name"):
-                                assglname = re.search('<last-name>(.*?)</last-name>', line).group(1)
+                                assglname = TAG_TEXT['last-name'].search(line).group(1)
                             if line.startswith("<first-name"):
-                                assgfname = re.search('<first-name>(.*?)</first-name>', line).group(1)
+                                assgfname = TAG_TEXT['first-name'].search(line).group(1)
                             if line.startswith("<role"):
-                                assgtype = re.search('<role>(.*?)</role>', line).group(1)
+                                assgtype = TAG_TEXT['role'].search(line).group(1)
                                 assgtype = assgtype.lstrip("0")
                             if line.startswith("<country"):
-                                assgcountry = re.search('<country>(.*?)</country>', line).group(1)
+                                assgcountry = TAG_TEXT['country'].search(line).group(1)
                             if line.startswith("<state"):
-                                assgstate = re.search('<state>(.*?)</state>', line).group(1)
+                                assgstate = TAG_TEXT['state'].search(line).group(1)
                             if line.startswith("<city"):
-                                assgcity = re.search('<city>(.*?)</city>', line).group(1)
-                        loc_idd = id_generator()
+                                assgcity = TAG_TEXT['city'].search(line).group(1)
+                        loc_idd = row_ids('rawlocation')
                         rawlocation[loc_idd] = [
                             None, assgcity, assgstate, assgcountry]
-                        rawassignee[app_id] = [id_generator(), patent_id, None, loc_idd, assgtype,
+                        rawassignee[app_id] = [row_ids('rawassignee'), patent_id, None, loc_idd, assgtype,
                                                assgfname, assglname, assgorg, str(i)]
                 else:
                     pass
@@ -756,62 +732,62 @@ def parse_patents(xml_dir, csv_dir):
                     applicant_lines = person.split("\n")
                     for line in applicant_lines:
                         if line.startswith('<applicant'):
-                            sequence = re.search('sequence="(.*?)"', line).group(1)
-                            earlier_applicant_type = re.search('app-type="(.*?)"', line).group(1)
-                            designation = re.search('designation="(.*?)"', line).group(1)
+                            sequence = ATTRIBUTE['sequence'].search(line).group(1)
+                            earlier_applicant_type = ATTRIBUTE['app-type'].search(line).group(1)
+                            designation = ATTRIBUTE['designation'].search(line).group(1)
                         if line.startswith('<us-applicant'):
-                            sequence = re.search('sequence="(.*?)"', line).group(1)
-                            designation = re.search('designation="(.*?)"', line).group(1)
+                            sequence = ATTRIBUTE['sequence'].search(line).group(1)
+                            designation = ATTRIBUTE['designation'].search(line).group(1)
                             try:
-                                later_applicant_type = re.search('applicant-authority-category="(.*?)"', line).group(1)
+                                later_applicant_type = ATTRIBUTE['applicant-authority-category'].search(line).group(1)
                             except Exception:
                                 pass
                         if line.startswith("<orgname"):
-                            orgname = re.search('<orgname>(.*?)</orgname>', line).group(1)
+                            orgname = TAG_TEXT['orgname'].search(line).group(1)
                         if line.startswith("<first-name"):
-                            first_name = re.search('<first-name>(.*?)</first-name>', line).group(1)
+                            first_name = TAG_TEXT['first-name'].search(line).group(1)
                         if line.startswith("<last-name"):
-                            last_name = re.search('<last-name>(.*?)</last-name>', line).group(1)
+                            last_name = TAG_TEXT['last-name'].search(line).group(1)
                         if line.startswith('<street'):
-                            street = re.search('<street>(.*?)</street>', line).group(1)
+                            street = TAG_TEXT['street'].search(line).group(1)
                         if line.startswith('<city'):
-                            city = re.search('<city>(.*?)</city>', line).group(1)
+                            city = TAG_TEXT['city'].search(line).group(1)
                         if line.startswith("<state"):
-                            state = re.search('<state>(.*?)</state>', line).group(1)
+                            state = TAG_TEXT['state'].search(line).group(1)
                         if line.startswith('<country'):
-                            country = re.search('<country>(.*?)</country>', line).group(1)
+                            country = TAG_TEXT['country'].search(line).group(1)
                     try:  # nationality only in earlier years
                         for_nat = person.split("nationality")
                         nation = for_nat[1].split("\n")
                         for line in nation:
                             if line.startswith("<country"):
-                                nation = re.search('<country>(.*?)</country>', line).group(1)
+                                nation = TAG_TEXT['country'].search(line).group(1)
                     except Exception:
                         pass
                     for_res = person.split("residence")
                     res = for_res[1].split("\n")
                     for line in res:
                         if line.startswith("<country"):
-                            residence = re.search('<country>(.*?)</country>', line).group(1)
+                            residence = TAG_TEXT['country'].search(line).group(1)
                     # this get us the non-inventor applicants in 2013+. Inventor applicants are in applicant and also in inventor.
                     non_inventor_app_types = [
                         'legal-representative', 'party-of-interest', 'obligated-assignee', 'assignee']
                     if later_applicant_type in non_inventor_app_types:
-                        loc_idd = id_generator()
+                        loc_idd = row_ids('rawlocation')
                         rawlocation[loc_idd] = [None, city, state, country]
-                        non_inventor_applicant[app_id] = [id_generator(), patent_id, loc_idd, last_name,
+                        non_inventor_applicant[app_id] = [row_ids('non_inventor_applicant'), patent_id, loc_idd, last_name,
                                                           first_name, orgname, sequence, designation, later_applicant_type]
                     # this gets us the inventors from 2005-2012
                     if earlier_applicant_type == "applicant-inventor":
-                        loc_idd = id_generator()
+                        loc_idd = row_ids('rawlocation')
                         rawlocation[loc_idd] = [None, city, state, country]
-                        rawinventor[app_id] = [id_generator(), patent_id, None, loc_idd, first_name,
+                        rawinventor[app_id] = [row_ids('rawinventor'), patent_id, None, loc_idd, first_name,
                                                last_name, str(inventor_seq), rule_47]
                         inventor_seq += 1
                     if (earlier_applicant_type != "applicant-inventor") and earlier_applicant_type != "NULL":
-                        loc_idd = id_generator()
+                        loc_idd = row_ids('rawlocation')
                         rawlocation[loc_idd] = [None, city, state, country]
-                        non_inventor_applicant[app_id] = [id_generator(), patent_id, loc_idd, last_name,
+                        non_inventor_applicant[app_id] = [row_ids('non_inventor_applicant'), patent_id, loc_idd, last_name,
                                                           first_name, orgname, sequence, designation, earlier_applicant_type]
             except Exception:
                 pass
@@ -835,24 +811,24 @@ def parse_patents(xml_dir, csv_dir):
                     one_inventor = inventors[i].split("\n")
                     for line in one_inventor:
                         if line.startswith("<first-name"):
-                            fname = re.search('<first-name>(.*?)</first-name>', line).group(1)
+                            fname = TAG_TEXT['first-name'].search(line).group(1)
                         if line.startswith("<last-name"):
-                            lname = re.search('<last-name>(.*?)</last-name>', line).group(1)
+                            lname = TAG_TEXT['last-name'].search(line).group(1)
                         if line.startswith("<zip"):
-                            invtzip = re.search('<zip>(.*?)</zip>', line).group(1)
+                            invtzip = TAG_TEXT['zip'].search(line).group(1)
                         if line.startswith("<country"):
-                            invtcountry = re.search('<country>(.*?)</country>', line).group(1)
+                            invtcountry = TAG_TEXT['country'].search(line).group(1)
                         if line.startswith("<state"):
-                            invtstate = re.search('<state>(.*?)</state>', line).group(1)
+                            invtstate = TAG_TEXT['state'].search(line).group(1)
                         if line.startswith("<city"):
-                            invtcity = re.search('<city>(.*?)</city>', line).group(1)
+                            invtcity = TAG_TEXT['city'].search(line).group(1)
                     if fname == "NULL" and lname == "NULL":
                         pass
                     else:
-                        loc_idd = id_generator()
+                        loc_idd = row_ids('rawlocation')
                         rawlocation[loc_idd] = [
                             None, invtcity, invtstate, invtcountry]
-                        rawinventor[app_id] = [id_generator(), patent_id, None, loc_idd,
+                        rawinventor[app_id] = [row_ids('rawinventor'), patent_id, None, loc_idd,
                                                fname, lname, str(i-1), rule_47]
             except Exception:
                 pass
@@ -868,16 +844,16 @@ def parse_patents(xml_dir, csv_dir):
                     one_agent = agent[i].split("\n")
                     for line in one_agent:
                         if line.startswith("<first-name"):
-                            fname = re.search('<first-name>(.*?)</first-name>', line).group(1)
+                            fname = TAG_TEXT['first-name'].search(line).group(1)
                         if line.startswith("<last-name"):
-                            lname = re.search('<last-name>(.*?)</last-name>', line).group(1)
+                            lname = TAG_TEXT['last-name'].search(line).group(1)
                         if line.startswith("<country"):
-                            lawcountry = re.search('<country>(.*?)</country>', line).group(1)
+                            lawcountry = TAG_TEXT['country'].search(line).group(1)
                         if line.startswith("<orgname"):
-                            laworg = re.search('<orgname>(.*?)</orgname>', line).group(1)
+                            laworg = TAG_TEXT['orgname'].search(line).group(1)
                         if line.startswith("<agent sequence"):
-                            rep_type = re.search('rep-type=\"(.*?)\"', line).group(1)
-                    rawlawyer[app_id] = [id_generator(), "", patent_id, fname, lname, laworg, lawcountry, str(i)]
+                            rep_type = ATTRIBUTE['rep-type'].search(line).group(1)
+                    rawlawyer[app_id] = [row_ids('rawlawyer'), "", patent_id, fname, lname, laworg, lawcountry, str(i)]
             except Exception:
                 pass
 
@@ -912,14 +888,14 @@ def parse_patents(xml_dir, csv_dir):
                             doc_type = doc_info[1][1:-2]
                             for line in doc_info:
                                 if line.startswith("<doc-number"):
-                                    reldocno = re.search('<doc-number>(.*?)</doc-number>', line).group(1)
+                                    reldocno = TAG_TEXT['doc-number'].search(line).group(1)
                                 if line.startswith("<kind"):
-                                    kind = re.search('<kind>(.*?)</kind>', line).group(1)
+                                    kind = TAG_TEXT['kind'].search(line).group(1)
                                 if line.startswith("<country"):
-                                    relcountry = re.search('<country>(.*?)</country>', line).group(1)
+                                    relcountry = TAG_TEXT['country'].search(line).group(1)
                                 try:
                                     if line.startswith("<date"):
-                                        reldate = re.search('<date>(.*?)</date>', line).group(1)
+                                        reldate = TAG_TEXT['date'].search(line).group(1)
                                         if reldate[6:] != "00":
                                             reldate = reldate[:4]+'-' + reldate[4:6]+'-'+reldate[6:]
                                         else:
@@ -928,7 +904,7 @@ def parse_patents(xml_dir, csv_dir):
                                 except Exception:
                                     print("Missing date on usreldoc")
                                     reldate = "0000-00-00"
-                            usreldoc[app_id] = [id_generator(), patent_id, doc_type, "NULL", reldocno, relcountry,
+                            usreldoc[app_id] = [row_ids('usreldoc'), patent_id, doc_type, "NULL", reldocno, relcountry,
                                                 reldate, "NULL", rel_seq, kind]
                             #usrel.writerow(['uuid', 'patent_id', 'doc_type',  'relkind', 'reldocno', 'relcountry', 'reldate',  'parent_status', 'rel_seq','kind'])
                             rel_seq += 1
@@ -954,14 +930,14 @@ def parse_patents(xml_dir, csv_dir):
                                 relparentstatus = None
                                 for line in parent_or_child:
                                     if line.startswith("<doc-number"):
-                                        reldocno = re.search('<doc-number>(.*?)</doc-number>', line).group(1)
+                                        reldocno = TAG_TEXT['doc-number'].search(line).group(1)
                                     if line.startswith("<kind"):
-                                        kind = re.search('<kind>(.*?)</kind>', line).group(1)
+                                        kind = TAG_TEXT['kind'].search(line).group(1)
                                     if line.startswith("<country"):
-                                        relcountry = re.search('<country>(.*?)</country>', line).group(1)
+                                        relcountry = TAG_TEXT['country'].search(line).group(1)
                                     try:
                                         if line.startswith("<date"):
-                                            reldate = re.search('<date>(.*?)</date>', line).group(1)
+                                            reldate = TAG_TEXT['date'].search(line).group(1)
                                             if reldate[6:] != "00":
                                                 reldate = reldate[:4]+'-' + reldate[4:6] + '-'+reldate[6:]
                                             else:
@@ -971,8 +947,8 @@ def parse_patents(xml_dir, csv_dir):
                                         reldate = "0000-00-00"
                                         print("Missing date on reldoc")
                                     if line.startswith("<parent-status"):
-                                        relparentstatus = re.search('<parent-status>(.*?)</parent-status', line).group(1)
-                                usreldoc[app_id] = [id_generator(), patent_id, doc_type, reltype, reldocno,
+                                        relparentstatus = OPEN_TAG_TEXT['parent-status'].search(line).group(1)
+                                usreldoc[app_id] = [row_ids('usreldoc'), patent_id, doc_type, reltype, reldocno,
                                                     relcountry, reldate,  relparentstatus, rel_seq, kind]
                                 rel_seq += 1
 
@@ -985,15 +961,15 @@ def parse_patents(xml_dir, csv_dir):
                     lname = "Null"
                     for line in list_of_examiner:
                         if line.startswith("<first-name"):
-                            fname = re.search("<first-name>(.*?)</first-name>", line).group(1)
+                            fname = TAG_TEXT['first-name'].search(line).group(1)
                         if line.startswith("<last-name"):
-                            lname = re.search("<last-name>(.*?)</last-name>", line).group(1)
+                            lname = TAG_TEXT['last-name'].search(line).group(1)
                         if line.startswith("<department"):
-                            department = re.search("<department>(.*?)</department>", line).group(1)
+                            department = TAG_TEXT['department'].search(line).group(1)
                     if i == 0:  # the first examiner is the primary examiner
-                        examiner[app_id] = [id_generator(), docno, fname, lname, "primary", department]
+                        examiner[app_id] = [row_ids('rawexaminer'), docno, fname, lname, "primary", department]
                     else:
-                        examiner[app_id] = [id_generator(), docno, fname, lname, "assistant", department]
+                        examiner[app_id] = [row_ids('rawexaminer'), docno, fname, lname, "assistant", department]
             except Exception:
                 pass
 
@@ -1008,24 +984,23 @@ def parse_patents(xml_dir, csv_dir):
                     priority_claim = i.split("\n")
                     for line in priority_claim:
                         if line.startswith("<country"):
-                            country = re.search("<country>(.*?)</country>", line).group(1)
+                            country = TAG_TEXT['country'].search(line).group(1)
                         if line.startswith("<doc-number"):
-                            app_num = re.search("<doc-number>(.*?)</doc-number>", line).group(1)
+                            app_num = TAG_TEXT['doc-number'].search(line).group(1)
                         if line.startswith("<date"):
-                            app_date = re.search("<date>(.*?)</date>", line).group(1)
+                            app_date = TAG_TEXT['date'].search(line).group(1)
                             if app_date[6:] != "00":
                                 app_date = app_date[:4]+'-' + app_date[4:6] + '-' + app_date[6:]
                             else:
                                 app_date = app_date[:4] + '-'+ appd_ate[4:6] + '-' + '01'
                         if line.startswith(" sequence"):
-                            kind = re.search('kind="(.*?)"', line).group(1)
+                            kind = ATTRIBUTE['kind'].search(line).group(1)
                         if line.startswith("<id"):
                             priority_id = re.search("<id>(>*?)<id>", line).group(1)
                         if line.startswith("<priority-doc-requested"):
-                            priority_requested = re.search(
-                                "<priority-doc-requested>(.*?)</priority-doc-requested", line).group(1)
+                            priority_requested = OPEN_TAG_TEXT['priority-doc-requested'].search(line).group(1)
                     # priority_id and priority_requested cant be found
-                    for_priority[app_id] = [id_generator(), patent_id, sequence, kind, app_num, app_date, country]
+                    for_priority[app_id] = [row_ids('foreign_priority'), patent_id, sequence, kind, app_num, app_date, country]
                     sequence += 1
 
             # if "description" in avail_fields:
@@ -1038,14 +1013,14 @@ def parse_patents(xml_dir, csv_dir):
                 for line in rel_app:
                     if line.startswith("<heading"):
                         rel_app_seq += 1
-                        heading = re.search(">(.*?)<", line).group(1)
+                        heading = ELEMENT_TEXT.search(line).group(1)
                         text_field += heading + " "
                         # rel_app_text[id_generator()] = [patent_id,"heading", heading, rel_app_seq]
                     if line.startswith("<p"):
                         rel_app_seq += 1
-                        text = re.search(">(.*?)</p>", line).group(1)
+                        text = PARAGRAPH_TEXT.search(line).group(1)
                         text_field += text + " "
-                rel_app_text[app_id] = [id_generator(), patent_id, text_field]
+                rel_app_text[app_id] = [row_ids('rel_app_text'), patent_id, text_field]
             except Exception:
                 pass
 
@@ -1069,16 +1044,16 @@ def parse_patents(xml_dir, csv_dir):
                         # text = "".join(text)
                         # if not (text.strip() in ["BRIEF DESCRIPTION OF THE DRAWINGS", "BRIEF DESCRIPTION OF THE DRAWING", "BRIEF DESCRIPTION OF THE DRAWING"]):
                         if (not text.isupper()) | (any(char.isdigit() for char in text)):
-                            draw_desc_text[app_id] = [id_generator(), patent_id, text, draw_seq]
+                            draw_desc_text[app_id] = [row_ids('draw_desc_text'), patent_id, text, draw_seq]
                         else:
                             pass  # skipping the brief description heading
                     if line.startswith("<heading"):
                         draw_seq += 1
 
-                        heading = re.search(">(.*?)<", line).group(1)
+                        heading = ELEMENT_TEXT.search(line).group(1)
                         # draw_text += " " + heading
                         if (not desc.isupper()) | (any(char.isdigit() for char in desc)):
-                            draw_desc_text[app_id] = [id_generator(), patent_id, heading, draw_seq]
+                            draw_desc_text[app_id] = [row_ids('draw_desc_text'), patent_id, heading, draw_seq]
                         else:
                             pass  # skipping the brief description heading
             except Exception:
@@ -1101,10 +1076,10 @@ def parse_patents(xml_dir, csv_dir):
                         brf_text += ' ' + brf_sum
                     if line.startswith("<heading"):
                         brf_sum_seq += 1
-                        heading = re.search(">(.*?)<", line).group(1)
+                        heading = ELEMENT_TEXT.search(line).group(1)
                         brf_text += " " + heading
                         # brf_sum_text[id_generator()] = [patent_id,"heading", heading, brf_sum_seq]
-                brf_sum_text[app_id] = [id_generator(), patent_id, brf_text]
+                brf_sum_text[app_id] = [row_ids('brf_sum_text'), patent_id, brf_text]
             except Exception:
                 pass
 
@@ -1126,7 +1101,7 @@ def parse_patents(xml_dir, csv_dir):
                             detailed_text_field += " " + det_desc
                     if line.startswith("<heading"):
                         det_seq += 1
-                        heading = re.search(">(.*?)<", line).group(1)
+                        heading = ELEMENT_TEXT.search(line).group(1)
                         detailed_text_field += " " + heading
                         # detail_desc_text[id_generator()] = [patent_id,"heading", heading, det_seq]
                 if ("<" in detailed_text_field) or (">" in detailed_text_field):
@@ -1136,7 +1111,7 @@ def parse_patents(xml_dir, csv_dir):
                     text = detailed_text_field
                 # text = [piece.encode('utf-8','ignore') for piece in text]
                 # text = "".join(text)
-                detail_desc_text[app_id] = [id_generator(), patent_id, text, len(text)]
+                detail_desc_text[app_id] = [row_ids('detail_desc_text'), patent_id, text, len(text)]
             except Exception:
                 pass
 
@@ -1149,14 +1124,14 @@ def parse_patents(xml_dir, csv_dir):
                 us_term_extension = 'NULL'
                 for line in us_term_of_grant_temp:
                     if line.startswith('<lapse-of-patent'):
-                        lapse_of_patent = re.search('<lapse-of-patent>(.*?)</lapse-of-patent>', line).group(1)
+                        lapse_of_patent = TAG_TEXT['lapse-of-patent'].search(line).group(1)
                     if line.startswith('<text'):
-                        text = re.search('<text>(.*?)</text>', line).group(1)
+                        text = TAG_TEXT['text'].search(line).group(1)
                     if line.startswith('<length-of-grant'):
-                        length_of_grant = re.search('<length-of-grant>(.*?)</length-of-grant>', line).group(1)
+                        length_of_grant = TAG_TEXT['length-of-grant'].search(line).group(1)
                     if line.startswith('<us-term-extension'):
-                        us_term_extension = re.search('<us-term-extension>(.*?)</us-term-extension>', line).group(1)
-                us_term_of_grant[app_id] = [id_generator(), patent_id, lapse_of_patent, "NULL",
+                        us_term_extension = TAG_TEXT['us-term-extension'].search(line).group(1)
+                us_term_of_grant[app_id] = [row_ids('us_term_of_grant'), patent_id, lapse_of_patent, "NULL",
                                             text, length_of_grant, us_term_extension]
 
             if 'pct-or-regional-publishing-data' in avail_fields:
@@ -1170,20 +1145,20 @@ def parse_patents(xml_dir, csv_dir):
                 for line in publishing:
                     try:
                         if line.startswith("<doc-number"):
-                            rel_id = re.search("<doc-number>(.*?)</doc-number>", line).group(1)
+                            rel_id = TAG_TEXT['doc-number'].search(line).group(1)
                     except Exception:
                         print("Publishing data lacks docno")
                     if line.startswith('<kind'):
-                        kind = re.search('<kind>(.*?)</kind>', line).group(1)
+                        kind = TAG_TEXT['kind'].search(line).group(1)
                     if line.startswith('<date'):
-                        date = re.search('<date>(.*?)</date>', line).group(1)
+                        date = TAG_TEXT['date'].search(line).group(1)
                         if date[6:] != "00":
                             date = date[:4]+'-'+date[4:6]+'-'+date[6:]
                         else:
                             date = date[:4]+'-' + date[4:6]+'-'+'01'
                     if line.startswith('<country'):
-                        country = re.search('<country>(.*?)</country>', line).group(1)
-                pct_data[app_id] = [id_generator(), patent_id, rel_id, date, None, country, kind, "wo_grant", None]
+                        country = TAG_TEXT['country'].search(line).group(1)
+                pct_data[app_id] = [row_ids('pct_data'), patent_id, rel_id, date, None, country, kind, "wo_grant", None]
 
             if "pct-or-regional-filing-data" in avail_fields:
                 rel_id = None
@@ -1202,27 +1177,26 @@ def parse_patents(xml_dir, csv_dir):
                     info_371 = []
                 for line in pct_info:
                     if line.startswith("<doc-number"):
-                        rel_id = re.search(
-                            "<doc-number>(.*?)</doc-number>", line).group(1)
+                        rel_id = TAG_TEXT['doc-number'].search(line).group(1)
                     if line.startswith('<kind'):
-                        kind = re.search('<kind>(.*?)</kind>', line).group(1)
+                        kind = TAG_TEXT['kind'].search(line).group(1)
                     if line.startswith('<date'):
-                        date = re.search('<date>(.*?)</date>', line).group(1)
+                        date = TAG_TEXT['date'].search(line).group(1)
                         if date[6:] != "00":
                             date = date[:4]+'-'+date[4:6]+'-'+date[6:]
                         else:
                             date = date[:4]+'-' + date[4:6]+'-'+'01'
                     if line.startswith('<country'):
-                        country = re.search('<country>(.*?)</country>', line).group(1)
+                        country = TAG_TEXT['country'].search(line).group(1)
                 for line in info_371:
                     if line.startswith('<date'):
-                        date3 = re.search('<date>(.*?)</date>', line).group(1)
+                        date3 = TAG_TEXT['date'].search(line).group(1)
                         if date3[6:] != "00":
                             date3 = date3[:4]+'-'+date3[4:6]+'-'+date3[6:]
                         else:
                             date3 = date3[:4]+'-' + date3[4:6]+'-'+'01'
                         date_371 = date3
-                pct_data[app_id] = [id_generator(), patent_id, rel_id, date, date_371,
+                pct_data[app_id] = [row_ids('pct_data'), patent_id, rel_id, date, date_371,
                                     country, kind, "pct_application", None]
 
             # us-issued (add to patents?)
@@ -1233,12 +1207,12 @@ def parse_patents(xml_dir, csv_dir):
                 for line in figures:
                     try:
                         if line.startswith('<number-of-drawing-sheets'):
-                            sheets = re.search('<number-of-drawing-sheets>(.*?)</number-of-drawing-sheets>', line).group(1)
+                            sheets = TAG_TEXT['number-of-drawing-sheets'].search(line).group(1)
                         if line.startswith('<number-of-figures'):
-                            figs = re.search('<number-of-figures>(.*?)</number-of-figures>', line).group(1)
+                            figs = TAG_TEXT['number-of-figures'].search(line).group(1)
                     except Exception:
                         print("Missing field from figures")
-                figure_data[app_id] = [id_generator(), patent_id, figs, sheets]
+                figure_data[app_id] = [row_ids('figures'), patent_id, figs, sheets]
             if "us-botanic" in avail_fields:
                 latin = None
                 variety = None
@@ -1246,12 +1220,12 @@ def parse_patents(xml_dir, csv_dir):
                 for line in botanic:
                     try:
                         if line.startswith("<latin-name"):
-                            latin_name = re.search('<latin-name>(.*?)</latin-name>', line).group(1)
+                            latin_name = TAG_TEXT['latin-name'].search(line).group(1)
                         if line.startswith("<variety"):
-                            variety = re.search("<variety>(.*?)</variety>", line).group(1)
+                            variety = TAG_TEXT['variety'].search(line).group(1)
                     except Exception:
                         print("Problem with botanic")
-                botanic_data[app_id] = [id_generator(), patent_id, appnum, latin_name, variety]
+                botanic_data[app_id] = [row_ids('botanic'), patent_id, appnum, latin_name, variety]
 
             patentdata[app_id] = [patent_id, apptype, docno, 'US', issdate, abst, title, patkind, numclaims, d]
 
@@ -1,14 +1,12 @@
 import argparse
+from collections import deque
 import concurrent.futures as cf
-from itertools import repeat
 import logging
 import logging.config
 import os
 from pprint import pprint
-import random
 import re
 import requests
-import string
 import sys
 import time
 import uuid
@@ -16,13 +14,46 @@ import zipfile
 from lxml import etree, html
 
 from db_pgsql import Db_grants as Db
+from db_pgsql import RowCollector, RowWriter, connection_pool
+from metrics import FileMetrics, peak_rss_kb, timed
+from parser_helpers import get_text_or_none, xpaths
+from pipeline import Pipeline
+from xml_stream import iter_raw_documents, open_xml, xml_basename
 import settings
 
+# row ids are shared with the text-split parsers in Raw_Data_Parsers
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'Raw_Data_Parsers', 'uspto_parsers'))
+from row_ids import row_id
+
 
 WORK_DIR = settings.GRANT_XMLDIR
 LOG_DIR = 'logs/'
+# one JSON line of metrics per parsed file
+METRICS_FILE = LOG_DIR + 'grant_metrics.jsonl'
 MAIN_URL = 'https://bulkdata.uspto.gov/data/patent/grant/redbook/fulltext/2017/'
 MAIN_URL = 'https://bulkdata.uspto.gov/data/patent/grant/redbook/fulltext/2018/'
+SCHEMA = 'patent_grants_v2'
+# patents handed to each parse process ahead of the one being written
+PENDING_PER_PROCESS = 4
+# weekly files downloaded at the same time, and bytes read from the network at once
+DOWNLOADS = 2
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# doc-number of the first publication-reference of a document, which is that of the bibliographic data
+PUBLICATION_DOC_NUMBER = re.compile(rb'<publication-reference\b.*?<doc-number>([^<]*)</doc-number>', re.S)
+
+# tables a re-parsed patent is deleted from, children before the patent itself
+GRANT_TABLES = [
+    'claim', 'ipcr', 'uspc', 'uspatentcitation', 'wipo', 'government_interest',
+    'usapplicationcitation', 'foreigncitation', 'otherreference', 'rawassignee',
+    'non_inventor_applicant', 'rawinventor', 'rawlawyer', 'rawexaminer', 'usreldoc',
+    'foreign_priority', 'draw_desc_text', 'rel_app_text', 'brf_sum_text', 'detail_desc_text',
+    'us_term_of_grant', 'pct_data', 'figures', 'botanic', 'application', 'patent'
+]
+
+db_pool = None
+# filled by the parse functions, module level so that every parse process has them
+mainclassdata = {}
+subclassdata = {}
 
 
 def create_logger():
@@ -57,18 +88,6 @@ def download_html(url):
             return html_content
 
 
-def id_generator(size=25, chars=string.ascii_lowercase + string.digits):
-        return ''.join(random.choice(chars) for _ in range(size))
-
-
-def get_text_or_none(element, item_name):
-    item = element.xpath(item_name)
-    if len(item) > 0:
-        return str(item[0])
-    else:
-        return None
-
-
 def print_children(element, level=0):
     if element is None:
         return
@@ -92,67 +111,41 @@ def print_children(element, level=0):
             pass
 
 
-def clean_file(raw_file):
+def download_file(url):
     '''
-    Alters the raw patentsview data files to produce valid XML. 
-    Original is invalid because it lacks a root tag and has multiple xml version tags
-    :param raw_file: raw patentsview file
-    :return  null, creates list of files
+    Downloads the zip at url into WORK_DIR, unless it or the xml file it holds is there already.
+    The zip is not extracted, parse_file reads the xml file straight from it.
+    The download goes to a .part file first, so an interrupted download is not taken for a zip.
+    :return the path of the xml file when it is there, of the zip otherwise
     '''
-    logger.info('Cleaning XML file')
-    if WORK_DIR not in raw_file:
-            raw_file = os.path.join(WORK_DIR, raw_file)
-    new_file = raw_file[:-4] + '_clean.xml'
-    file_already_cleaned = False
-    try:
-        with open(raw_file, 'r+') as f:
-            with open(new_file, 'w') as new_f:
-                new_f.write('<?xml version="1.0" encoding="UTF-8"?>' + "\n")
-                new_f.write('<root>' + '\n')
-                for line in f.readlines():
-                    if not line.lstrip().startswith('<?xml') and not line.lstrip().startswith('<!DOCTYPE'):
-                        if line.lstrip().startswith('<root'):
-                            file_already_cleaned = True
-                            break
-                        new_f.write(line)
-                new_f.write('</root>')
-        if file_already_cleaned:
-            os.remove(new_file)
-        else:
-            os.replace(new_file, raw_file)
-        # move(new_file, raw_file)
-    except Exception:
-        logger.exception('message')
-
-
-def download_file(url):
     zip_filename = os.path.join(WORK_DIR, url.split('/')[-1])
-    xml_filename = zip_filename.replace('zip', 'xml')
-    if os.path.isfile(zip_filename) or os.path.isfile(xml_filename):
+    xml_filename = os.path.join(WORK_DIR, xml_basename(zip_filename))
+    if os.path.isfile(xml_filename):
         logger.debug('File already exists.')
-    else:
-        logger.info('Downloading %s', url)
-        # NOTE the stream=True parameter
-        # logger.debug('Getting zip from %s' % url)
-        start_time = time.time()
-        r = requests.get(url, stream=True)
-        with open(zip_filename, 'wb') as f:
-            for chunk in r.iter_content(chunk_size=1024):
+        return xml_filename
+    if os.path.isfile(zip_filename):
+        logger.debug('File already exists.')
+        return zip_filename
+    logger.info('Downloading %s', url)
+    start_time = time.time()
+    part_filename = zip_filename + '.part'
+    # NOTE the stream=True parameter
+    r = requests.get(url, stream=True)
+    try:
+        r.raise_for_status()
+        with open(part_filename, 'wb') as f:
+            for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                 if chunk:  # filter out keep-alive new chunks
                     f.write(chunk)
+    finally:
         r.close()
-        logger.info('File %s downloaded in [%s sec].', zip_filename, time.time() - start_time)
-    if not os.path.isfile(xml_filename) and os.path.isfile(zip_filename):
-        try:
-            zip_ref = zipfile.ZipFile(zip_filename, 'r')
-            zip_ref.extractall(WORK_DIR)
-            zip_ref.close()
-            clean_file(xml_filename)
-            os.remove(zip_filename)
-        except Exception:
-            logger.error('UNZIP ERROR. Deleting file %s' % zip_filename)
-            os.remove(zip_filename)
-    return os.path.basename(xml_filename)
+    if not zipfile.is_zipfile(part_filename):
+        logger.error('UNZIP ERROR. Deleting file %s' % zip_filename)
+        os.remove(part_filename)
+        raise zipfile.BadZipFile('{} is not a zip file'.format(url))
+    os.replace(part_filename, zip_filename)
+    logger.info('File %s downloaded in [%s sec].', zip_filename, time.time() - start_time)
+    return zip_filename
 
 
 def get_urls(main_url):
@@ -174,69 +167,212 @@ def get_urls(main_url):
     return None
 
 
+def get_patent_id(case):
+    pub_ref = case.find('us-bibliographic-data-grant/publication-reference')
+    docno = get_text_or_none(pub_ref, 'document-id/doc-number/text()')
+    return patent_id_from_docno(docno)
+
+
+def get_patent_id_raw(document):
+    """
+    get_patent_id of a serialized us-patent-grant, by searching its bytes for
+    the first publication-reference (that of the bibliographic data) instead
+    of parsing it.
+    """
+    match = PUBLICATION_DOC_NUMBER.search(document)
+    if match is None:
+        raise ValueError('No publication-reference doc-number in document')
+    return patent_id_from_docno(match.group(1).decode())
+
+
+def patent_id_from_docno(docno):
+    num = re.findall('\d+', docno)
+    num = num[0]  # turns it from list to string
+    if num[0].startswith("0"):
+        num = num[1:]
+        let = re.findall('[a-zA-Z]+', docno)
+    else:
+        let = None
+    if let:
+        let = let[0]  # list to string
+        docno = let + num
+    else:
+        docno = num
+    return docno
+
+
+def _walk_text(element):
+    """
+    The nodes under element in document order, each as (node, None) when the
+    walk reaches it, and the text and tail strings as (None, text) where they
+    are in the serialized element. The text of processing instructions and
+    comments is left out, it is part of their markup.
+    """
+    yield element, None
+    if element.text and element.tag is not etree.PI and element.tag is not etree.Comment:
+        yield None, element.text
+    for child in element:
+        yield from _walk_text(child)
+    if element.tail:
+        yield None, element.tail
+
+
+def government_interest_text(description_element):
+    """
+    The government interest statement of a description: the text from the
+    first GOVINT processing instruction to the next one, or to the end of the
+    description. Only the nodes after the first GOVINT are walked, and
+    descriptions without one are skipped by a single XPath lookup.
+    The text is escaped the way etree.tostring serializes it, as the statement
+    was always cut out of the serialized description.
+    """
+    if description_element is None:
+        return None
+    govint = xpaths('.//processing-instruction("GOVINT")')(description_element)
+    if not govint:
+        return None
+    end = govint[1] if len(govint) > 1 else None
+    pieces = [govint[0].tail or '']
+    node = govint[0]
+    while node is not None:
+        sibling = node.getnext()
+        while sibling is not None:
+            for walked, text in _walk_text(sibling):
+                if walked is None:
+                    pieces.append(text)
+                elif walked is end:
+                    sibling = node = None
+                    break
+            else:
+                sibling = sibling.getnext()
+        if node is not None:
+            node = node.getparent()
+            if node.tail:
+                pieces.append(node.tail)
+            if node is description_element:
+                break
+    text = ''.join(pieces)
+    text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('\r', '&#13;')
+    return text.encode('ascii', 'xmlcharrefreplace').decode()
+
+
+def replace_existing_patents(filename, dbc, skip=0):
+    """
+    Pre-pass over a weekly file: look up all of its patents in the database
+    with one query, and delete those the file replaces with one set-based
+    delete per table. Returns the ids of the patents to keep as they are.
+    The first skip patents, which a resumed parse leaves out, are not looked at.
+    """
+    patent_ids = []
+    with open_xml(filename, skip, 'us-patent-grant') as inputfile:
+        for document in iter_raw_documents(inputfile, 'us-patent-grant'):
+            patent_ids.append(get_patent_id_raw(document))
+    new_file_date = int(re.sub(r"\D", "", xml_basename(filename)))
+    replaced = []
+    kept = set()
+    for patent_id, patent_id_db in dbc.patent_ids_get(patent_ids).items():
+        logger.warning('Patent_id %s exists in the database', patent_id)
+        db_file_date = int(re.sub(r"\D", "", patent_id_db['filename']))
+        if new_file_date > db_file_date \
+            or (patent_id_db['status'] == 'new' and args.force) \
+            or (new_file_date >= db_file_date and args.parseall and args.force):
+            replaced.append(patent_id)
+        else:
+            kept.add(patent_id)
+    if replaced:
+        logger.warning('Deleting %s existing patents', len(replaced))
+        if dbc.delete_patents(replaced, GRANT_TABLES) is None:
+            raise RuntimeError('Failed to delete the patents replaced by {}'.format(filename))
+    return kept
+
+
 def parse_file(filename, file_id):
+    """
+    Parse a weekly file, the xml file or the zip it came in, into the database
+    and delete it afterwards. The patents are parsed into rows by
+    a pool of processes; one writer thread with its own connection from
+    db_pool writes the rows with COPY, in the order of the file.
+    The metrics of the file are appended to METRICS_FILE.
+    """
+    global db_pool
     dbc = Db()
+    if db_pool is None:
+        db_pool = connection_pool(SCHEMA)
+    writer = RowWriter(db_pool, logger)
+    writer.start()
+    pending = deque()
     if WORK_DIR not in filename:
         filename = os.path.join(WORK_DIR, filename)
-    with open(filename, 'rb') as inputfile:
-        file_start_time = time.time()
-        logger.info('Parsing file %s' % filename)
-        context = etree.iterparse(inputfile, events=('end',), tag='us-patent-grant')
-        pat_counter = 1
-        for event, case in context:
-            data_grant = case.find('us-bibliographic-data-grant')
-            pub_ref = data_grant.find('publication-reference')
-            docno = get_text_or_none(pub_ref, 'document-id/doc-number/text()')
-            num = re.findall('\d+', docno)
-            num = num[0]  # turns it from list to string
-            if num[0].startswith("0"):
-                num = num[1:]
-                let = re.findall('[a-zA-Z]+', docno)
-            else:
-                let = None
-            if let:
-                let = let[0]  # list to string
-                docno = let + num
-            else:
-                docno = num
-            patent_id = docno
-            print(pat_counter, '[{}:{}]'.format(os.path.basename(filename), patent_id))
-            patent_id_db = dbc.patent_id_get(patent_id, file_id)
-            if patent_id_db is not None:
-                logger.warning('Patent_id %s exists in the database', patent_id)
-                new_file_date = int(re.sub(r"\D", "", filename))
-                db_file_date = int(re.sub(r"\D", "", patent_id_db['filename']))
-                # print(new_file_date, db_file_date)
-                # exit()
-                if new_file_date > db_file_date \
-                    or (patent_id_db['status'] == 'new' and args.force) \
-                    or (new_file_date >= db_file_date and args.parseall and args.force):
-                    table_names = [
-                        'claim', 'ipcr', 'uspc', 'uspatentcitation', 'wipo', 'government_interest',
-                        'usapplicationcitation', 'foreigncitation', 'otherreference', 'rawassignee',
-                        'non_inventor_applicant', 'rawinventor', 'rawlawyer', 'rawexaminer', 'usreldoc',
-                        'foreign_priority', 'draw_desc_text', 'rel_app_text', 'brf_sum_text', 'detail_desc_text',
-                        'us_term_of_grant', 'pct_data', 'figures', 'botanic', 'application', 'patent'
-                    ]
-                    logger.warning('Deleting existing patent with id %s', patent_id)
-                    # for t in table_names:
-                    #     dbc.delete_patent(patent_id, t)
-                    with cf.ThreadPoolExecutor(max_workers=len(table_names)) as executor:
-                        executor.map(dbc.delete_patent, repeat(patent_id), table_names)
-                    dbc.cnx.commit()
-                    parse_grant(case, filename, dbc)
-            else:
-                logger.info('Processing new Patent_id %s', patent_id)
-                parse_grant(case, filename, dbc)
-            pat_counter += 1
-            case.clear()
+    skip = resume_offset(file_id, dbc)
+    metrics = FileMetrics(xml_basename(filename))
+
+    def write_rows(future, checkpoint):
+        if future is None:
+            writer.write([], checkpoint)
+        else:
+            tables, timings, worker_peak_rss_kb = future.result()
+            writer.write(tables, checkpoint)
+            metrics.add(timings, worker_peak_rss_kb)
+
+    try:
+        kept = replace_existing_patents(filename, dbc, skip)
+        with open_xml(filename, skip, 'us-patent-grant') as inputfile, \
+                cf.ProcessPoolExecutor(max_workers=args.processes) as parse_pool:
+            file_start_time = time.time()
+            logger.info('Parsing file %s' % filename)
+            # the documents go to the workers as the bytes read from the file, the parent never parses them
+            for doc_offset, document in enumerate(iter_raw_documents(inputfile, 'us-patent-grant'), skip):
+                patent_id = get_patent_id_raw(document)
+                print(doc_offset + 1, '[{}:{}]'.format(xml_basename(filename), patent_id))
+                if patent_id in kept:
+                    logger.info('Keeping Patent_id %s that exists in the database', patent_id)
+                    future = None
+                else:
+                    logger.info('Processing Patent_id %s', patent_id)
+                    future = parse_pool.submit(extract_grant, document, xml_basename(filename))
+                pending.append((future, (file_id, doc_offset, patent_id)))
+                while len(pending) > args.processes * PENDING_PER_PROCESS:
+                    write_rows(*pending.popleft())
+            while pending:
+                write_rows(*pending.popleft())
+    finally:
+        writer.close()
+    metrics.write(METRICS_FILE)
     dbc.file_update_status(file_id, 'finished')
     os.remove(filename)
     logger.info('Finished parsing file %s in [%s sec]', filename, time.time() - file_start_time)
 
 
-def parse_grant(case, filename, dbc):
-    global rawlocation_list
+def resume_offset(file_id, dbc):
+    """
+    The number of patents of file file_id to leave out: those up to the
+    checkpoint in file_info of an earlier parse of the file that did not
+    finish, none when the file is parsed from the start. A parse from the
+    start clears the checkpoint. --force always parses from the start.
+    """
+    checkpoint = dbc.file_get_checkpoint(file_id)
+    if checkpoint is not None and checkpoint['status'] != 'finished' and not args.force \
+            and checkpoint['last_doc_offset'] is not None:
+        logger.warning('Resuming file %s after patent %s at offset %s', file_id,
+                       checkpoint['last_doc_number'], checkpoint['last_doc_offset'])
+        return checkpoint['last_doc_offset'] + 1
+    dbc.file_update_checkpoint(file_id, None, None)
+    return 0
+
+
+def extract_grant(xml, filename):
+    """
+    Worker for parse_file: parse one us-patent-grant document, its bytes, into
+    the (table_name, rows) pairs of a RowCollector. Returns them with the time
+    spent in every section and the peak RSS of the worker.
+    """
+    rows = RowCollector()
+    timings = {}
+    parse_grant(etree.fromstring(xml), filename, rows, timings)
+    return rows.tables, timings, peak_rss_kb()
+
+
+def parse_grant(case, filename, dbc, timings=None):
     global mainclassdata
     global subclassdata
     data_grant = case.find('us-bibliographic-data-grant')
@@ -593,16 +729,6 @@ def parse_grant(case, filename, dbc):
             }
             rawassignee_list.append(rawassignee)
             sequence += 1
-
-            rawlocation = {
-                'id': loc_idd,
-                'location_id': None,
-                'city': get_text_or_none(assignee_element, 'addressbook/address/city/text()'),
-                'state': get_text_or_none(assignee_element, 'addressbook/address/state/text()'),
-                'country': get_text_or_none(assignee_element, 'addressbook/address/country/text()'),
-                'country_transformed': get_text_or_none(assignee_element, 'addressbook/address/country/text()'),
-            }
-            rawlocation_list.append(rawlocation)
         dbc.insert_listdict(rawassignee_list, 'rawassignee')
 
     def parse_non_inventor():
@@ -611,18 +737,8 @@ def parse_grant(case, filename, dbc):
         rawinventor_list = []
         sequence = 0
         inv_seq = 0
-        for applicant_element in applicants_element_list:
-            loc_idd = id_generator()
-            rawlocation = {
-                'id': loc_idd,
-                'location_id': None,
-                'city': get_text_or_none(applicant_element, 'addressbook/address/city/text()'),
-                'state': get_text_or_none(applicant_element, 'addressbook/address/state/text()'),
-                'country': get_text_or_none(applicant_element, 'addressbook/address/country/text()'),
-                'country_transformed': get_text_or_none(applicant_element, 'addressbook/address/country/text()'),
-            }
-            rawlocation_list.append(rawlocation)
-
+        for n, applicant_element in enumerate(applicants_element_list):
+            loc_idd = row_id(patent_id, 'applicant_rawlocation', n)
             # this get us the non-inventor applicants in 2013+. Inventor applicants are in applicant and also in inventor.
             non_inventor_app_types = ['legal-representative', 'party-of-interest', 'obligated-assignee', 'assignee']
             earlier_applicant_type = applicant_element.attrib['app-type']
@@ -710,16 +826,6 @@ def parse_grant(case, filename, dbc):
                 }
             rawinventor_list.append(rawinventor)
             sequence += 1
-
-            rawlocation = {
-                'id': loc_idd,
-                'location_id': None,
-                'city': get_text_or_none(inventor_element, 'addressbook/address/city/text()'),
-                'state': get_text_or_none(inventor_element, 'addressbook/address/state/text()'),
-                'country': get_text_or_none(inventor_element, 'addressbook/address/country/text()'),
-                'country_transformed': get_text_or_none(inventor_element, 'addressbook/address/country/text()'),
-            }
-            rawlocation_list.append(rawlocation)
         dbc.insert_listdict(rawinventor_list, 'rawinventor')
 
     def parse_agents():
@@ -1044,12 +1150,8 @@ def parse_grant(case, filename, dbc):
             dbc.insert_dict(botanic, 'botanic')
 
     def parse_goverment_interest():
-        description_element = case.find('description')
-        description_text_full = etree.tostring(description_element).decode()
-        gov_int_containers = description_text_full.split("<?GOVINT")
-        if len(gov_int_containers) > 1:
-            gov_int_text_full = "<?GOVINT" + gov_int_containers[1]
-            text = re.sub('<.*?>|</.*?>', '', gov_int_text_full)
+        text = government_interest_text(case.find('description'))
+        if text is not None:
             text = re.sub('[\n\t\r\f]+', ' ', text)
             text = re.sub('\s+', ' ', text)
             goverment_interest = {
@@ -1085,56 +1187,74 @@ def parse_grant(case, filename, dbc):
     # parse_botanic()
     # parse_goverment_interest()
 
-    with cf.ThreadPoolExecutor(max_workers=21) as executor:
-        executor.submit(parse_application)
-        executor.submit(parse_claims)
-        executor.submit(parse_ipcr)
-        executor.submit(parse_uspc)
-        executor.submit(parse_citations)
-        executor.submit(parse_assignees)
-        executor.submit(parse_non_inventor)
-        executor.submit(parse_inventors)
-        executor.submit(parse_agents)
-        executor.submit(parse_examiners)
-        executor.submit(parse_related_docs)
-        executor.submit(parse_foreign_priority)
-        executor.submit(parse_draw_desc_text)
-        executor.submit(parse_rel_app_text)
-        executor.submit(parse_brf_sum_text)
-        executor.submit(parse_det_description)
-        executor.submit(parse_us_term_of_grant)
-        executor.submit(parse_pct_data)
-        executor.submit(parse_figures)
-        executor.submit(parse_botanic)
-        executor.submit(parse_goverment_interest)
-    dbc.cnx.commit()
+    if timings is None:
+        timings = {}
+    sections = [
+        parse_application, parse_claims, parse_ipcr, parse_uspc, parse_citations, parse_assignees,
+        parse_non_inventor, parse_inventors, parse_agents, parse_examiners, parse_related_docs,
+        parse_foreign_priority, parse_draw_desc_text, parse_rel_app_text, parse_brf_sum_text,
+        parse_det_description, parse_us_term_of_grant, parse_pct_data, parse_figures, parse_botanic,
+        parse_goverment_interest
+    ]
+    for section in sections:
+        try:
+            timed(section, timings)()
+        except Exception:
+            logger.exception('%s failed for patent_id %s', section.__name__, patent_id)
 
     # dbc.case_file_update_status(doc_id, 'true')
-    logger.info('Inserted application %s in [%s sec]', app_id, time.time() - start_time)
+    logger.debug('Parsed application %s in [%s sec]', app_id, time.time() - start_time)
 
 
-def main_worker(file):
+def pending_files(files_tuple):
+    '''
+    The weekly files of files_tuple that are to be parsed, as jobs for the pipeline stages.
+    With --parse the files are listed newest first, and the first one already in the database
+    ends the list.
+    '''
     dbc = Db()
-    file_check = dbc.file_check(file)
-    if file_check is None:
-        xml_filename = download_file(file['url'])
-        if xml_filename is not None:
-            inserted_id = dbc.file_insert(file, os.path.basename(xml_filename))
-            parse_file(xml_filename, inserted_id)
-    elif args.parseall or file_check['status'] is None or file_check['status'] in ['new', '']:
-        logger.warning('File %s is not copletly into the database. Going to process again', file_check['filename'])
-        if not os.path.isfile(os.path.join(WORK_DIR, file_check['filename'])):
-            xml_filename = download_file(file['url'])
+    for file in files_tuple:
+        file_check = dbc.file_check(file)
+        if file_check is None:
+            yield {'file': file, 'file_id': None}
+        elif args.parseall or file_check['status'] is None or file_check['status'] in ['new', '']:
+            logger.warning('File %s is not copletly into the database. Going to process again', file_check['filename'])
+            yield {'file': file, 'file_id': file_check['id']}
         else:
-            xml_filename = file_check['filename']
-        if WORK_DIR not in xml_filename:
-            xml_filename = os.path.join(WORK_DIR, xml_filename)
-        parse_file(xml_filename, file_check['id'])
-    else:
-        logger.info('File %s is already inserted into database.', file_check['filename'])
-        if args.parse:
-            logger.info('Nothing to work. Exiting.')
-            sys.exit()
+            logger.info('File %s is already inserted into database.', file_check['filename'])
+            if args.parse:
+                logger.info('Nothing more to work.')
+                return
+
+
+def download_job(job):
+    job['path'] = download_file(job['file']['url'])
+    return job
+
+
+def parse_job(job):
+    if job['file_id'] is None:
+        job['file_id'] = Db().file_insert(job['file'], xml_basename(job['path']))
+        if job['file_id'] is None:
+            return None
+    parse_file(job['path'], job['file_id'])
+    return job
+
+
+def main_worker(files_tuple):
+    '''
+    Downloads and parses the weekly files of files_tuple in a pipeline, each step in its own
+    threads, so the next files are downloaded while one is parsed. The patents of a
+    file are parsed by the process pool of parse_file and loaded by its writer thread.
+    The files are parsed one at a time, in the order of files_tuple.
+    '''
+    pipeline = Pipeline(logger)
+    pipeline.add_stage('download', download_job, workers=args.downloads)
+    pipeline.add_stage('parse', parse_job)
+    results = pipeline.run(pending_files(files_tuple))
+    failed = [n for n, job in enumerate(results) if job is None]
+    logger.info('Parsed %s files, %s failed', len(results) - len(failed), len(failed))
+    return results
 
 
 logger = create_logger()
@@ -1145,21 +1265,16 @@ if __name__ == '__main__':
     parser.add_argument('--parse', help='Parses most recent data.', action="store_true")
     parser.add_argument('--parseall', help='Parses all the data.', action="store_true")
     parser.add_argument('--force', help='Forces to discard old data, use with --parseall command.', action="store_true")
+    parser.add_argument('--processes', help='Number of processes that parse patents.', type=int, default=os.cpu_count())
+    parser.add_argument('--downloads', help='Number of files downloaded at the same time.', type=int, default=DOWNLOADS)
+    parser.add_argument('--url', help='Page that lists the weekly files.', default=MAIN_URL)
     args = parser.parse_args()
     if args.parse or args.parseall:
         os.makedirs(os.path.dirname(WORK_DIR), exist_ok=True)
         os.makedirs(os.path.dirname(LOG_DIR), exist_ok=True)
-        files_tuple = get_urls(MAIN_URL)
-        # Make the following variables global
-        rawlocation_list = []
-        mainclassdata = {}
-        subclassdata = {}
-        # single-thread test
-        for file in files_tuple:
-            main_worker(file)
-        sys.exit()
-        with cf.ThreadPoolExecutor(max_workers=2) as executor:
-            executor.map(main_worker, files_tuple)
+        Db().file_add_checkpoint_columns()
+        files_tuple = get_urls(args.url)
+        main_worker(files_tuple or ())
     else:
         parser.print_help()
         sys.exit()
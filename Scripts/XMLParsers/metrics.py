@@ -0,0 +1,88 @@
+"""
+Per-file metrics of the XML parsers.
+
+FileMetrics counts the documents of a weekly file, adds up the time spent in
+every parse section and, when the file is done, appends one JSON line to a
+metrics file with the documents per second and the peak resident set size
+of the parser and its worker processes. Comparing the lines of different
+runs shows regressions, and the peak RSS tells how many parsers fit on a host.
+"""
+import json
+import resource
+import time
+
+# writing 5 resets the peak RSS of the process (Linux only)
+CLEAR_REFS = '/proc/self/clear_refs'
+
+
+def peak_rss_kb():
+    """
+    Peak resident set size of this process in kB
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def reset_peak_rss():
+    """
+    Start the peak RSS of this process over from its current RSS, where the
+    kernel allows it, so the peak of every file is measured on its own.
+    """
+    try:
+        with open(CLEAR_REFS, 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def timed(section, timings):
+    """
+    section wrapped so that every call adds its run time to
+    timings[section.__name__]
+    """
+    def run():
+        start_time = time.time()
+        try:
+            return section()
+        finally:
+            timings[section.__name__] = timings.get(section.__name__, 0) + time.time() - start_time
+    return run
+
+
+class FileMetrics(object):
+    """
+    Metrics of one weekly file, from its creation to write(). Worker
+    processes report their section timings and peak RSS through add().
+    """
+
+    def __init__(self, filename):
+        reset_peak_rss()
+        self.filename = filename
+        self.start_time = time.time()
+        self.documents = 0
+        self.sections = {}
+        self.worker_peak_rss_kb = 0
+
+    def add(self, timings, worker_peak_rss_kb=0):
+        self.documents += 1
+        for name, seconds in timings.items():
+            self.sections[name] = self.sections.get(name, 0) + seconds
+        self.worker_peak_rss_kb = max(self.worker_peak_rss_kb, worker_peak_rss_kb)
+
+    def write(self, path):
+        """
+        Append the metrics as a JSON line to the file at path, and return them
+        """
+        seconds = time.time() - self.start_time
+        record = {
+            'filename': self.filename,
+            'finished': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'documents': self.documents,
+            'seconds': round(seconds, 3),
+            'documents_per_second': round(self.documents / seconds, 3) if seconds > 0 else None,
+            'peak_rss_kb': peak_rss_kb(),
+            'worker_peak_rss_kb': self.worker_peak_rss_kb,
+            'section_seconds': dict((name, round(t, 3)) for name, t in self.sections.items()),
+        }
+        with open(path, 'a') as f:
+            f.write(json.dumps(record, sort_keys=True) + '\n')
+        return record
@@ -1,4 +1,33 @@
 import requests
+from lxml import etree
+
+
+class XPathRegistry(object):
+    """
+    Compiled etree.XPath objects, shared by all parse functions of a process.
+    An expression is compiled the first time it is looked up, by the text of
+    the expression, so lxml does not parse it again for every patent.
+    """
+
+    def __init__(self):
+        self.xpaths = {}
+
+    def __call__(self, expression):
+        xpath = self.xpaths.get(expression)
+        if xpath is None:
+            xpath = self.xpaths[expression] = etree.XPath(expression)
+        return xpath
+
+
+xpaths = XPathRegistry()
+
+
+def get_text_or_none(element, item_name):
+    item = xpaths(item_name)(element)
+    if len(item) > 0:
+        return str(item[0])
+    else:
+        return None
 
 
 def download_html(url):
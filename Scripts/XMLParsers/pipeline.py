@@ -0,0 +1,133 @@
+"""
+Staged pipeline for the weekly files the parsers download.
+
+Every stage runs a function on the items the stage before it hands over, in
+its own worker threads, so downloading one file overlaps with unzipping,
+cleaning and parsing the ones ahead of it. The stages are joined by bounded
+queues: a stage that falls behind blocks the stages before it instead of
+letting downloaded files pile up on disk.
+
+Items keep the order they are fed in. A stage with several workers takes the
+items in turn, and the queue after it hands them on in the same order, so a
+stage with one worker sees every item in feed order.
+"""
+import threading
+
+QUEUE_SIZE = 2
+
+
+class OrderedQueue(object):
+    """
+    Bounded queue of numbered items that gives them out in the order of their
+    numbers. put() blocks while the item is maxsize or more ahead of the next
+    one to give out; get() blocks until the next item is in. close(count)
+    marks count as the number of items, after which get() returns STOP.
+    """
+    STOP = object()
+
+    def __init__(self, maxsize=QUEUE_SIZE):
+        self.maxsize = maxsize
+        self.items = {}
+        self.next = 0
+        self.count = None
+        self.condition = threading.Condition()
+
+    def put(self, number, item):
+        with self.condition:
+            while number >= self.next + self.maxsize:
+                self.condition.wait()
+            self.items[number] = item
+            self.condition.notify_all()
+
+    def get(self):
+        with self.condition:
+            while self.next not in self.items:
+                if self.count is not None and self.next >= self.count:
+                    return self.STOP, None
+                self.condition.wait()
+            number = self.next
+            self.next += 1
+            self.condition.notify_all()
+            return number, self.items.pop(number)
+
+    def close(self, count):
+        with self.condition:
+            self.count = count
+            self.condition.notify_all()
+
+
+class Stage(object):
+    """
+    One step of a Pipeline: workers threads that run func on the items of
+    inqueue and put what it returns on outqueue. An item for which func
+    returns None or raises is dropped, the items after it go on.
+    """
+
+    def __init__(self, name, func, workers, inqueue, outqueue, logger):
+        self.name = name
+        self.func = func
+        self.inqueue = inqueue
+        self.outqueue = outqueue
+        self.logger = logger
+        self.threads = [threading.Thread(target=self.run, name='{}-{}'.format(name, n), daemon=True)
+                        for n in range(workers)]
+
+    def run(self):
+        while True:
+            number, item = self.inqueue.get()
+            if number is OrderedQueue.STOP:
+                break
+            if item is not None:
+                try:
+                    item = self.func(item)
+                except Exception:
+                    self.logger.exception('Stage %s failed for %s', self.name, item)
+                    item = None
+            # dropped items are passed on as None, so the items after them are not held back
+            self.outqueue.put(number, item)
+
+
+class Pipeline(object):
+    """
+    Chain of stages that the items given to run() go through one after the
+    other, e.g.
+
+        pipeline = Pipeline(logger)
+        pipeline.add_stage('download', download, workers=2)
+        pipeline.add_stage('parse', parse)
+        pipeline.run(files)
+    """
+
+    def __init__(self, logger, queue_size=QUEUE_SIZE):
+        self.logger = logger
+        self.queue_size = queue_size
+        self.stages = []
+
+    def add_stage(self, name, func, workers=1):
+        self.stages.append((name, func, workers))
+
+    def run(self, items):
+        """
+        Feed items through all stages and wait for them. items may be a
+        generator, it is read only as fast as the first stage takes them.
+        Returns what the last stage returned for every item, None for the
+        items that were dropped on the way.
+        """
+        queues = [OrderedQueue(self.queue_size) for n in range(len(self.stages) + 1)]
+        # the results are only collected at the end, so the last queue is not bounded
+        queues[-1].maxsize = float('inf')
+        stages = [Stage(name, func, workers, queues[n], queues[n + 1], self.logger)
+                  for n, (name, func, workers) in enumerate(self.stages)]
+        for stage in stages:
+            for thread in stage.threads:
+                thread.start()
+        count = 0
+        for item in items:
+            queues[0].put(count, item)
+            count += 1
+        queues[0].close(count)
+        for stage in stages:
+            for thread in stage.threads:
+                thread.join()
+            stage.outqueue.close(count)
+        return [queues[-1].items[number] for number in range(count)]
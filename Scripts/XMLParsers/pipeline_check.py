@@ -0,0 +1,294 @@
+"""
+End-to-end check of the download -> parse pipeline of grant_parser.
+
+Zips every fixture file that holds grants into a weekly file of its own, a
+week apart in the order of the file names, and serves them with http.server
+under a listing page like that of bulkdata.uspto.gov. Then runs get_urls and
+main_worker against the local server, with the file_info and patent tables
+and the row writer kept in memory instead of postgres, and checks what every
+stage produced:
+
+    listing   get_urls finds every weekly file
+    download  every file is downloaded once, the same bytes as served
+    parse     the files are parsed oldest first, and every file is finished,
+              checkpointed at its last patent and deleted, with a line in
+              the metrics file
+    rows      the rows written are those of parsing the newest weekly file
+              of every patent in this process; patents that are in several
+              fixture files are replaced by the newer file
+
+Run it from this directory, like the parsers:
+
+    python pipeline_check.py [--fixtures DIR] [--processes N] [--downloads N]
+"""
+import argparse
+from collections import defaultdict
+import datetime
+import functools
+import hashlib
+import http.server
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import zipfile
+
+from lxml import etree
+
+import grant_parser
+from db_pgsql import RowCollector
+from xml_stream import iter_documents, iter_raw_documents, open_xml, xml_basename
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir,
+                           'Assignee_Lawyer_Disambiguation', 'test', 'fixtures', 'xml')
+UUID = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$')
+FIRST_WEEK = datetime.date(2012, 1, 3)
+# get_urls reads the rows of the second table in the container div
+LISTING = '<html><body><div class="container"><table></table><table>{}</table></div></body></html>'
+LISTING_ROW = '<tr><td><a href="{name}">{name}</a></td><td>{size}</td><td>{date}</td></tr>'
+
+
+class MemoryDb(object):
+    """
+    The file_info and grant tables, in memory and shared by all instances,
+    with the methods of Db_grants that grant_parser calls.
+    """
+    lock = threading.Lock()
+    files = []
+    tables = defaultdict(list)
+
+    def file_check(self, file):
+        xml_filename = file['url'].split('/')[-1].replace('zip', 'xml')
+        with self.lock:
+            for row in self.files:
+                if row['url'] == file['url'] or row['filename'] == xml_filename:
+                    return {k: row[k] for k in ['id', 'status', 'filename', 'date_string']}
+        return None
+
+    def file_insert(self, file, xml_filename):
+        with self.lock:
+            self.files.append({'id': len(self.files) + 1, 'filename': xml_filename, 'filesize': file['size'],
+                               'url': file['url'], 'date_string': file['date_string'], 'status': 'new',
+                               'last_doc_offset': None, 'last_doc_number': None})
+            return len(self.files)
+
+    def file_update_status(self, id, status):
+        with self.lock:
+            self.files[id - 1]['status'] = status
+        return 1
+
+    def file_add_checkpoint_columns(self):
+        pass
+
+    def file_get_checkpoint(self, id):
+        with self.lock:
+            row = self.files[id - 1]
+            return {k: row[k] for k in ['id', 'status', 'last_doc_offset', 'last_doc_number']}
+
+    def file_update_checkpoint(self, id, doc_offset, doc_number):
+        with self.lock:
+            self.files[id - 1].update(last_doc_offset=doc_offset, last_doc_number=doc_number)
+        return 1
+
+    def patent_ids_get(self, patent_ids):
+        patent_ids = set(patent_ids)
+        with self.lock:
+            status = {row['filename']: row['status'] for row in self.files}
+            return {row['id']: {'id': row['id'], 'date': row['date'], 'filename': row['filename'],
+                                'status': status.get(row['filename'])}
+                    for row in self.tables['patent'] if row['id'] in patent_ids}
+
+    def delete_patents(self, patent_ids, tables):
+        patent_ids = set(patent_ids)
+        deleted = 0
+        with self.lock:
+            for table in tables:
+                column = 'id' if table in ['patent'] else 'patent_id'
+                rows = self.tables[table]
+                self.tables[table] = [row for row in rows if row[column] not in patent_ids]
+                deleted += len(rows) - len(self.tables[table])
+        return deleted
+
+
+class MemoryWriter(object):
+    """
+    RowWriter that adds the rows to the tables of MemoryDb
+    """
+
+    def __init__(self, pool, logger):
+        self.dbc = MemoryDb()
+
+    def start(self):
+        pass
+
+    def write(self, tables, checkpoint=None):
+        with self.dbc.lock:
+            for table_name, rows in tables:
+                self.dbc.tables[table_name].extend(rows)
+        if checkpoint is not None:
+            self.dbc.file_update_checkpoint(*checkpoint)
+
+    def close(self):
+        pass
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(directory):
+    """
+    Serve directory over HTTP from a thread, on a free local port
+    """
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def write_weekly_files(fixture_dir, serve_dir):
+    """
+    Zip every fixture file of fixture_dir that holds grants into a weekly
+    file in serve_dir, and write the listing page, newest file first, which
+    get_urls turns around so that the files are parsed oldest first and the
+    newer files replace patents. Returns the (xml name, fixture path) of every
+    weekly file, oldest first.
+    """
+    weekly = []
+    rows = []
+    for name in sorted(os.listdir(fixture_dir)):
+        path = os.path.join(fixture_dir, name)
+        with open_xml(path) as inputfile:
+            if next(iter_raw_documents(inputfile, 'us-patent-grant'), None) is None:
+                continue
+        date = FIRST_WEEK + datetime.timedelta(weeks=len(weekly))
+        zip_name = date.strftime('ipg%y%m%d.zip')
+        with zipfile.ZipFile(os.path.join(serve_dir, zip_name), 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.write(path, xml_basename(zip_name))
+        weekly.append((xml_basename(zip_name), path))
+        rows.append(LISTING_ROW.format(name=zip_name, size=os.path.getsize(os.path.join(serve_dir, zip_name)),
+                                       date=date.isoformat()))
+    with open(os.path.join(serve_dir, 'index.html'), 'w') as f:
+        f.write(LISTING.format(''.join(reversed(rows))))
+    return weekly
+
+
+def masked_tables(tables):
+    """
+    The rows of every table with the random uuids masked, sorted, so that
+    tables written in a different order compare equal
+    """
+    return {table_name: sorted(repr(sorted((k, None if isinstance(v, str) and UUID.match(v) else v)
+                                           for k, v in row.items()))
+                               for row in rows)
+            for table_name, rows in tables.items() if rows}
+
+
+def expected_tables(weekly):
+    """
+    The tables of parsing, in this process, the newest weekly file of every
+    patent. Also returns the patent ids of every weekly file, in file order.
+    """
+    newest = {}
+    patent_ids = {}
+    for xml_name, path in weekly:
+        patent_ids[xml_name] = []
+        with open_xml(path) as inputfile:
+            for case in iter_documents(inputfile, 'us-patent-grant'):
+                patent_id = grant_parser.get_patent_id(case)
+                rows = RowCollector()
+                grant_parser.parse_grant(etree.fromstring(etree.tostring(case)), xml_name, rows)
+                newest[patent_id] = rows.tables
+                patent_ids[xml_name].append(patent_id)
+    tables = defaultdict(list)
+    for patent_tables in newest.values():
+        for table_name, rows in patent_tables:
+            tables[table_name].extend(rows)
+    return tables, patent_ids
+
+
+def check(failures, stage, ok, message):
+    print('{:8} {:4} {}'.format(stage, 'ok' if ok else 'FAIL', message))
+    if not ok:
+        failures.append(stage)
+
+
+def run_checks(url, serve_dir, work_dir, weekly):
+    failures = []
+    downloads = defaultdict(list)
+    download_job = grant_parser.download_job
+
+    def checked_download_job(job):
+        job = download_job(job)
+        downloads[job['file']['url']].append(file_digest(job['path']))
+        return job
+    grant_parser.download_job = checked_download_job
+
+    files_tuple = grant_parser.get_urls(url) or ()
+    served = {url + xml_name.replace('xml', 'zip') for xml_name, path in weekly}
+    check(failures, 'listing', len(files_tuple) == len(weekly) and {f['url'] for f in files_tuple} == served,
+          '{} of {} weekly files listed'.format(len(files_tuple), len(weekly)))
+
+    results = grant_parser.main_worker(files_tuple)
+    check(failures, 'download', all(downloads[f['url']] == [file_digest(os.path.join(serve_dir, f['url'].split('/')[-1]))]
+                                    for f in files_tuple),
+          '{} files downloaded, {} times in all'.format(len(downloads), sum(len(d) for d in downloads.values())))
+
+    expected, patent_ids = expected_tables(weekly)
+    files = {row['filename']: row for row in MemoryDb.files}
+    finished = [name for name, ids in patent_ids.items()
+                if name in files and files[name]['status'] == 'finished'
+                and files[name]['last_doc_offset'] == len(ids) - 1 and files[name]['last_doc_number'] == ids[-1]]
+    check(failures, 'parse', len(finished) == len(weekly) and all(job is not None for job in results),
+          '{} of {} files finished at their last patent'.format(len(finished), len(weekly)))
+    parsed = [row['filename'] for row in MemoryDb.files]
+    check(failures, 'parse', parsed == list(patent_ids), 'files parsed oldest first')
+    check(failures, 'parse', os.listdir(work_dir) == [], '{} files left in the work dir'.format(len(os.listdir(work_dir))))
+    with open(grant_parser.METRICS_FILE) as f:
+        metrics = [json.loads(line)['filename'] for line in f]
+    check(failures, 'parse', sorted(metrics) == sorted(patent_ids),
+          '{} lines in the metrics file'.format(len(metrics)))
+
+    written = masked_tables(MemoryDb.tables)
+    expected = masked_tables(expected)
+    for table_name in sorted(set(written) | set(expected)):
+        check(failures, 'rows', written.get(table_name) == expected.get(table_name),
+              '{}: {} rows written, {} expected'.format(table_name, len(written.get(table_name, [])),
+                                                         len(expected.get(table_name, []))))
+    return failures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Runs the grant pipeline on fixture files served over HTTP.')
+    parser.add_argument('--fixtures', help='Directory of the fixture xml files.', default=FIXTURE_DIR)
+    parser.add_argument('--processes', help='Number of processes that parse patents.', type=int, default=2)
+    parser.add_argument('--downloads', help='Number of files downloaded at the same time.', type=int, default=2)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        serve_dir = os.path.join(temp_dir, 'served')
+        work_dir = os.path.join(temp_dir, 'work')
+        os.makedirs(serve_dir)
+        os.makedirs(work_dir)
+        weekly = write_weekly_files(args.fixtures, serve_dir)
+        server = serve(serve_dir)
+        grant_parser.args = argparse.Namespace(parse=False, parseall=True, force=False, processes=args.processes,
+                                               downloads=args.downloads)
+        grant_parser.WORK_DIR = work_dir
+        grant_parser.METRICS_FILE = os.path.join(temp_dir, 'metrics.jsonl')
+        grant_parser.Db = MemoryDb
+        grant_parser.RowWriter = MemoryWriter
+        grant_parser.connection_pool = lambda schema: None
+        try:
+            failures = run_checks('http://127.0.0.1:{}/'.format(server.server_port), serve_dir, work_dir, weekly)
+        finally:
+            server.shutdown()
+    print('all stages ok' if not failures else '{} checks failed'.format(len(failures)))
+    sys.exit(1 if failures else 0)
@@ -14,6 +14,8 @@ DB_USER = os.getenv("DB_USER") or 'postgres'
 DB_PASSWORD = os.getenv("DB_PASSWORD") or None
 DB_HOST = os.getenv("DB_HOST") or '127.0.0.1'
 DB_NAME = os.getenv("DB_NAME") or 'patent'
+# rows the parsers gather across patents before writing them with COPY
+COPY_FLUSH_ROWS = int(os.getenv("COPY_FLUSH_ROWS") or 10000)
 
 
 config = {
@@ -0,0 +1,140 @@
+"""
+Streaming input for the weekly USPTO full-text files.
+
+A weekly file is many XML documents written one after the other, each with
+its own XML declaration and DOCTYPE, so as a whole it is not well-formed XML.
+ConcatenatedXML drops the declarations and wraps the documents in a root
+element while the file is read, so etree.iterparse can read the weekly file,
+or the xml member of the downloaded zip, without rewriting it on disk first.
+"""
+import os
+import zipfile
+from lxml import etree
+
+XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8"?>\n'
+ROOT_START = b'<root>\n'
+ROOT_END = b'</root>\n'
+
+
+class ConcatenatedXML(object):
+    """
+    Read-only binary file object over the concatenated documents of infile,
+    as one document with a virtual root element. Lines that start with an XML
+    declaration or a DOCTYPE are left out. Files that were already wrapped in
+    a root element by the old clean_file still work, they just get a second
+    root around it. close() also closes archive, the zip infile was opened
+    from, if given.
+
+    skip leaves out the first skip documents, up to the line with the skip-th
+    end tag of tag, without parsing them, for resuming a file.
+    """
+
+    def __init__(self, infile, archive=None, skip=0, tag=None):
+        self.infile = infile
+        self.archive = archive
+        self.skip = skip
+        self.tag = tag
+        self.lines = self._lines()
+        self.buffer = b''
+
+    def _lines(self):
+        yield XML_DECLARATION + ROOT_START
+        lines = iter(self.infile)
+        if self.skip > 0:
+            end_tag = '</{}>'.format(self.tag).encode()
+            skipped = 0
+            for line in lines:
+                if line.lstrip().startswith(b'<root'):
+                    # the root of a file the old clean_file wrapped is kept, it is closed at the end
+                    yield line
+                elif end_tag in line:
+                    skipped += 1
+                    if skipped == self.skip:
+                        break
+        for line in lines:
+            stripped = line.lstrip()
+            if not stripped.startswith(b'<?xml') and not stripped.startswith(b'<!DOCTYPE'):
+                yield line
+        yield ROOT_END
+
+    def read(self, size=-1):
+        chunks = [self.buffer]
+        length = len(self.buffer)
+        for line in self.lines:
+            chunks.append(line)
+            length += len(line)
+            if 0 <= size <= length:
+                break
+        data = b''.join(chunks)
+        if size < 0:
+            self.buffer = b''
+            return data
+        self.buffer = data[size:]
+        return data[:size]
+
+    def close(self):
+        self.infile.close()
+        if self.archive is not None:
+            self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def open_xml(filename, skip=0, tag=None):
+    """
+    Open a weekly file for iterparse. filename is the xml file, or the zip
+    archive it came in, which is read without extracting it. The first skip
+    documents, elements tag, are left out.
+    """
+    if zipfile.is_zipfile(filename):
+        archive = zipfile.ZipFile(filename)
+        try:
+            member = next(name for name in archive.namelist() if name.lower().endswith('.xml'))
+        except StopIteration:
+            archive.close()
+            raise ValueError('No xml file in {}'.format(filename))
+        return ConcatenatedXML(archive.open(member), archive, skip, tag)
+    return ConcatenatedXML(open(filename, 'rb'), skip=skip, tag=tag)
+
+
+def xml_basename(filename):
+    """
+    The name of the xml file of a weekly file, for both the zip and the xml:
+    .../ipg180102.zip -> ipg180102.xml
+    """
+    return os.path.splitext(os.path.basename(filename))[0] + '.xml'
+
+
+def iter_documents(inputfile, tag):
+    """
+    iterparse the elements tag of inputfile in constant memory. Each element
+    is cleared once the loop body is done with it, and it and the elements
+    before it are removed from the root, which clear() alone leaves behind.
+    """
+    for event, element in etree.iterparse(inputfile, events=('end',), tag=tag):
+        yield element
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+
+def iter_raw_documents(inputfile, tag):
+    """
+    The elements tag of a ConcatenatedXML, as the bytes of the lines from
+    their start tag to their end tag, without parsing them. Every document
+    of a weekly file starts and ends on a line of its own, so this is a
+    cheap way to hand whole documents to worker processes.
+    """
+    start_tag = '<{}'.format(tag).encode()
+    end_tag = '</{}>'.format(tag).encode()
+    lines = []
+    for line in inputfile.lines:
+        if lines or line.lstrip().startswith(start_tag):
+            lines.append(line)
+            if end_tag in line:
+                yield b''.join(lines)
+                lines = []
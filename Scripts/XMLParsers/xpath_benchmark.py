@@ -0,0 +1,87 @@
+"""
+Benchmark of the compiled XPath registry in parser_helpers.
+
+Parses the fixture grants with grant_parser.parse_grant into a RowCollector,
+once evaluating every XPath expression from its string, as get_text_or_none
+used to, and once through the registry. Checks that both give the same rows
+and prints the time per patent of each.
+
+    python xpath_benchmark.py [--fixtures DIR] [--rounds N]
+"""
+import argparse
+import os
+import re
+import time
+
+from lxml import etree
+
+import grant_parser
+import parser_helpers
+from db_pgsql import RowCollector
+from xml_stream import iter_documents, open_xml
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir,
+                           'Assignee_Lawyer_Disambiguation', 'test', 'fixtures', 'xml')
+UUID = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$')
+
+
+def get_text_or_none_uncompiled(element, item_name):
+    item = element.xpath(item_name)
+    if len(item) > 0:
+        return str(item[0])
+    else:
+        return None
+
+
+def load_grants(fixture_dir):
+    """
+    The us-patent-grant elements of all files in fixture_dir, serialized
+    """
+    grants = []
+    for name in sorted(os.listdir(fixture_dir)):
+        with open_xml(os.path.join(fixture_dir, name)) as inputfile:
+            try:
+                for case in iter_documents(inputfile, 'us-patent-grant'):
+                    grants.append(etree.tostring(case))
+            except etree.XMLSyntaxError:
+                print('Skipping {}, not well-formed'.format(name))
+    return grants
+
+
+def parse_grants(grants):
+    """
+    Parse the grants, and return their rows with the random uuids masked
+    """
+    tables = []
+    start_time = time.time()
+    for xml in grants:
+        rows = RowCollector()
+        grant_parser.parse_grant(etree.fromstring(xml), 'ipg000000.xml', rows)
+        tables.append(rows.tables)
+    seconds = time.time() - start_time
+    masked = [[(table_name, [dict((k, None if isinstance(v, str) and UUID.match(v) else v) for k, v in row.items())
+                             for row in rows])
+               for table_name, rows in patent_tables]
+              for patent_tables in tables]
+    return masked, seconds
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compares the XPath registry with XPath strings on fixture grants.')
+    parser.add_argument('--fixtures', help='Directory of the fixture xml files.', default=FIXTURE_DIR)
+    parser.add_argument('--rounds', help='Times every variant parses the grants.', type=int, default=5)
+    args = parser.parse_args()
+    grants = load_grants(args.fixtures)
+    print('{} grants'.format(len(grants)))
+    results = {}
+    for variant, get_text in [('strings', get_text_or_none_uncompiled),
+                              ('registry', parser_helpers.get_text_or_none)]:
+        grant_parser.get_text_or_none = get_text
+        best = None
+        for n in range(args.rounds):
+            rows, seconds = parse_grants(grants)
+            best = seconds if best is None else min(best, seconds)
+        results[variant] = rows
+        print('{:10} {:.3f} ms per patent'.format(variant, 1000 * best / max(len(grants), 1)))
+    print('{} compiled expressions'.format(len(parser_helpers.xpaths.xpaths)))
+    print('same rows' if results['strings'] == results['registry'] else 'ROWS DIFFER')